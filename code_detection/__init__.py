@@ -1,32 +1,221 @@
+"""
+Detects code in Discord messages which isn't in a code block.
+Each language has a detector (see base.py), and they are chosen between by the `detector_registry`.
+"""
+
 from __future__ import annotations
 
+from os import getenv
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-# TODO: add support for more languages!
-from .python import PythonDetector
-from .python_traceback import PythonTracebackDetector
+from .attachments import decode_chunks, detect_streaming, is_text_attachment
+from .budget import DetectionBudget, DetectionBudgetExceeded
+from .cache import DetectionCache
+from .executor import DetectionExecutor
+from .features import LineFeatures
+from .incremental import IncrementalDetectionStore, best_detection_result
+from .ordering import adaptive_pattern_order
+from .profiling import pattern_profiler
+from .registry import DETECTOR_SPECS, DetectorRegistry
+from .scoring import DetectionScore, confidence, score_detectors
 
 if TYPE_CHECKING:
-    from .base import DetectedSection, DetectorBase
+    from collections.abc import Hashable
+
+    from .base import DetectedSection
 
-DETECTOR_CLASSES: list[type[DetectorBase]] = [
-    PythonDetector,
-    PythonTracebackDetector,
-    # More languages coming soon!
-]
+detector_registry = DetectorRegistry(DETECTOR_SPECS)
 
 formatting_example_image_path = Path(__file__).parent / "formatting-example.gif"
 
+DetectionResult = tuple[str, tuple["DetectedSection", ...]] | None
+
+# if set, every pattern is profiled (see profiling.py), and the profiles are saved here when the bot shuts down
+pattern_profile_path = getenv("CODE_DETECTION_PATTERN_PROFILE_PATH")
+pattern_profiler.enabled = pattern_profile_path is not None
+
+# if set, the Python patterns are tried in the order of how often they match (see ordering.py),
+# which is loaded from here on startup and saved here when the bot shuts down
+pattern_order_path = getenv("CODE_DETECTION_PATTERN_ORDER_PATH")
+if pattern_order_path is not None:
+    adaptive_pattern_order.load(Path(pattern_order_path))
+    adaptive_pattern_order.enable()
+
+# shared by every caller of `detect`
+detection_cache: DetectionCache[DetectionResult] = DetectionCache(
+    max_size=int(getenv("CODE_DETECTION_CACHE_SIZE", "256")),
+)
+
+
+# how long detecting a single message may take before it is treated as plain text
+detection_budget = DetectionBudget(
+    seconds=float(getenv("CODE_DETECTION_TIME_BUDGET_SECONDS", "5")) or None,
+)
+
+
+def detect(text: str) -> DetectionResult:
+    """
+    Finds the language which best matches the code in `text`, and the sections of `text` which are code.
+    Results are cached (see `detection_cache`), so repeated calls with the same text are cheap.
+
+    :return: (language, sections) or None if there is no code in `text`.
+    """
+    return detection_cache.get(text, detect_uncached)
+
+
+def detect_uncached(text: str) -> DetectionResult:
+    """
+    Same as `detect`, but never cached.
+    Only the detectors whose trigger tokens occur in `text` are run (see `detector_registry`).
+    If detection takes longer than `detection_budget`, `text` is treated as plain text (and that result is cached
+    by `detect` like any other, so that reposting the same text doesn't use up the budget again).
+    """
+    # shared, so that each pattern family is only tested once per line
+    features = LineFeatures()
+    deadline = detection_budget.deadline()
+    detectors = [
+        detector_class(text, features, deadline=deadline)
+        for detector_class in detector_registry.select(text)
+    ]
+
+    try:
+        return best_detection_result(detectors)
+    except DetectionBudgetExceeded:
+        detection_budget.exceeded += 1
+        return None
+
+
+def score(text: str) -> list[DetectionScore]:
+    """
+    Same as `detect_uncached`, but returns how each detector scored instead of the sections of the best one:
+    its confidence, and which pattern classified each line as code (useful for tuning the patterns).
+
+    :return: the score of each detector which ran, best first, or [] if detection ran out of time.
+    """
+    features = LineFeatures()
+    deadline = detection_budget.deadline()
+    detectors = [
+        detector_class(text, features, deadline=deadline)
+        for detector_class in detector_registry.select(text)
+    ]
+
+    try:
+        return score_detectors(detectors)
+    except DetectionBudgetExceeded:
+        detection_budget.exceeded += 1
+        return []
 
-def detect(text: str) -> tuple[str, tuple[DetectedSection, ...]] | None:
-    detectors = [detector_class(text) for detector_class in DETECTOR_CLASSES]
-    best_match = max(
-        detectors,
-        key=lambda d: (d.probable_lines_of_code, d.lines_of_code),
+
+# For messages which may be edited later, e.g. `incremental_detections.detect(message.id, message.content)`.
+# Shares `detection_cache` with `detect`.
+incremental_detections = IncrementalDetectionStore(
+    detector_registry,
+    cache=detection_cache,
+    max_messages=int(getenv("CODE_DETECTION_INCREMENTAL_STORE_SIZE", "256")),
+    budget=detection_budget,
+)
+
+# Large inputs are detected on a worker, so that they don't block the event loop.
+detection_executor = DetectionExecutor(
+    inline_max_lines=int(getenv("CODE_DETECTION_INLINE_MAX_LINES", "200")),
+    timeout=float(getenv("CODE_DETECTION_TIMEOUT_SECONDS", "10")),
+    use_processes=getenv("CODE_DETECTION_EXECUTOR", "thread") == "process",
+)
+
+
+async def detect_async(text: str, key: Hashable = None) -> DetectionResult:
+    """
+    Same as `detect(text)` (or `incremental_detections.detect(key, text)` if a `key` is given),
+    except large inputs are detected on a worker so that the event loop isn't blocked.
+
+    :raises TimeoutError: if detection took longer than `detection_executor.timeout`.
+    """
+    # weighted by the detectors which will run, since some languages are only detected in a few messages
+    cost = detector_registry.estimated_cost(text)
+
+    if detection_executor.use_processes and detection_executor.should_offload(
+        text,
+        cost,
+    ):
+        # the detection cache and the incremental store live in this process,
+        # so a worker process can only run a plain detection
+        found, result = detection_cache.lookup(text)
+        if not found:
+            result = await detection_executor.run(
+                text,
+                detect_uncached,
+                text,
+                cost=cost,
+            )
+            detection_cache.put(text, result)
+        return result
+
+    if key is None:
+        return await detection_executor.run(text, detect, text, cost=cost)
+
+    return await detection_executor.run(
+        text,
+        incremental_detections.detect,
+        key,
+        text,
+        cost=cost,
     )
 
-    if best_match.lines_of_code == 0:
+
+# attachments which are larger than this are never downloaded, and only this much of an attachment is detected
+max_attachment_bytes = int(getenv("CODE_DETECTION_MAX_ATTACHMENT_BYTES", "1048576"))
+
+# keyed by a digest of the attachment's bytes, so that the same file uploaded again isn't re-detected
+attachment_cache: DetectionCache[DetectionResult] = DetectionCache(
+    max_size=int(getenv("CODE_DETECTION_ATTACHMENT_CACHE_SIZE", "64")),
+)
+
+
+def detect_attachment(data: bytes) -> DetectionResult:
+    """
+    Same as `detect`, but for the content of a text attachment (see attachments.py).
+    Only the first `max_attachment_bytes` are detected, which bounds the memory used.
+    Results are cached in `attachment_cache`.
+    """
+    return attachment_cache.get(data[:max_attachment_bytes], detect_attachment_uncached)
+
+
+def detect_attachment_uncached(data: bytes) -> DetectionResult:
+    """
+    Streams the decoded lines of an attachment through the detectors whose trigger tokens occur in it.
+    Like messages, attachments which take longer than `detection_budget` are treated as plain text.
+    """
+    deadline = detection_budget.deadline()
+    specs = detector_registry.select_specs_in_chunks(decode_chunks(data))
+    try:
+        return detect_streaming(
+            [detector_registry.load(spec.name) for spec in specs],
+            data,
+            deadline,
+        )
+    except DetectionBudgetExceeded:
+        detection_budget.exceeded += 1
         return None
 
-    return best_match.language, best_match.detect()
+
+async def detect_attachment_async(data: bytes) -> DetectionResult:
+    """
+    Same as `detect_attachment(data)`, except large attachments are detected on a worker (see `detect_async`).
+
+    :raises TimeoutError: if detection took longer than `detection_executor.timeout`.
+    """
+    data = data[:max_attachment_bytes]
+
+    # looked up here rather than by the worker, since a worker process can't share the cache
+    found, result = attachment_cache.lookup(data)
+    if not found:
+        specs = detector_registry.select_specs_in_chunks(decode_chunks(data))
+        result = await detection_executor.run(
+            data,
+            detect_attachment_uncached,
+            data,
+            cost=sum(spec.cost for spec in specs),
+        )
+        attachment_cache.put(data, result)
+    return result
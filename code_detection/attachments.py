@@ -0,0 +1,111 @@
+"""
+Code detection for text attachments, e.g. the message.txt which Discord creates for long pastes, or uploaded source files.
+Attachments can be far longer than messages, so they are decoded a chunk at a time and detected with
+`DetectorBase.detect_stream`, which means that the decoded text is never held in memory all at once.
+Downloading them is left to the caller (see cogs/detect_code.py), which also caps their size.
+"""
+
+from __future__ import annotations
+
+import codecs
+from pathlib import PurePath
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .base import DetectedSection, DetectorBase
+
+    DetectionResult = tuple[str, tuple[DetectedSection, ...]] | None
+
+TEXT_ATTACHMENT_EXTENSIONS = frozenset(
+    {
+        ".txt",
+        ".log",
+        ".py",
+        ".js",
+        ".ts",
+        ".java",
+        ".c",
+        ".h",
+        ".cpp",
+        ".hpp",
+        ".cc",
+        ".sql",
+    },
+)
+
+
+def is_text_attachment(filename: str, content_type: str | None) -> bool:
+    """
+    :param content_type: the MIME type reported by Discord, which is missing for some uploads
+    """
+    if content_type is not None and content_type.startswith("text/"):
+        return True
+
+    return PurePath(filename).suffix.lower() in TEXT_ATTACHMENT_EXTENSIONS
+
+
+# the number of bytes of an attachment which are decoded at a time
+DECODE_CHUNK_BYTES = 64 * 1024
+
+
+def decode_chunks(data: bytes) -> Iterator[str]:
+    """
+    Decodes an attachment a chunk at a time.
+    Attachments are almost always UTF-8 (possibly with a BOM, if saved by Notepad).
+    Anything else is decoded with replacement characters, since the code in it may still be detectable.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    view = memoryview(data)
+    for start in range(0, len(view), DECODE_CHUNK_BYTES):
+        yield decoder.decode(view[start : start + DECODE_CHUNK_BYTES])
+    yield decoder.decode(b"", final=True)
+
+
+def decode_lines(data: bytes) -> Iterator[str]:
+    """
+    :return: the lines of the decoded attachment (see `decode_chunks`), each with its line ending.
+    """
+    partial_line = ""
+    for chunk in decode_chunks(data):
+        lines = (partial_line + chunk).split("\n")
+        partial_line = lines.pop()
+        for line in lines:
+            yield f"{line}\n"
+
+    if partial_line:
+        yield partial_line
+
+
+def detect_streaming(
+    detector_classes: Iterable[type[DetectorBase]],
+    data: bytes,
+    deadline: float | None = None,
+) -> DetectionResult:
+    """
+    Same as `best_detection_result` (see incremental.py), except each detector streams over the decoded lines of
+    the attachment `data`. Only the bytes of the attachment are held in memory, so its size bounds the memory used.
+
+    :return: (language, sections) of the detector which found the most code, or None if none of them found any.
+    :raises DetectionBudgetExceeded: if the detectors are still running at `deadline` (see budget.py).
+    """
+    best_result: DetectionResult = None
+    best_key = (0, 0)
+    for detector_class in detector_classes:
+        sections = tuple(detector_class.detect_stream(decode_lines(data), deadline))
+        code_sections = [section for section in sections if section.is_code]
+        key = (
+            sum(section.probable_lines_of_code for section in code_sections),
+            sum(section.n_lines for section in code_sections),
+        )
+
+        # ties go to the first detector, like `max` in `best_detection_result`
+        if best_result is None or key > best_key:
+            best_result = detector_class.language, sections
+            best_key = key
+
+    if best_key[1] == 0:
+        return None
+
+    return best_result
@@ -1,8 +1,23 @@
 from __future__ import annotations
 
+import difflib
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import TYPE_CHECKING, ClassVar
+
+from .budget import DetectionBudgetExceeded
+from .features import LineFeatures
+from .merging import merge_short_runs
+from .prefilter import prefilter_stats
+from .scoring import confidence
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .features import FeatureHit
 
 
 class Classification(Enum):
@@ -10,11 +25,53 @@ class Classification(Enum):
     CODE = "c"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
+class LineBuffer:
+    """
+    The lines of a text, shared by all of the sections detected in it.
+    """
+
+    lines: tuple[str, ...]
+    probability: array[int]  # 1 if the line is probably code, 0 if plausibly
+    hits: tuple[FeatureHit | None, ...]  # the pattern which made the line code, if any
+
+    @classmethod
+    def empty(cls: type[LineBuffer]) -> LineBuffer:
+        return cls(lines=(), probability=array("b"), hits=())
+
+
+@dataclass(frozen=True, eq=False)
 class DetectedSection:
+    """
+    A view of the lines[start:end] of a `LineBuffer`, so that merging sections never copies any lines.
+    """
+
     classification: Classification
-    lines: tuple[str, ...]
-    line_probability: tuple[bool, ...]  # True if probable, False if plausible
+    buffer: LineBuffer = field(repr=False)
+    start: int
+    end: int
+
+    @property
+    def lines(self) -> tuple[str, ...]:
+        return self.buffer.lines[self.start : self.end]
+
+    @property
+    def line_probability(self) -> tuple[bool, ...]:
+        """
+        True if probable, False if plausible
+        """
+        return tuple(map(bool, self.buffer.probability[self.start : self.end]))
+
+    @property
+    def line_hits(self) -> tuple[FeatureHit | None, ...]:
+        """
+        (family, pattern) which classified each line as code, or None (e.g. for blank lines and plain text)
+        """
+        return self.buffer.hits[self.start : self.end]
+
+    @property
+    def n_lines(self) -> int:
+        return self.end - self.start
 
     @property
     def is_plain_text(self) -> bool:
@@ -27,16 +84,18 @@ class DetectedSection:
     @property
     def text(self) -> str:
         # there is little to no purpose for blank lines at the start or end of a section
-        lines = list(self.lines)
-        for end in (0, -1):
-            while lines and (not lines[end] or lines[end].isspace()):
-                del lines[end]
+        lines = self.buffer.lines
+        start, end = self.start, self.end
+        while start < end and (not lines[start] or lines[start].isspace()):
+            start += 1
+        while end > start and (not lines[end - 1] or lines[end - 1].isspace()):
+            end -= 1
 
-        return "\n".join(lines)
+        return "\n".join(lines[start:end])
 
     @property
     def probable_lines_of_code(self) -> int:
-        return sum(self.line_probability)
+        return sum(self.buffer.probability[self.start : self.end])
 
     def debug(self) -> str:
         """
@@ -44,20 +103,57 @@ class DetectedSection:
         - "8p" => 8 lines of plain text
         - "13c" => 13 lines of code
         """
-        return f"{len(self.lines)}{self.classification.value}"
+        return f"{self.n_lines}{self.classification.value}"
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DetectedSection):
+            return NotImplemented
+        return (
+            self.classification is other.classification
+            and self.lines == other.lines
+            and self.buffer.probability[self.start : self.end]
+            == other.buffer.probability[other.start : other.end]
+        )
 
-class DetectorBase(ABC):
-    def __init__(self: DetectorBase, text: str) -> None:
-        self.text = text
+    def __hash__(self) -> int:
+        return hash((self.classification, self.lines))
 
-    @property
-    @abstractmethod
-    def language(self) -> str:
-        """
-        The language that this Detector detects. Should be compatible with discord markdown codeblocks.
-        Specifically, f"```{detector.language}\n{code}```" should enable correct syntax highlighting.
+
+class DetectorBase(ABC):
+    def __init__(
+        self: DetectorBase,
+        text: str,
+        features: LineFeatures | None = None,
+        previous: DetectorBase | None = None,
+        deadline: float | None = None,
+    ) -> None:
+        """
+        Pass the same `features` to every detector of `text`, so that they can share their per-line results.
+        If `text` is an edited version of the text of `previous` (a detector of the same class),
+        only the lines which changed will be reclassified.
+        If the lines are still being classified at `deadline` (a `time.perf_counter()` value),
+        `DetectionBudgetExceeded` is raised (see budget.py).
         """
+        self.text = text
+        self.features = LineFeatures() if features is None else features
+        self.previous = previous
+        self.deadline = deadline
+
+        # (classification, probable) of each line, filled in by `classify_lines`
+        self.lines: list[str] = []
+        self.line_classifications: list[Classification] = []
+        self.line_probability: list[bool] = []
+        self.line_hits: list[FeatureHit | None] = []  # see `LineBuffer.hits`
+        self.lines_reclassified = 0
+        self.prefilter_rejected = False  # see `might_contain_code`
+
+        # shared by every section, filled in by `classify_lines`
+        self.buffer = LineBuffer.empty()
+
+    # The language that this Detector detects. Should be compatible with discord markdown codeblocks.
+    # Specifically, f"```{detector.language}\n{code}```" should enable correct syntax highlighting.
+    # A class attribute, so that it can be read without creating a detector.
+    language: ClassVar[str]
 
     @property
     def min_code_lines_in_a_row(self) -> int:
@@ -80,6 +176,29 @@ class DetectorBase(ABC):
         """
         return 2
 
+    @property
+    def max_line_length(self) -> int:
+        """
+        Only the first `max_line_length` characters of a line are classified.
+        Some patterns take time quadratic in the length of the line they are matched against,
+        so this keeps a single (possibly malicious) long line from stalling detection.
+        """
+        return 500
+
+    @property
+    def stream_flush_lines(self) -> int:
+        """
+        Once `detect_stream` sees this many lines of plain text in a row, it detects and yields everything so far.
+        """
+        return 20
+
+    @property
+    def stream_max_chunk_lines(self) -> int:
+        """
+        `detect_stream` never holds more lines than this, even if there isn't enough plain text to flush them.
+        """
+        return 5000
+
     @abstractmethod
     def line_is_probably_code(self: DetectorBase, line: str) -> bool:
         """
@@ -96,6 +215,25 @@ class DetectorBase(ABC):
         """
         return False
 
+    def line_might_be_code(self: DetectorBase, line: str) -> bool:
+        """
+        A cheap (no regex) version of `line_is_probably_code`, used by `might_contain_code`.
+        It MUST return True for every line that `line_is_probably_code` returns True for,
+        but may also return True for lines which aren't code.
+        """
+        return True
+
+    def might_contain_code(self: DetectorBase, lines: list[str]) -> bool:
+        """
+        Runs before any line is classified. If this returns False, every line is classified as plain text
+        without testing any patterns, so it must only return False if no line could be classified as code.
+        """
+        # fewer lines than this are always merged into a single plain text section
+        if len(lines) < self.min_code_lines_in_a_row:
+            return False
+
+        return any(map(self.line_might_be_code, lines))
+
     def line_is_plausibly_code(self: DetectorBase, line: str) -> bool:
         """
         Returns True if an only if the line of text _could_ be code (but could also not be).
@@ -124,101 +262,163 @@ class DetectorBase(ABC):
 
         return Classification.CODE if is_code else Classification.PLAIN_TEXT, probable
 
+    def classify_line_range(self: DetectorBase, start: int, end: int) -> None:
+        """
+        Classifies lines[start:end], appending to `line_classifications`, `line_probability` and `line_hits`.
+        Each line is classified in the context of the line before it.
+
+        :raises DetectionBudgetExceeded: if `deadline` passes before all of the lines are classified.
+        """
+        max_line_length = self.max_line_length
+        features = self.features
+        for i in range(start, end):
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise DetectionBudgetExceeded
+
+            # set by the pattern family which classifies the line as code (if any)
+            features.last_hit = None
+            line = self.lines[i][:max_line_length]
+            if i == 0:
+                # special case for first line
+                probable = True
+                classification = (
+                    Classification.CODE
+                    if self.line_is_probably_code(line)
+                    else Classification.PLAIN_TEXT
+                )
+            else:
+                classification, probable = self.classify_line(
+                    self.line_classifications[-1],
+                    line,
+                )
+
+            self.line_classifications.append(classification)
+            self.line_probability.append(probable)
+            self.line_hits.append(
+                features.last_hit if classification is Classification.CODE else None,
+            )
+
+        self.lines_reclassified += end - start
+
+    def reclassify_edited_lines(self: DetectorBase, previous: DetectorBase) -> None:
+        """
+        Classifies the lines by reusing the classifications of `previous` wherever possible.
+        An unchanged line keeps its old classification as long as the line before it also has the same classification,
+        because a line's classification only depends on its content and the classification of the line before.
+        """
+        matcher = difflib.SequenceMatcher(None, previous.lines, self.lines)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                self.classify_line_range(j1, j2)
+                continue
+
+            for offset in range(i2 - i1):
+                i, j = i1 + offset, j1 + offset
+                if (i == j == 0) or (
+                    i > 0
+                    and j > 0
+                    and self.line_classifications[-1]
+                    is previous.line_classifications[i - 1]
+                ):
+                    # back in sync with the previous text; the rest of this block is unchanged
+                    self.line_classifications += previous.line_classifications[i:i2]
+                    self.line_probability += previous.line_probability[i:i2]
+                    self.line_hits += previous.line_hits[i:i2]
+                    break
+
+                self.classify_line_range(j, j + 1)
+
     def classify_lines(self) -> list[DetectedSection]:
         """
         Simply classifies each line of the text without applying any section-size limits.
         """
-        lines = self.text.splitlines()
+        lines = self.lines = self.text.splitlines()
+        self.line_classifications = []
+        self.line_probability = []
+        self.line_hits = []
         if not lines:
+            self.buffer = LineBuffer.empty()
             return []
 
-        sections: list[DetectedSection] = []
-
-        # special case for first line
-        line = lines.pop(0)
-        if self.line_is_probably_code(line):
-            current_section = DetectedSection(
-                classification=Classification.CODE,
-                lines=(line,),
-                line_probability=(True,),
-            )
+        self.prefilter_rejected = not self.might_contain_code(lines)
+        prefilter_stats.record(type(self).__name__, rejected=self.prefilter_rejected)
+
+        if self.prefilter_rejected:
+            # every line ends up in a single plain text section anyway
+            # NOTE: texts with too few lines are rejected even if some of their lines are code,
+            # so these classifications must not be reused when the text is edited
+            self.line_classifications = [Classification.PLAIN_TEXT] * len(lines)
+            self.line_probability = [True] * len(lines)
+            self.line_hits = [None] * len(lines)
+        elif self.previous is None or self.previous.prefilter_rejected:
+            self.classify_line_range(0, len(lines))
         else:
-            current_section = DetectedSection(
-                classification=Classification.PLAIN_TEXT,
-                lines=(line,),
-                line_probability=(True,),
-            )
+            self.reclassify_edited_lines(self.previous)
 
-        # rest of the lines...
-        for line in lines:
-            classification, probable = self.classify_line(
-                current_section.classification,
-                line,
-            )
-            if classification != current_section.classification:
-                sections.append(current_section)
-                current_section = DetectedSection(
-                    classification=classification,
-                    lines=(line,),
-                    line_probability=(probable,),
-                )
+        # don't keep a chain of every previous version alive
+        self.previous = None
+
+        classifications = self.line_classifications
+        line_probability = self.line_probability
+
+        # runs of lines with the same classification, as [classification, start, end] index ranges
+        runs: list[list] = []
+        for i, classification in enumerate(classifications):
+            if runs and runs[-1][0] is classification:
+                runs[-1][2] = i + 1
             else:
-                current_section = DetectedSection(
-                    classification=classification,
-                    lines=(*current_section.lines, line),
-                    line_probability=(*current_section.line_probability, probable),
-                )
-        sections.append(current_section)
+                runs.append([classification, i, i + 1])
 
         # remove blank lines from the end of code blocks and
         # move them to succeeding plain text sections
-        for i in range(len(sections) - 1):
-            section = sections[i]
-            if not section.is_code:
+        for i in range(len(runs) - 1):
+            classification, start, end = runs[i]
+            if classification is not Classification.CODE:
                 continue
 
-            n_blank_lines = 0
-            while n_blank_lines < len(section.lines):
-                line = section.lines[-1 - n_blank_lines]
-                if line and not line.isspace():
-                    break
-                n_blank_lines += 1
-
-            if n_blank_lines > 0:
-                sections[i] = DetectedSection(
-                    classification=Classification.CODE,
-                    lines=section.lines[:-n_blank_lines],
-                    line_probability=current_section.line_probability[:-n_blank_lines],
-                )
-                sections[i + 1] = DetectedSection(
-                    classification=Classification.PLAIN_TEXT,
-                    lines=section.lines[-n_blank_lines:] + sections[i + 1].lines,
-                    line_probability=(
-                        section.line_probability[-n_blank_lines:]
-                        + sections[i + 1].line_probability
-                    ),
-                )
+            while end > start and (not lines[end - 1] or lines[end - 1].isspace()):
+                end -= 1
+            runs[i][2] = runs[i + 1][1] = end
 
-        return sections
+        self.buffer = LineBuffer(
+            lines=tuple(lines),
+            probability=array("b", line_probability),
+            hits=tuple(self.line_hits),
+        )
+        return [
+            DetectedSection(
+                classification=classification,
+                buffer=self.buffer,
+                start=start,
+                end=end,
+            )
+            for classification, start, end in runs
+        ]
 
     def section_too_short(self: DetectorBase, section: DetectedSection) -> bool:
         """
         Utility method to check if the section is shorter than the required minimums.
         """
         if section.is_code:
-            return len(section.lines) < self.min_code_lines_in_a_row
-        return len(section.lines) < self.min_plain_text_lines_in_a_row
+            return section.n_lines < self.min_code_lines_in_a_row
+        return section.n_lines < self.min_plain_text_lines_in_a_row
 
     def reduce_section_group(
         self: DetectorBase,
         sections: list[DetectedSection],
+        start: int = 0,
     ) -> DetectedSection:
         """
-        Simply merges a group of sections into a single section.
+        Simply merges a group of adjacent sections into a single section.
         The resultant `classification` is a simple MODE of the input sections' lines.
+
+        :param start: Where an empty group (which produces an empty section) starts in the text.
         """
-        lines_of_code = sum(len(s.lines) for s in sections if s.is_code)
-        lines_of_plain_text = sum(len(s.lines) for s in sections if s.is_plain_text)
+        lines_of_code = sum(s.n_lines for s in sections if s.is_code)
+        lines_of_plain_text = sum(s.n_lines for s in sections if s.is_plain_text)
+
+        if sections:
+            start = sections[0].start
 
         return DetectedSection(
             classification=(
@@ -226,10 +426,9 @@ class DetectorBase(ABC):
                 if lines_of_code >= lines_of_plain_text
                 else Classification.PLAIN_TEXT
             ),
-            lines=tuple(line for section in sections for line in section.lines),
-            line_probability=tuple(
-                lp for section in sections for lp in section.line_probability
-            ),
+            buffer=self.buffer,
+            start=start,
+            end=sections[-1].end if sections else start,
         )
 
     def merge_short_sections(
@@ -237,6 +436,44 @@ class DetectorBase(ABC):
         sections: list[DetectedSection],
     ) -> list[DetectedSection]:
         """
+        Merges together sections which are too short, see `merge_short_sections_reference` for the rules.
+        The merging is done over the run lengths of the sections (see merging.py), which takes linear time,
+        and produces exactly the same sections as `merge_short_sections_reference`.
+        """
+        is_code = array("b", [section.is_code for section in sections])
+        lengths = array("q", [section.n_lines for section in sections])
+        merged_is_code, merged_lengths = merge_short_runs(
+            is_code,
+            lengths,
+            self.min_code_lines_in_a_row,
+            self.min_plain_text_lines_in_a_row,
+        )
+
+        merged_sections: list[DetectedSection] = []
+        start = sections[0].start if sections else 0
+        for code, length in zip(merged_is_code, merged_lengths):
+            merged_sections.append(
+                DetectedSection(
+                    classification=(
+                        Classification.CODE if code else Classification.PLAIN_TEXT
+                    ),
+                    buffer=self.buffer,
+                    start=start,
+                    end=start + length,
+                ),
+            )
+            start += length
+
+        return merged_sections
+
+    def merge_short_sections_reference(
+        self: DetectorBase,
+        sections: list[DetectedSection],
+    ) -> list[DetectedSection]:
+        """
+        The original implementation of `merge_short_sections`, which is kept as a readable reference of the rules.
+        It is quadratic in the number of sections, because of how it inserts into & deletes from the middle of lists.
+
         Merges together sections which are too short
         For example in this input:
         3 code lines
@@ -266,15 +503,14 @@ class DetectorBase(ABC):
 
         if (
             not sections
-            or sum(len(s.lines) for s in sections) < self.min_code_lines_in_a_row
+            or sum(s.n_lines for s in sections) < self.min_code_lines_in_a_row
         ):
             return [
                 DetectedSection(
                     classification=Classification.PLAIN_TEXT,
-                    lines=tuple(line for section in sections for line in section.lines),
-                    line_probability=tuple(
-                        lp for section in sections for lp in section.line_probability
-                    ),
+                    buffer=self.buffer,
+                    start=sections[0].start if sections else 0,
+                    end=sections[-1].end if sections else 0,
                 ),
             ]
 
@@ -308,7 +544,10 @@ class DetectorBase(ABC):
                 adjacent_short_sections_group.append(section)
             else:
                 merged_short_sections.append(
-                    self.reduce_section_group(adjacent_short_sections_group),
+                    self.reduce_section_group(
+                        adjacent_short_sections_group,
+                        start=section.start,
+                    ),
                 )
                 adjacent_short_sections_group.clear()
                 merged_short_sections.append(section)
@@ -377,10 +616,9 @@ class DetectorBase(ABC):
                 merged_sections[:2] = (
                     DetectedSection(
                         classification=Classification.PLAIN_TEXT,
-                        lines=before.lines + after.lines,
-                        line_probability=(
-                            before.line_probability + after.line_probability
-                        ),
+                        buffer=self.buffer,
+                        start=before.start,
+                        end=after.end,
                     ),
                 )
 
@@ -391,10 +629,9 @@ class DetectorBase(ABC):
                 merged_sections[-2:] = (
                     DetectedSection(
                         classification=Classification.PLAIN_TEXT,
-                        lines=before.lines + after.lines,
-                        line_probability=(
-                            before.line_probability + after.line_probability
-                        ),
+                        buffer=self.buffer,
+                        start=before.start,
+                        end=after.end,
                     ),
                 )
 
@@ -427,10 +664,16 @@ class DetectorBase(ABC):
         while i < len(sections) - 1:
             section = sections[i]
             if section.is_plain_text and self.block_is_probably_code(section.text):
+                # the buffer belongs to this detector, so its probabilities can be overwritten
+                self.buffer.probability[section.start : section.end] = array(
+                    "b",
+                    [1] * section.n_lines,
+                )
                 sections[i] = DetectedSection(
                     classification=Classification.CODE,
-                    lines=section.lines,
-                    line_probability=(True,) * len(section.lines),
+                    buffer=self.buffer,
+                    start=section.start,
+                    end=section.end,
                 )
                 sections[i - 1 : i + 2] = (
                     self.reduce_section_group(sections[i - 1 : i + 2]),
@@ -457,12 +700,77 @@ class DetectorBase(ABC):
             self._cached_detection_result = tuple(self.detect_uncached())
         return self._cached_detection_result
 
+    @classmethod
+    def detect_stream(
+        cls: type[DetectorBase],
+        lines: Iterable[str],
+        deadline: float | None = None,
+    ) -> Iterator[DetectedSection]:
+        """
+        Same as `detect`, but for an iterable of lines (e.g. an attachment or an open file) which is never held
+        in memory all at once. Trailing newlines are removed from the lines.
+        The lines are detected in chunks, which end after `stream_flush_lines` lines of plain text in a row
+        (or at `stream_max_chunk_lines` lines), and each chunk's sections are yielded as soon as it ends.
+        Sections are never merged across chunks, which is the only way the result can differ from `detect`.
+        The `start` and `end` of each section are relative to its chunk.
+
+        :raises DetectionBudgetExceeded: if `deadline` passes before all of the lines are detected (see `__init__`).
+        """
+        # only used to classify lines one at a time, so that the chunks can be split at plain text
+        classifier = cls("", deadline=deadline)
+        chunk: list[str] = []
+        previous_classification = Classification.PLAIN_TEXT
+        plain_text_lines_in_a_row = 0
+
+        for line in lines:
+            if deadline is not None and time.perf_counter() > deadline:
+                raise DetectionBudgetExceeded
+
+            line = line.rstrip("\r\n")
+            chunk.append(line)
+
+            # classifying a line after plain text is the same as classifying the first line of a chunk
+            previous_classification, _ = classifier.classify_line(
+                previous_classification,
+                line[: classifier.max_line_length],
+            )
+            if previous_classification is Classification.PLAIN_TEXT:
+                plain_text_lines_in_a_row += 1
+            else:
+                plain_text_lines_in_a_row = 0
+
+            if (
+                plain_text_lines_in_a_row >= classifier.stream_flush_lines
+                or len(chunk) >= classifier.stream_max_chunk_lines
+            ):
+                # the chunk's lines were already matched, so its detector reuses their results
+                yield from cls.detect_chunk(chunk, classifier.features, deadline)
+
+                chunk = []
+                classifier.features = LineFeatures()
+                previous_classification = Classification.PLAIN_TEXT
+                plain_text_lines_in_a_row = 0
+
+        if chunk:
+            yield from cls.detect_chunk(chunk, classifier.features, deadline)
+
+    @classmethod
+    def detect_chunk(
+        cls: type[DetectorBase],
+        lines: list[str],
+        features: LineFeatures,
+        deadline: float | None = None,
+    ) -> tuple[DetectedSection, ...]:
+        # every line is terminated, otherwise a blank last line would be lost by `splitlines`
+        text = "".join(f"{line}\n" for line in lines)
+        return cls(text, features, deadline=deadline).detect()
+
     @property
     def lines_of_code(self) -> int:
         """
         The total number of lines of code that were detected.
         """
-        return sum(len(s.lines) for s in self.detect() if s.is_code)
+        return sum(s.n_lines for s in self.detect() if s.is_code)
 
     @property
     def probable_lines_of_code(self) -> float:
@@ -476,6 +784,13 @@ class DetectorBase(ABC):
             if section.is_code
         )
 
+    @property
+    def confidence(self) -> float:
+        """
+        How likely it is that the detected code really is code, see `scoring.confidence`.
+        """
+        return confidence(self.detect())
+
     def debug(self) -> str:
         """
         A simple string that describes the detection result. Useful for testing.
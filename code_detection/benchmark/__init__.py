@@ -0,0 +1,295 @@
+"""
+Benchmarks for code_detection. Run `python run_benchmarks.py --help` from the root directory.
+
+For every corpus (see corpora.py), `code_detection.detect` and each detector class are measured for:
+- throughput, in lines per second
+- p50 / p95 / p99 latency per message
+- peak memory allocated while processing a single message (measured in a separate pass with tracemalloc)
+- the fraction of messages rejected by the detectors' prefilters (see `DetectorBase.might_contain_code`)
+Results can be saved to a JSON file, and later runs compared against it to flag regressions.
+With --profile-patterns, each corpus is also detected once more with every pattern profiled (see profiling.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import code_detection
+from code_detection.prefilter import prefilter_stats
+from code_detection.profiling import pattern_profiler
+
+from .corpora import CORPORA, load_corpus
+
+if TYPE_CHECKING:
+    from code_detection.base import DetectorBase
+
+
+@dataclass
+class BenchmarkResult:
+    corpus: str
+    target: str
+    messages: int
+    lines: int
+    lines_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_memory_kib: float
+    prefilter_rejection_rate: float = 0.0
+
+
+# (metric, True if higher is better)
+COMPARED_METRICS = [
+    ("lines_per_second", True),
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+    ("peak_memory_kib", False),
+]
+
+
+def benchmark_targets() -> dict[str, Callable[[str], object]]:
+    """
+    The functions to benchmark, keyed by name.
+    `detect` is benchmarked uncached, otherwise it would only measure the cache.
+    """
+    targets: dict[str, Callable[[str], object]] = {
+        "detect": code_detection.detect_uncached,
+    }
+    for detector_class in code_detection.detector_registry.load_all():
+        targets[detector_class.__name__] = detector_class_target(detector_class)
+
+    return targets
+
+
+def detector_class_target(
+    detector_class: type[DetectorBase],
+) -> Callable[[str], object]:
+    return lambda text: detector_class(text).detect()
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(round(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def measure(
+    corpus: str,
+    target: str,
+    func: Callable[[str], object],
+    messages: list[str],
+    repetitions: int,
+    measure_memory: bool,
+) -> BenchmarkResult:
+    latencies_ms: list[float] = []
+    total_seconds = 0.0
+    prefilter_stats.clear()
+    for _ in range(repetitions):
+        for message in messages:
+            before = time.perf_counter_ns()
+            func(message)
+            elapsed = time.perf_counter_ns() - before
+            latencies_ms.append(elapsed / 1_000_000)
+            total_seconds += elapsed / 1_000_000_000
+
+    prefilter_rejection_rate = prefilter_stats.rejection_rate()
+
+    peak_memory = 0
+    if measure_memory:
+        tracemalloc.start()
+        for message in messages:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func(message)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_memory = max(peak_memory, peak - baseline)
+        tracemalloc.stop()
+
+    n_lines = sum(len(message.splitlines()) for message in messages)
+    latencies_ms.sort()
+    return BenchmarkResult(
+        corpus=corpus,
+        target=target,
+        messages=len(messages),
+        lines=n_lines,
+        lines_per_second=n_lines * repetitions / total_seconds if total_seconds else 0,
+        p50_ms=percentile(latencies_ms, 50),
+        p95_ms=percentile(latencies_ms, 95),
+        p99_ms=percentile(latencies_ms, 99),
+        peak_memory_kib=peak_memory / 1024,
+        prefilter_rejection_rate=prefilter_rejection_rate,
+    )
+
+
+def run_benchmarks(
+    corpora: list[str] | None = None,
+    targets: list[str] | None = None,
+    repetitions: int = 3,
+    measure_memory: bool = True,
+) -> list[BenchmarkResult]:
+    all_targets = benchmark_targets()
+    results: list[BenchmarkResult] = []
+    for corpus in corpora or list(CORPORA):
+        messages = load_corpus(corpus)
+        for target in targets or list(all_targets):
+            results.append(
+                measure(
+                    corpus,
+                    target,
+                    all_targets[target],
+                    messages,
+                    repetitions,
+                    measure_memory,
+                ),
+            )
+            print_result(results[-1])
+
+    return results
+
+
+def profile_patterns(corpora: list[str] | None = None) -> None:
+    """
+    Detects every message of the corpora with the pattern profiler enabled, adding to its profiles.
+    This is a separate pass, since profiling is far slower than normal detection.
+    """
+    pattern_profiler.enabled = True
+    try:
+        for corpus in corpora or list(CORPORA):
+            for message in load_corpus(corpus):
+                code_detection.detect_uncached(message)
+    finally:
+        pattern_profiler.enabled = False
+
+
+def print_header() -> None:
+    print(
+        f"{'corpus':<16}{'target':<26}{'lines/s':>12}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>11}{'rejected':>10}",
+    )
+
+
+def print_result(result: BenchmarkResult) -> None:
+    print(
+        f"{result.corpus:<16}{result.target:<26}{result.lines_per_second:>12,.0f}"
+        f"{result.p50_ms:>10.3f}{result.p95_ms:>10.3f}{result.p99_ms:>10.3f}"
+        f"{result.peak_memory_kib:>11,.1f}{result.prefilter_rejection_rate:>10.0%}",
+    )
+
+
+def save_results(results: list[BenchmarkResult], path: Path) -> None:
+    path.write_text(json.dumps([asdict(result) for result in results], indent=2))
+
+
+def load_results(path: Path) -> list[BenchmarkResult]:
+    return [BenchmarkResult(**result) for result in json.loads(path.read_text())]
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: list[BenchmarkResult],
+    tolerance: float,
+) -> list[str]:
+    """
+    :return: A description of every metric which is more than `tolerance` (e.g. 0.2 = 20%) worse than the baseline.
+    """
+    baseline_by_key = {(result.corpus, result.target): result for result in baseline}
+    regressions: list[str] = []
+    for result in results:
+        old = baseline_by_key.get((result.corpus, result.target))
+        if old is None:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS:
+            old_value = getattr(old, metric)
+            new_value = getattr(result, metric)
+            if not old_value:
+                continue
+
+            change = (new_value - old_value) / old_value
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{result.corpus} / {result.target}: {metric} "
+                    f"{old_value:,.3f} -> {new_value:,.3f} ({change:+.0%})",
+                )
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    :return: The exit code; 1 if any regressions were found against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark code_detection.")
+    parser.add_argument("--corpus", action="append", choices=list(CORPORA))
+    parser.add_argument("--target", action="append")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip the (slow) peak memory measurement",
+    )
+    parser.add_argument("--save", type=Path, help="save the results to a JSON file")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="compare the results against a JSON file from --save",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="how much worse than the baseline a metric may be (default 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--profile-patterns",
+        action="store_true",
+        help="profile how often each pattern matches, and how long it takes",
+    )
+    parser.add_argument(
+        "--save-pattern-profile",
+        type=Path,
+        help="save the pattern profiles to a JSON file (implies --profile-patterns)",
+    )
+    args = parser.parse_args(argv)
+
+    print_header()
+    results = run_benchmarks(
+        corpora=args.corpus,
+        targets=args.target,
+        repetitions=args.repetitions,
+        measure_memory=not args.no_memory,
+    )
+
+    if args.save:
+        save_results(results, args.save)
+        print(f"\nSaved results to {args.save}")
+
+    if args.profile_patterns or args.save_pattern_profile:
+        pattern_profiler.clear()
+        profile_patterns(args.corpus)
+        print(f"\n{pattern_profiler.dump(limit=25)}")
+        if args.save_pattern_profile:
+            pattern_profiler.save(args.save_pattern_profile)
+            print(f"\nSaved pattern profiles to {args.save_pattern_profile}")
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} REGRESSIONS against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+
+    return 0
@@ -0,0 +1,208 @@
+"""
+Synthetic corpora of realistic Discord messages for benchmarking.
+Every corpus is generated from a fixed seed, so results are comparable between runs.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from typing import Callable
+
+SEED = 20240101
+
+PROSE_SENTENCES = [
+    "hey everyone, does anyone know how to solve this?",
+    "I've been stuck on this homework question for two hours now",
+    "My teacher said that we need to use recursion but I don't get it",
+    "can someone explain what a derivative actually is",
+    "thanks so much, that makes a lot more sense now!",
+    "The question asks us to find the area under the curve between 0 and 5.",
+    "I tried looking it up online but all the answers are way too complicated",
+    "Is it okay if I DM you later about this?",
+    "what's the difference between mitosis and meiosis",
+    "ok nvm I figured it out, I forgot to carry the 2",
+    "We have an exam tomorrow and I still don't understand how to balance equations.",
+    "Could you check if my essay introduction makes sense?",
+    "does anyone have good resources for learning python",
+    "I think the answer is C but I'm not sure why",
+    "lol same, my professor never explains anything",
+]
+
+SNIPPETS = [
+    """\
+def add(a, b):
+    return a + b
+
+print(add(1, 2))""",
+    """\
+for i in range(10):
+    if i % 2 == 0:
+        print(i)""",
+    """\
+import random
+
+numbers = [random.randint(1, 100) for _ in range(10)]
+numbers.sort()
+print(numbers)""",
+    """\
+class Dog:
+    def __init__(self, name):
+        self.name = name
+
+    def bark(self):
+        print(f"{self.name} says woof")""",
+    """\
+while True:
+    answer = input("Guess: ")
+    if answer == secret:
+        break""",
+    """\
+try:
+    value = int(text)
+except ValueError:
+    value = 0""",
+]
+
+TRACEBACK_FRAMES = [
+    (
+        '  File "/home/student/project/main.py", line {line}, in <module>',
+        "    result = solve(data)",
+    ),
+    (
+        '  File "/home/student/project/solver.py", line {line}, in solve',
+        "    return helper(values[index])",
+    ),
+    (
+        '  File "C:\\Users\\student\\AppData\\Local\\Programs\\Python\\Python311\\Lib\\json\\decoder.py", line {line}, in decode',
+        "    obj, end = self.raw_decode(s, idx=_w(s, 0).end())",
+    ),
+    (
+        '  File "/usr/lib/python3.11/site-packages/requests/api.py", line {line}, in get',
+        '    return request("get", url, params=params, **kwargs)',
+    ),
+]
+
+TRACEBACK_ERRORS = [
+    "IndexError: list index out of range",
+    "KeyError: 'name'",
+    "TypeError: unsupported operand type(s) for +: 'int' and 'str'",
+    "ValueError: invalid literal for int() with base 10: 'abc'",
+    "RecursionError: maximum recursion depth exceeded while calling a Python object",
+]
+
+
+# Lines are made by repeating a unit after one of the prefixes, e.g. "for " followed by a very long identifier.
+# Patterns with nested or adjacent quantifiers can backtrack for a very long time over lines like these.
+ADVERSARIAL_PREFIXES = [
+    "",
+    "for ",
+    "x = ",
+    "(",
+    "class ",
+    "await ",
+    "a.",
+    "const ",
+    "public ",
+    "SELECT ",
+    '  File "main.py", line 1, in ',
+]
+ADVERSARIAL_UNITS = [
+    "a",
+    "ab",
+    "a1",
+    "e",
+    "a, ",
+    "a ,",
+    "(a)",
+    "[a]",
+    "a.",
+    "if ",
+    "  ",
+]
+ADVERSARIAL_SUFFIXES = ["", "!", " x", ":", " in", " in x", "=", "=>", "{", ";"]
+DISCORD_MESSAGE_MAX_LENGTH = 2000
+
+
+def prose_message(rng: random.Random) -> str:
+    return "\n".join(rng.sample(PROSE_SENTENCES, rng.randint(1, 4)))
+
+
+def traceback_message(rng: random.Random, n_frames: int) -> str:
+    lines = ["Traceback (most recent call last):"]
+    for _ in range(n_frames):
+        file_line, code_line = rng.choice(TRACEBACK_FRAMES)
+        lines += [file_line.format(line=rng.randint(1, 999)), code_line]
+    lines.append(rng.choice(TRACEBACK_ERRORS))
+    return "\n".join(lines)
+
+
+def prose(rng: random.Random) -> list[str]:
+    return [prose_message(rng) for _ in range(500)]
+
+
+def short_snippets(rng: random.Random) -> list[str]:
+    return [
+        f"{rng.choice(PROSE_SENTENCES)}\n{rng.choice(SNIPPETS)}" for _ in range(300)
+    ]
+
+
+def long_tracebacks(rng: random.Random) -> list[str]:
+    return [traceback_message(rng, rng.randint(20, 200)) for _ in range(30)]
+
+
+def mixed(rng: random.Random) -> list[str]:
+    messages = []
+    for _ in range(200):
+        parts = [prose_message(rng), rng.choice(SNIPPETS), prose_message(rng)]
+        if rng.random() < 0.5:
+            parts.insert(2, traceback_message(rng, rng.randint(1, 10)))
+        messages.append("\n\n".join(parts))
+    return messages
+
+
+# renamed in large pastes, so that (like a real paste) most of the lines are distinct
+SNIPPET_VARIABLES = re.compile(r"\b(a|b|i|value|numbers|answer|name|text|result)\b")
+
+
+def large_pastes(rng: random.Random) -> list[str]:
+    messages = []
+    for _ in range(3):
+        lines: list[str] = []
+        while len(lines) < 5000:
+            snippet = rng.choice(SNIPPETS)
+            lines += SNIPPET_VARIABLES.sub(rf"\g<0>_{len(lines)}", snippet).splitlines()
+            lines.append("")
+        messages.append("\n".join(lines[:5000]))
+    return messages
+
+
+def adversarial_line(rng: random.Random) -> str:
+    unit = rng.choice(ADVERSARIAL_UNITS)
+    return (
+        rng.choice(ADVERSARIAL_PREFIXES)
+        + unit * rng.randint(1, 800 // len(unit))
+        + rng.choice(ADVERSARIAL_SUFFIXES)
+    )
+
+
+def adversarial(rng: random.Random) -> list[str]:
+    messages = []
+    for _ in range(50):
+        lines = [adversarial_line(rng) for _ in range(rng.randint(1, 20))]
+        messages.append("\n".join(lines)[:DISCORD_MESSAGE_MAX_LENGTH])
+    return messages
+
+
+CORPORA: dict[str, Callable[[random.Random], list[str]]] = {
+    "prose": prose,
+    "short snippets": short_snippets,
+    "long tracebacks": long_tracebacks,
+    "mixed": mixed,
+    "5k-line pastes": large_pastes,
+    "adversarial": adversarial,
+}
+
+
+def load_corpus(name: str) -> list[str]:
+    return CORPORA[name](random.Random(f"{SEED}-{name}"))
@@ -0,0 +1,34 @@
+"""
+A time budget for detecting the code in a single message.
+Each line is matched in bounded time (see `DetectorBase.max_line_length`), but a message may still have thousands
+of lines, so a detector gives up once the budget is spent and the message is treated as plain text.
+Unlike the executor's timeout, this stops the work itself instead of only no longer waiting for it.
+"""
+
+from __future__ import annotations
+
+import time
+
+
+class DetectionBudgetExceeded(Exception):
+    """
+    Raised by a detector which is still classifying lines after its deadline.
+    """
+
+
+class DetectionBudget:
+    def __init__(self: DetectionBudget, seconds: float | None) -> None:
+        """
+        :param seconds: how long detecting a single message may take, or None for no limit
+        """
+        self.seconds = seconds
+        # messages which were treated as plain text because they ran out of time
+        self.exceeded = 0
+
+    def deadline(self: DetectionBudget) -> float | None:
+        """
+        :return: the `time.perf_counter()` value at which a detection starting now runs out of time, or None
+        """
+        if self.seconds is None:
+            return None
+        return time.perf_counter() + self.seconds
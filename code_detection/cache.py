@@ -0,0 +1,99 @@
+"""
+A bounded LRU cache of detection results, keyed by a digest of the message content (or of an attachment's bytes).
+Edits, reposts and re-deliveries of the same text would otherwise re-run the whole detection pipeline.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+Content = TypeVar("Content", str, bytes)
+
+
+class DetectionCache(Generic[T]):
+    def __init__(self: DetectionCache[T], max_size: int = 256) -> None:
+        self.max_size = max_size
+        self.entries: OrderedDict[bytes, T] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # detection may run on worker threads (see executor.py)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def digest(text: str | bytes) -> bytes:
+        """
+        A short, fixed-size key for `text`, so that long messages aren't kept alive by the cache.
+        """
+        if isinstance(text, str):
+            text = text.encode("utf-8", "surrogatepass")
+        return hashlib.blake2b(text, digest_size=16).digest()
+
+    def get(
+        self: DetectionCache[T],
+        text: Content,
+        compute: Callable[[Content], T],
+    ) -> T:
+        """
+        Returns the cached result for `text`, or calls `compute(text)` and caches its result.
+        """
+        found, result = self.lookup(text)
+        if found:
+            return result
+
+        result = compute(text)
+        self.put(text, result)
+        return result
+
+    def lookup(self: DetectionCache[T], text: str | bytes) -> tuple[bool, T | None]:
+        """
+        :return: (True, result) if `text` is cached, otherwise (False, None).
+        """
+        key = self.digest(text)
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return True, self.entries[key]
+
+            self.misses += 1
+            return False, None
+
+    def put(self: DetectionCache[T], text: str | bytes, result: T) -> None:
+        key = self.digest(text)
+        with self.lock:
+            if self.max_size > 0:
+                self.entries[key] = result
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+
+    def resize(self: DetectionCache[T], max_size: int) -> None:
+        """
+        Changes the maximum number of cached results, evicting the least recently used as necessary.
+        A size of 0 disables caching.
+        """
+        with self.lock:
+            self.max_size = max_size
+            while len(self.entries) > max(max_size, 0):
+                self.entries.popitem(last=False)
+
+    def clear(self: DetectionCache[T]) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self: DetectionCache[T]) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self: DetectionCache[T]) -> str:
+        return (
+            f"DetectionCache(size={len(self.entries)}/{self.max_size}, "
+            f"hits={self.hits}, misses={self.misses})"
+        )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import re
+
+from .base import DetectorBase
+from .patterns import PatternSet
+
+NAME = r"[a-zA-Z_][a-zA-Z_0-9]*"
+BUILTIN_TYPE = (
+    r"(void|int|char|float|double|long|short|bool|auto|unsigned|signed|size_t|"
+    r"u?int(8|16|32|64)_t|wchar_t|FILE|string|vector<.*>)"
+)
+QUALIFIERS = r"((static|const|constexpr|extern|inline|virtual|unsigned|signed|struct|volatile)\s+)*"
+CONTROL_FLOW = r"(if|for|while|switch)"
+
+LINE_PATTERNS = [  # note that lines will first be stripped!
+    re.compile(
+        r"^#\s*(include|define|undef|ifn?def|if|elif|else|endif|pragma|error)\b",
+    ),
+    re.compile(r"\bstd::"),
+    re.compile(r"^using\s+namespace\s+\w+\s*;$"),
+    re.compile(r"\b(cout|cerr|clog)\s*<<"),
+    re.compile(r"\bcin\s*>>"),
+    re.compile(
+        r"\b(printf|scanf|fprintf|sprintf|snprintf|puts|malloc|calloc|realloc|free|sizeof|memset|memcpy|strlen|strcmp)\s*\(",
+    ),
+    re.compile(rf"^{QUALIFIERS}{BUILTIN_TYPE}[\s*&]+{NAME}\s*(\[.*\])*\s*(=.*)?;$"),
+    re.compile(
+        rf"^{QUALIFIERS}{BUILTIN_TYPE}[\s*&]+{NAME}\s*\(.*\)\s*(const\s*)?\{{?$"
+    ),
+    re.compile(rf"^(template\s*<|typename\s|namespace\s+{NAME}|typedef\s)"),
+    re.compile(rf"^(class|struct|union|enum)\s+{NAME}.*\{{$"),
+    re.compile(r"^(public|private|protected)\s*:$"),
+    re.compile(rf"{NAME}->{NAME}"),
+    re.compile(rf"^{CONTROL_FLOW}\s*\(.*\)\s*\{{?$"),
+    re.compile(rf"^\}}\s*(else|while)\b"),
+    re.compile(r"^(else|do)\s*\{$"),
+    re.compile(r"^(case\s.+|default)\s*:$"),
+    re.compile(r"^return\b.*;$"),
+    re.compile(r"^(break|continue)\s*;$"),
+    re.compile(r"^(//|/\*|\*/)"),
+    re.compile(r";$"),
+    re.compile(r"\)\s*\{$"),
+    re.compile(r"^[\{\}\(\)\[\]]+[\{\}\(\)\[\];,\s]*$"),
+]
+
+PLAUSIBLE_LINE_PATTERNS = [
+    re.compile(r"(,|\(|\{|\[|\+|-|\*|/|&&|\|\||=|<<|>>|\\)$"),
+    re.compile(r"^(\.|\)|\]|\}|&&|\|\||\?|:|<<|>>)"),
+]
+
+# every line matching LINE_PATTERNS (once stripped) contains one of these, see `line_might_be_cpp`
+TOKENS = (*"(){}[];#", "std::", "->", "<<", ">>")
+LEADING_KEYWORDS = (
+    "template",
+    "typename",
+    "namespace",
+    "typedef",
+    "class",
+    "struct",
+    "union",
+    "enum",
+    "public",
+    "private",
+    "protected",
+    "case",
+    "default",
+    "/",
+    "*/",
+)
+
+# each list is evaluated as a few combined regexes, see patterns.py
+LINE_PATTERN_SET = PatternSet(LINE_PATTERNS, name="cpp")
+PLAUSIBLE_LINE_PATTERN_SET = PatternSet(PLAUSIBLE_LINE_PATTERNS, name="cpp-plausible")
+
+
+class CppDetector(DetectorBase):
+    """
+    Detects both C and C++, which are highlighted the same way.
+    """
+
+    language = "cpp"
+
+    @staticmethod
+    def block_is_probably_code(block: str) -> bool:
+        return re.match(r"^/\*.*\*/$", block.strip(), re.DOTALL) is not None
+
+    def line_might_be_code(self: CppDetector, line: str) -> bool:
+        return line_might_be_cpp(line)
+
+    def line_is_probably_code(self: CppDetector, line: str) -> bool:
+        return self.features.matches("cpp", line, first_matching_line_pattern)
+
+    def line_is_plausibly_code(self: CppDetector, line: str) -> bool:
+        if super().line_is_plausibly_code(line):
+            return True
+
+        return self.features.matches(
+            "cpp-plausible",
+            line,
+            first_matching_plausible_line_pattern,
+        )
+
+
+def line_might_be_cpp(line: str) -> bool:
+    """
+    Returns True for every line that `first_matching_line_pattern` finds a pattern for, without using any regex.
+    """
+    line = line.strip()
+    return line.startswith(LEADING_KEYWORDS) or any(token in line for token in TOKENS)
+
+
+def first_matching_line_pattern(line: str) -> re.Pattern[str] | None:
+    return LINE_PATTERN_SET.first_match(line.strip())
+
+
+def first_matching_plausible_line_pattern(line: str) -> re.Pattern[str] | None:
+    return PLAUSIBLE_LINE_PATTERN_SET.first_match(line.strip())
@@ -0,0 +1,125 @@
+"""
+Runs code detection without blocking the event loop.
+Detection is pure CPU work, so a large paste would otherwise stall the gateway heartbeat and every other listener.
+Small inputs are still detected inline, because handing them to a worker costs more than detecting them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class DetectionExecutor:
+    def __init__(
+        self: DetectionExecutor,
+        inline_max_lines: int = 200,
+        timeout: float = 10.0,
+        max_workers: int = 1,
+        use_processes: bool = False,
+    ) -> None:
+        """
+        :param inline_max_lines: inputs with fewer lines than this (weighted by their cost) are run inline on the event loop
+        :param timeout: seconds to wait for a worker before giving up (the worker itself cannot be interrupted)
+        :param use_processes: use a process pool instead of a thread pool, so that detection doesn't hold the GIL
+        """
+        self.inline_max_lines = inline_max_lines
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.executor: Executor | None = None
+
+        # metrics
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.timeouts = 0
+        self.queue_depth = 0  # calls which have been submitted but haven't finished yet
+        self.max_queue_depth = 0
+        self.latencies_ms: deque[float] = deque(maxlen=1000)  # of offloaded calls
+
+    def get_executor(self: DetectionExecutor) -> Executor:
+        # created lazily, so that importing code_detection doesn't start any threads or processes
+        if self.executor is None:
+            if self.use_processes:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="code-detection",
+                )
+        return self.executor
+
+    def should_offload(
+        self: DetectionExecutor,
+        text: str | bytes,
+        cost: float = 1.0,
+    ) -> bool:
+        """
+        :param text: the text to detect, or the undecoded content of an attachment
+        :param cost: the cost per line of detecting `text`, relative to the PythonDetector (see registry.py)
+        """
+        newline = "\n" if isinstance(text, str) else b"\n"
+        return text.count(newline) * cost >= self.inline_max_lines
+
+    async def run(
+        self: DetectionExecutor,
+        text: str | bytes,
+        func: Callable[..., T],
+        *args: Any,
+        cost: float = 1.0,
+    ) -> T:
+        """
+        Returns `func(*args)`, which is run inline if `text` is small (see `should_offload`), otherwise on a worker.
+        With a process pool, `func` and `args` must be picklable.
+
+        :raises TimeoutError: if the worker took longer than `timeout` seconds.
+        """
+        if not self.should_offload(text, cost):
+            self.inline_calls += 1
+            return func(*args)
+
+        self.offloaded_calls += 1
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        loop = asyncio.get_running_loop()
+        before = time.perf_counter()
+
+        def on_finished(_: object) -> None:
+            # the worker may still be running after a timeout, so the queue depth is only reduced once it finishes
+            self.queue_depth -= 1
+            self.latencies_ms.append((time.perf_counter() - before) * 1000)
+
+        future = self.get_executor().submit(func, *args)
+        future.add_done_callback(
+            lambda future: loop.call_soon_threadsafe(on_finished, future),
+        )
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError as e:
+            # before Python 3.11 this isn't the builtin TimeoutError, which callers expect
+            self.timeouts += 1
+            raise TimeoutError from e
+
+    def stats(self: DetectionExecutor) -> dict[str, float]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "inline_calls": self.inline_calls,
+            "offloaded_calls": self.offloaded_calls,
+            "timeouts": self.timeouts,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "p50_latency_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+            "max_latency_ms": latencies[-1] if latencies else 0.0,
+        }
+
+    def shutdown(self: DetectionExecutor) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,53 @@
+"""
+Per-line feature extraction which is shared between all of the detectors running over the same text.
+Several detectors test the same family of patterns (e.g. the traceback detector also tests every Python pattern),
+so each family is only evaluated once per distinct line, no matter how many detectors ask for it.
+The pattern which matched is kept too, so that detectors can report why each line was classified as code.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import re
+
+# (family, source of the pattern) which matched a line
+FeatureHit = tuple[str, str]
+
+
+class LineFeatures:
+    def __init__(self: LineFeatures) -> None:
+        # maps family name -> line -> the pattern of the family which matched the line (None if none did)
+        self.results: dict[str, dict[str, re.Pattern[str] | None]] = {}
+        self.evaluations = 0
+
+        # the most recent match which was asked about, see `DetectorBase.classify_line_range`
+        self.last_hit: FeatureHit | None = None
+
+    def matches(
+        self: LineFeatures,
+        family: str,
+        line: str,
+        matcher: Callable[[str], re.Pattern[str] | None],
+    ) -> bool:
+        """
+        Returns True if `matcher(line)` found a pattern, which is only evaluated if no detector has asked about
+        this line & family before. `family` must uniquely identify `matcher`.
+        If it did find one, it is recorded as the `last_hit`.
+        """
+        family_results = self.results.get(family)
+        if family_results is None:
+            family_results = self.results[family] = {}
+
+        if line in family_results:
+            pattern = family_results[line]
+        else:
+            self.evaluations += 1
+            pattern = family_results[line] = matcher(line)
+
+        if pattern is None:
+            return False
+
+        self.last_hit = family, pattern.pattern
+        return True
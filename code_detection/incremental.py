@@ -0,0 +1,148 @@
+"""
+Incremental re-detection of edited messages.
+The detectors of recently processed messages are kept in a bounded store, so that when a message is edited,
+only the lines which changed (according to a line diff) need to be reclassified.
+The section merging stages are then re-run over the per-line classifications, which is cheap in comparison
+(it is linear in the number of sections, with no regex matching).
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from .budget import DetectionBudgetExceeded
+from .features import LineFeatures
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Sequence
+
+    from .base import DetectedSection, DetectorBase
+    from .budget import DetectionBudget
+    from .cache import DetectionCache
+    from .registry import DetectorRegistry
+
+    DetectionResult = tuple[str, tuple[DetectedSection, ...]] | None
+
+
+def best_detection_result(detectors: Sequence[DetectorBase]) -> DetectionResult:
+    """
+    :return: (language, sections) of the detector which found the most code, or None if none of them found any.
+    """
+    if not detectors:
+        return None
+
+    best_match = max(
+        detectors,
+        key=lambda d: (d.probable_lines_of_code, d.lines_of_code),
+    )
+
+    if best_match.lines_of_code == 0:
+        return None
+
+    return best_match.language, best_match.detect()
+
+
+class IncrementalDetectionStore:
+    def __init__(
+        self: IncrementalDetectionStore,
+        registry: DetectorRegistry,
+        cache: DetectionCache[DetectionResult] | None = None,
+        max_messages: int = 256,
+        budget: DetectionBudget | None = None,
+    ) -> None:
+        """
+        :param budget: if a detection runs out of time, the text is treated as plain text (see budget.py)
+        """
+        self.registry = registry
+        self.cache = cache
+        self.max_messages = max_messages
+        self.budget = budget
+
+        # maps message key -> the detectors of its most recent content
+        self.entries: OrderedDict[Hashable, list[DetectorBase]] = OrderedDict()
+        # guards `entries`, because detection may run on worker threads (see executor.py)
+        self.lock = threading.Lock()
+
+        self.full_detections = 0
+        self.incremental_detections = 0
+        self.lines_reclassified = 0
+        self.lines_reused = 0
+
+    def detect(
+        self: IncrementalDetectionStore, key: Hashable, text: str
+    ) -> DetectionResult:
+        """
+        Same as `code_detection.detect(text)`, but if `key` (e.g. a message id) was detected before,
+        the previous per-line classifications are reused for every line which hasn't changed.
+        """
+        if self.cache is None:
+            return self.detect_uncached(key, text)
+
+        with self.lock:
+            known = key in self.entries
+            if known:
+                self.entries.move_to_end(key)
+
+        if known:
+            # the entry may be for an older version of the text, but it's still a valid base for the next edit
+            return self.cache.get(text, lambda text: self.detect_uncached(key, text))
+
+        # even if the text is cached, it's detected once, so that the next edit of `key` is incremental
+        result = self.detect_uncached(key, text)
+        self.cache.put(text, result)
+        return result
+
+    def detect_uncached(
+        self: IncrementalDetectionStore,
+        key: Hashable,
+        text: str,
+    ) -> DetectionResult:
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is None:
+                self.full_detections += 1
+            else:
+                self.incremental_detections += 1
+
+        if not previous:
+            features = LineFeatures()
+            previous_by_class = {}
+        else:
+            features = previous[0].features
+            previous_by_class = {type(detector): detector for detector in previous}
+
+        # the selected detectors may change with an edit, those which weren't run before are run in full
+        deadline = None if self.budget is None else self.budget.deadline()
+        detectors = [
+            detector_class(
+                text,
+                features,
+                previous=previous_by_class.get(detector_class),
+                deadline=deadline,
+            )
+            for detector_class in self.registry.select(text)
+        ]
+
+        try:
+            result = best_detection_result(detectors)
+        except DetectionBudgetExceeded:
+            # the detectors are incomplete, so the next edit is detected in full
+            self.budget.exceeded += 1
+            return None
+
+        with self.lock:
+            for detector in detectors:
+                self.lines_reclassified += detector.lines_reclassified
+                self.lines_reused += len(detector.lines) - detector.lines_reclassified
+
+            self.entries[key] = detectors
+            while len(self.entries) > self.max_messages:
+                self.entries.popitem(last=False)
+
+        return result
+
+    def forget(self: IncrementalDetectionStore, key: Hashable) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import re
+
+from .base import DetectorBase
+from .patterns import PatternSet
+
+NAME = r"[a-zA-Z_$][a-zA-Z_$0-9]*"
+# e.g. "int", "String[]", "Map<String, List<Integer>>", "java.util.List<?>"
+TYPE = rf"{NAME}(\.{NAME})*(<[\w\s,.?<>\[\]]*>)?(\[\])*"
+MODIFIERS = (
+    r"(public|private|protected|static|final|abstract|synchronized|native|default)"
+)
+CONTROL_FLOW = r"(if|for|while|switch|catch)"
+
+LINE_PATTERNS = [  # note that lines will first be stripped!
+    re.compile(rf"^{MODIFIERS}\s"),
+    re.compile(r"^(package|import)\s+(static\s+)?[\w.]+(\.\*)?\s*;$"),
+    re.compile(rf"^(class|interface|enum|record)\s+{NAME}.*\{{$"),
+    re.compile(rf"^@{NAME}"),
+    re.compile(r"\bSystem\.(out|err|in)\b"),
+    re.compile(rf"\bnew\s+{TYPE}\s*(\(|\[|\{{)"),
+    re.compile(rf"^{TYPE}\s+{NAME}\s*(=.*)?;$"),
+    re.compile(rf"^{TYPE}\s+{NAME}\s*\(.*\)\s*(throws\s+[\w.,\s]+)?\{{?$"),
+    re.compile(rf"^{CONTROL_FLOW}\s*\(.*\)\s*\{{?$"),
+    re.compile(rf"^\}}\s*(else|{CONTROL_FLOW}|finally)\b"),
+    re.compile(r"^(else|try|finally|do)\s*\{$"),
+    re.compile(r"^(case\s.+|default)\s*(:|->)"),
+    re.compile(r"^return\b.*;$"),
+    re.compile(r"^(break|continue)\s*;$"),
+    re.compile(r"^throw\s+new\b"),
+    re.compile(r"^(//|/\*|\*/)"),
+    re.compile(r"^\*\s*@(param|return|throws|see|author)\b"),
+    re.compile(r";$"),
+    re.compile(r"\)\s*\{$"),
+    re.compile(r"^[\{\}\(\)\[\]]+[\{\}\(\)\[\];,\s]*$"),
+]
+
+PLAUSIBLE_LINE_PATTERNS = [
+    re.compile(r"(,|\(|\{|\[|\+|-|\*|/|&&|\|\||=)$"),
+    re.compile(r"^(\.|\)|\]|\}|&&|\|\||\?|:|\+)"),
+]
+
+# every line matching LINE_PATTERNS (once stripped) contains one of these, see `line_might_be_java`
+TOKENS = (*"(){}[];@", "System.", "new ")
+LEADING_KEYWORDS = (
+    "public",
+    "private",
+    "protected",
+    "static",
+    "final",
+    "abstract",
+    "synchronized",
+    "native",
+    "default",
+    "class",
+    "interface",
+    "enum",
+    "record",
+    "case",
+    "throw",
+    "/",
+    "*",
+)
+
+# each list is evaluated as a few combined regexes, see patterns.py
+LINE_PATTERN_SET = PatternSet(LINE_PATTERNS, name="java")
+PLAUSIBLE_LINE_PATTERN_SET = PatternSet(PLAUSIBLE_LINE_PATTERNS, name="java-plausible")
+
+
+class JavaDetector(DetectorBase):
+    language = "java"
+
+    @staticmethod
+    def block_is_probably_code(block: str) -> bool:
+        return re.match(r"^/\*.*\*/$", block.strip(), re.DOTALL) is not None
+
+    def line_might_be_code(self: JavaDetector, line: str) -> bool:
+        return line_might_be_java(line)
+
+    def line_is_probably_code(self: JavaDetector, line: str) -> bool:
+        return self.features.matches("java", line, first_matching_line_pattern)
+
+    def line_is_plausibly_code(self: JavaDetector, line: str) -> bool:
+        if super().line_is_plausibly_code(line):
+            return True
+
+        return self.features.matches(
+            "java-plausible",
+            line,
+            first_matching_plausible_line_pattern,
+        )
+
+
+def line_might_be_java(line: str) -> bool:
+    """
+    Returns True for every line that `first_matching_line_pattern` finds a pattern for, without using any regex.
+    """
+    line = line.strip()
+    return line.startswith(LEADING_KEYWORDS) or any(token in line for token in TOKENS)
+
+
+def first_matching_line_pattern(line: str) -> re.Pattern[str] | None:
+    return LINE_PATTERN_SET.first_match(line.strip())
+
+
+def first_matching_plausible_line_pattern(line: str) -> re.Pattern[str] | None:
+    return PLAUSIBLE_LINE_PATTERN_SET.first_match(line.strip())
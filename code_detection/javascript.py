@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+
+from .base import DetectorBase
+from .patterns import PatternSet
+
+NAME = r"[a-zA-Z_$][a-zA-Z_$0-9]*"
+CONTROL_FLOW = r"(if|for|while|switch|catch)"
+
+LINE_PATTERNS = [  # note that lines will first be stripped!
+    re.compile(rf"^(export\s+)?(const|let|var)\s+({NAME}|\{{|\[)"),
+    re.compile(
+        rf"^(export\s+(default\s+)?)?(async\s+)?function\b\s*\*?\s*({NAME})?\s*\("
+    ),
+    re.compile(rf"^(export\s+(default\s+)?)?class\s+{NAME}.*\{{$"),
+    re.compile(r"^import\s.*\bfrom\s*['\"`]"),
+    re.compile(r"^import\s*['\"`]"),
+    re.compile(r"^export\s*(\{|\*|default\b)"),
+    re.compile(r"^module\.exports\b"),
+    re.compile(rf"(\)|{NAME})\s*=>"),
+    re.compile(r"\b(console|document|window|JSON|Math)\.\w+"),
+    re.compile(r"\brequire\s*\(\s*['\"`]"),
+    re.compile(r"(?<![=!])(===|!==)(?!=)"),
+    re.compile(rf"^{CONTROL_FLOW}\s*\(.*\)\s*\{{?$"),
+    re.compile(rf"^\}}\s*(else|{CONTROL_FLOW}|finally)\b"),
+    re.compile(r"^(else|try|finally|do)\s*\{$"),
+    re.compile(r"^(case\s.+|default)\s*:$"),
+    re.compile(r"^return\b.*;$"),
+    re.compile(r"^(break|continue)\s*;$"),
+    re.compile(r"\.(then|catch|map|filter|forEach|addEventListener)\s*\("),
+    re.compile(rf"\bawait\s+{NAME}"),
+    re.compile(r"^(//|/\*|\*/)"),
+    re.compile(r";$"),
+    re.compile(r"\)\s*\{$"),
+    re.compile(r"^[\{\}\(\)\[\]]+[\{\}\(\)\[\];,\s]*$"),
+]
+
+PLAUSIBLE_LINE_PATTERNS = [
+    re.compile(r"(,|\(|\{|\[|\+|-|\*|/|&&|\|\||=)$"),
+    re.compile(r"^(\.|\)|\]|\}|&&|\|\||\?|:)"),
+]
+
+# every line matching LINE_PATTERNS (once stripped) contains one of these, see `line_might_be_javascript`
+TOKENS = (
+    *"(){}[];=/",
+    "await",
+    "console.",
+    "document.",
+    "window.",
+    "JSON.",
+    "Math.",
+)
+LEADING_KEYWORDS = (
+    "const",
+    "let",
+    "var",
+    "export",
+    "import",
+    "module",
+    "case",
+    "default",
+)
+
+# each list is evaluated as a few combined regexes, see patterns.py
+LINE_PATTERN_SET = PatternSet(LINE_PATTERNS, name="javascript")
+PLAUSIBLE_LINE_PATTERN_SET = PatternSet(
+    PLAUSIBLE_LINE_PATTERNS, name="javascript-plausible"
+)
+
+
+class JavaScriptDetector(DetectorBase):
+    language = "js"
+
+    @staticmethod
+    def block_is_probably_code(block: str) -> bool:
+        return re.match(r"^/\*.*\*/$", block.strip(), re.DOTALL) is not None
+
+    def line_might_be_code(self: JavaScriptDetector, line: str) -> bool:
+        return line_might_be_javascript(line)
+
+    def line_is_probably_code(self: JavaScriptDetector, line: str) -> bool:
+        return self.features.matches("javascript", line, first_matching_line_pattern)
+
+    def line_is_plausibly_code(self: JavaScriptDetector, line: str) -> bool:
+        if super().line_is_plausibly_code(line):
+            return True
+
+        return self.features.matches(
+            "javascript-plausible",
+            line,
+            first_matching_plausible_line_pattern,
+        )
+
+
+def line_might_be_javascript(line: str) -> bool:
+    """
+    Returns True for every line that `first_matching_line_pattern` finds a pattern for, without using any regex.
+    """
+    line = line.strip()
+    return line.startswith(LEADING_KEYWORDS) or any(token in line for token in TOKENS)
+
+
+def first_matching_line_pattern(line: str) -> re.Pattern[str] | None:
+    return LINE_PATTERN_SET.first_match(line.strip())
+
+
+def first_matching_plausible_line_pattern(line: str) -> re.Pattern[str] | None:
+    return PLAUSIBLE_LINE_PATTERN_SET.first_match(line.strip())
@@ -0,0 +1,164 @@
+"""
+The section merging rules of `DetectorBase.merge_short_sections`, applied to the run-length encoding of the sections:
+whether each run is code, and how many lines it has.
+Every pass is a single scan over integer arrays, and groups of runs are scored with prefix sums over their lengths,
+so that inputs with many alternating short runs take linear time rather than quadratic.
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+def score(code_lines: int, lines: int) -> tuple[int, int]:
+    """
+    Merges runs with a total of `code_lines` code lines out of `lines` into a single run.
+    Like `DetectorBase.reduce_section_group`, it is code if at least half of its lines are (which includes no lines).
+
+    :return: (is_code, length) of the merged run
+    """
+    return int(code_lines >= lines - code_lines), lines
+
+
+def merge_similar_runs(
+    is_code: Sequence[int],
+    lengths: Sequence[int],
+) -> tuple[list[int], list[int]]:
+    """
+    Merges every group of adjacent runs with the same classification.
+    """
+    merged_is_code: list[int] = []
+    merged_lengths: list[int] = []
+    i = 0
+    while i < len(is_code):
+        j = i
+        code_lines = lines = 0
+        while j < len(is_code) and is_code[j] == is_code[i]:
+            code_lines += lengths[j] if is_code[j] else 0
+            lines += lengths[j]
+            j += 1
+
+        merged, length = score(code_lines, lines)
+        merged_is_code.append(merged)
+        merged_lengths.append(length)
+        i = j
+
+    return merged_is_code, merged_lengths
+
+
+def merge_short_runs(
+    is_code: Sequence[int],
+    lengths: Sequence[int],
+    min_code_lines: int,
+    min_plain_text_lines: int,
+) -> tuple[array[int], array[int]]:
+    """
+    Same as `DetectorBase.merge_short_sections` (see its docstring for the rules), but for runs of lines.
+
+    :param is_code: 1 for each run of code, 0 for each run of plain text
+    :param lengths: the number of lines in each run
+    :return: (is_code, lengths) of the merged runs
+    """
+    n = len(lengths)
+    if n == 0 or sum(lengths) < min_code_lines:
+        return array("b", [0]), array("q", [sum(lengths)])
+
+    def is_short(code: int, length: int) -> bool:
+        return length < (min_code_lines if code else min_plain_text_lines)
+
+    # the number of lines, and of code lines, in runs[:i]
+    line_prefix = [0, *accumulate(lengths)]
+    code_prefix = [
+        0,
+        *accumulate(length * code for code, length in zip(is_code, lengths)),
+    ]
+
+    def score_runs(start: int, end: int) -> tuple[int, int]:
+        return score(
+            code_prefix[end] - code_prefix[start],
+            line_prefix[end] - line_prefix[start],
+        )
+
+    # firstly, merge each group of adjacent short runs into a single run (plain text at the start or end is kept)
+    first_is_code: list[int] = []
+    first_lengths: list[int] = []
+
+    def append(code: int, length: int) -> None:
+        first_is_code.append(code)
+        first_lengths.append(length)
+
+    i = 0
+    if not is_code[0]:
+        append(0, lengths[0])
+        i = 1
+
+    group_start = i
+    while i < n - 1:
+        if not is_short(is_code[i], lengths[i]):
+            # an empty group is merged into an empty run of code
+            append(*score_runs(group_start, i))
+            append(is_code[i], lengths[i])
+            group_start = i + 1
+        i += 1
+
+    last_is_short_code = i < n and is_code[i] and is_short(is_code[i], lengths[i])
+    group_end = i + 1 if last_is_short_code else i
+    if group_end > group_start:
+        append(*score_runs(group_start, group_end))
+
+    if i < n and not last_is_short_code:
+        append(is_code[i], lengths[i])
+
+    # secondly, merge adjacent & similar runs
+    merged_is_code, merged_lengths = merge_similar_runs(first_is_code, first_lengths)
+
+    # thirdly, merge runs that are still too short
+    # code at the top or the bottom is merged into the plain text next to it
+    if (
+        len(merged_lengths) >= 2
+        and merged_is_code[0]
+        and is_short(1, merged_lengths[0])
+    ):
+        merged_is_code[:2] = [0]
+        merged_lengths[:2] = [merged_lengths[0] + merged_lengths[1]]
+
+    if (
+        len(merged_lengths) >= 2
+        and merged_is_code[-1]
+        and is_short(1, merged_lengths[-1])
+    ):
+        merged_is_code[-2:] = [0]
+        merged_lengths[-2:] = [merged_lengths[-2] + merged_lengths[-1]]
+
+    # a short middle run is merged with both of its neighbours, and the result isn't checked again
+    result_is_code = array("b", merged_is_code[:1])
+    result_lengths = array("q", merged_lengths[:1])
+    i = 1
+    while i < len(merged_lengths) - 1:
+        code, length = merged_is_code[i], merged_lengths[i]
+        if not is_short(code, length):
+            result_is_code.append(code)
+            result_lengths.append(length)
+            i += 1
+            continue
+
+        previous_code, previous_length = result_is_code.pop(), result_lengths.pop()
+        next_code, next_length = merged_is_code[i + 1], merged_lengths[i + 1]
+        merged, merged_length = score(
+            previous_length * previous_code + length * code + next_length * next_code,
+            previous_length + length + next_length,
+        )
+        result_is_code.append(merged)
+        result_lengths.append(merged_length)
+        i += 2
+
+    if i < len(merged_lengths):
+        result_is_code.append(merged_is_code[i])
+        result_lengths.append(merged_lengths[i])
+
+    return result_is_code, result_lengths
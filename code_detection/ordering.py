@@ -0,0 +1,75 @@
+"""
+Adaptive ordering of the patterns of a `PatternSet` (see patterns.py), based on which patterns match real messages.
+The alternatives of a combined regex are tried in order, so trying the patterns which match most often first
+means most lines which are code stop matching sooner. Only the order changes, never whether a line matches.
+
+Once enabled, each registered set counts which of its patterns matched every line, and reorders itself every
+`reorder_every` hits. The counts can be saved and loaded, so that after a restart the sets start in a learned order.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from .patterns import PatternSet
+
+
+class AdaptivePatternOrder:
+    def __init__(self: AdaptivePatternOrder, reorder_every: int = 10_000) -> None:
+        self.enabled = False
+        self.reorder_every = reorder_every
+        # keyed by pattern set name
+        self.pattern_sets: dict[str, PatternSet] = {}
+        # the loaded hits of pattern sets which haven't been registered yet (detectors are imported lazily)
+        self.loaded_hits: dict[str, dict[str, int]] = {}
+
+    def register(self: AdaptivePatternOrder, pattern_set: PatternSet) -> None:
+        """
+        Called by the detector modules for each pattern set which should be ordered adaptively.
+        """
+        self.pattern_sets[pattern_set.name] = pattern_set
+        if self.enabled:
+            self.adapt(pattern_set)
+
+    def enable(self: AdaptivePatternOrder) -> None:
+        self.enabled = True
+        for pattern_set in self.pattern_sets.values():
+            self.adapt(pattern_set)
+
+    def adapt(self: AdaptivePatternOrder, pattern_set: PatternSet) -> None:
+        pattern_set.reorder_every = self.reorder_every
+        pattern_set.load_hits(self.loaded_hits.pop(pattern_set.name, {}))
+
+    def state(self: AdaptivePatternOrder) -> dict[str, dict[str, int]]:
+        """
+        :return: the hits of each pattern (keyed by its source) of each set, in the order they are tried.
+        """
+        state = {
+            name: pattern_set.hits_by_pattern()
+            for name, pattern_set in self.pattern_sets.items()
+        }
+        # sets which weren't used since the hits were loaded keep their hits
+        return {**self.loaded_hits, **state}
+
+    def save(self: AdaptivePatternOrder, path: Path) -> None:
+        path.write_text(json.dumps(self.state(), indent=2))
+
+    def load(self: AdaptivePatternOrder, path: Path) -> None:
+        """
+        Loads hits saved by `save`, if the file exists. They're added to the hits of each set once it's enabled.
+        """
+        if not path.exists():
+            return
+
+        self.loaded_hits = json.loads(path.read_text())
+        if self.enabled:
+            for pattern_set in self.pattern_sets.values():
+                self.adapt(pattern_set)
+
+
+# shared by every detector
+adaptive_pattern_order = AdaptivePatternOrder()
@@ -0,0 +1,313 @@
+"""
+Evaluates a list of regular expressions as a handful of combined regexes, instead of one at a time.
+`PatternSet(patterns).search(line)` is equivalent to `any(pattern.search(line) for pattern in patterns)`.
+
+- Patterns anchored with "^" are combined into alternations which are only tried at the start of the line.
+- Patterns which begin with a literal (e.g. "^class", r"\.\s*...") are grouped by that literal,
+  and their regex is skipped entirely when the literal cannot occur (a cheap `str.startswith` / `in` check).
+- Everything else is combined into a single alternation.
+Each pattern is wrapped in a named group, so that the pattern which matched can be identified.
+While profiling (see profiling.py), the patterns are evaluated one at a time instead.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from .profiling import pattern_profiler
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# characters which are literals when escaped with a backslash
+ESCAPED_LITERALS = frozenset(".^$*+?{}[]()|\\/-@&~#<>=!,:;'\" ")
+QUANTIFIERS = frozenset("*+?{")
+
+# non-ASCII letters which an IGNORECASE regex considers equal to an ASCII letter, but `str.lower` doesn't
+IGNORECASE_EQUIVALENTS = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+
+
+def fold_case(text: str) -> str:
+    """
+    Lowercases the text, such that an ASCII literal matches an IGNORECASE regex only if its lowercase form is in the folded text.
+    Useful for cheap (no regex) prefilters of IGNORECASE patterns.
+    """
+    return text.translate(IGNORECASE_EQUIVALENTS).lower()
+
+
+def is_top_level_alternation(source: str) -> bool:
+    """
+    Returns True if the pattern contains a "|" which is not nested inside a group or a character class.
+    """
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # "]" immediately after "[" or "[^" is a literal
+            if source[i + 1 : i + 2] == "^":
+                i += 1
+            if source[i + 1 : i + 2] == "]":
+                i += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+
+        i += 1
+
+    return False
+
+
+def leading_literal(source: str) -> str:
+    """
+    Returns the literal text which every match of the pattern must begin with (possibly "").
+    A leading "^" and any leading word boundaries are skipped over.
+    """
+    i = 0
+    if source.startswith("^"):
+        i = 1
+    while source.startswith(r"\b", i):
+        i += 2
+
+    literal: list[str] = []
+    while i < len(source):
+        char = source[i]
+        if char.isalnum() or char in "_ :,=#@'\"<>!;-/&~":
+            length = 1
+        elif char == "\\" and source[i + 1 : i + 2] in ESCAPED_LITERALS:
+            char = source[i + 1]
+            length = 2
+        else:
+            break
+
+        if source[i + length : i + length + 1] in QUANTIFIERS:
+            # the quantifier applies to this character, so it isn't required
+            break
+
+        literal.append(char)
+        i += length
+
+    return "".join(literal)
+
+
+class PatternSet:
+    def __init__(
+        self: PatternSet,
+        patterns: Iterable[re.Pattern[str]],
+        name_prefix: str = "pattern",
+        name: str = "patterns",
+    ) -> None:
+        """
+        :param name: identifies the set in profiles (see profiling.py) and learned orders (see ordering.py)
+        """
+        self.name = name
+        self.patterns = list(patterns)
+        self.names = [f"{name_prefix}_{i}" for i in range(len(self.patterns))]
+        self.patterns_by_name = dict(zip(self.names, self.patterns))
+
+        # named groups, keyed by pattern name
+        self.groups: dict[str, str] = {}
+        # the literal which each pattern begins with ("" if none), keyed by pattern name
+        self.anchored_literals: dict[str, str] = {}
+        self.unanchored_literals: dict[str, str] = {}
+
+        for name, pattern in zip(self.names, self.patterns):
+            source = pattern.pattern
+            flags = pattern.flags & ~re.UNICODE
+            if flags & ~re.IGNORECASE:
+                msg = f"Unsupported flags in pattern {source!r}"
+                raise ValueError(msg)
+
+            self.groups[name] = f"(?P<{name}>{'(?i:' if flags else '(?:'}{source}))"
+
+            # literal prefilters are case sensitive, so IGNORECASE patterns can't use them
+            alternation = is_top_level_alternation(source)
+            literal = "" if flags or alternation else leading_literal(source)
+
+            if source.startswith("^") and not alternation:
+                self.anchored_literals[name] = literal
+            else:
+                self.unanchored_literals[name] = literal
+
+        # the number of lines which each pattern matched first, keyed by pattern name
+        # only counted once the order is adaptive (see ordering.py)
+        self.hits: Counter[str] = Counter()
+        self.reorder_every: int | None = None
+        self.hits_since_reorder = 0
+        # guards `hits` and reordering, because detection may run on worker threads and inline at the same time
+        # (see executor.py); matching doesn't need it, since `compile` replaces the compiled regexes all at once
+        self.lock = threading.RLock()
+
+        self.compile(self.names)
+
+    def compile(self: PatternSet, order: list[str]) -> None:
+        """
+        Combines the patterns into regexes, whose alternatives are tried in the `order` of their names.
+        Which patterns are combined with each other doesn't depend on the order, only the order within each regex.
+        """
+        anchored_by_prefix: dict[str, list[str]] = {}
+        unanchored_by_literal: dict[str, list[str]] = {}
+        for name in order:
+            if name in self.anchored_literals:
+                literal = self.anchored_literals[name]
+                anchored_by_prefix.setdefault(literal, []).append(self.groups[name])
+            else:
+                literal = self.unanchored_literals[name]
+                unanchored_by_literal.setdefault(literal, []).append(self.groups[name])
+
+        anchored = anchored_by_prefix.pop("", [])
+        unanchored = unanchored_by_literal.pop("", [])
+
+        def combine(groups: list[str]) -> re.Pattern[str] | None:
+            return re.compile("|".join(groups)) if groups else None
+
+        # (prefixes, regex) - the regex is only tried if the line starts with one of the prefixes
+        anchored_with_prefix = (
+            tuple(anchored_by_prefix),
+            combine(
+                [group for groups in anchored_by_prefix.values() for group in groups]
+            ),
+        )
+        # [(literal, regex)] - each regex is only tried if the literal occurs in the line
+        unanchored_with_literal = [
+            (literal, combine(groups))
+            for literal, groups in unanchored_by_literal.items()
+        ]
+
+        # assigned at once, so that another thread never matches with a mix of two orders
+        self.compiled = (
+            anchored_with_prefix,
+            combine(anchored),
+            unanchored_with_literal,
+            combine(unanchored),
+        )
+        self.order = list(order)
+
+    def matches(self: PatternSet, line: str) -> re.Match[str] | None:
+        """
+        Returns a match of any one of the patterns, or None if none of them match.
+        """
+        match = self.combined_match(line)
+        if match is not None and self.reorder_every is not None:
+            self.record_hit(match.lastgroup)
+
+        return match
+
+    def combined_match(self: PatternSet, line: str) -> re.Match[str] | None:
+        anchored_with_prefix, anchored, unanchored_with_literal, unanchored = (
+            self.compiled
+        )
+
+        prefixes, regex = anchored_with_prefix
+        if regex is not None and line.startswith(prefixes):
+            if match := regex.match(line):
+                return match
+
+        if anchored is not None and (match := anchored.match(line)):
+            return match
+
+        for literal, regex in unanchored_with_literal:
+            if literal in line and (match := regex.search(line)):
+                return match
+
+        if unanchored is not None:
+            return unanchored.search(line)
+
+        return None
+
+    def search(self: PatternSet, line: str) -> bool:
+        """
+        Same as `any(pattern.search(line) for pattern in self.patterns)`.
+        """
+        if pattern_profiler.enabled:
+            return self.profiled_first_match(line) is not None
+
+        return self.matches(line) is not None
+
+    def first_match(self: PatternSet, line: str) -> re.Pattern[str] | None:
+        """
+        Returns one of the patterns which matches the line, or None if none of them match.
+        """
+        if pattern_profiler.enabled:
+            return self.profiled_first_match(line)
+
+        match = self.matches(line)
+        if match is None or match.lastgroup is None:
+            return None
+
+        return self.patterns_by_name[match.lastgroup]
+
+    def profiled_first_match(self: PatternSet, line: str) -> re.Pattern[str] | None:
+        """
+        Same as `first_match`, but evaluates (and profiles) every pattern on its own.
+        """
+        first_match = None
+        for pattern in self.patterns:
+            before = time.perf_counter()
+            hit = pattern.search(line) is not None
+            pattern_profiler.record(
+                self.name,
+                pattern.pattern,
+                hit,
+                time.perf_counter() - before,
+            )
+
+            if hit and first_match is None:
+                first_match = pattern
+
+        return first_match
+
+    def record_hit(self: PatternSet, name: str | None) -> None:
+        """
+        Counts a line which the pattern matched first, and reorders the patterns every `reorder_every` hits.
+        """
+        with self.lock:
+            self.hits[name] += 1
+            self.hits_since_reorder += 1
+            if self.hits_since_reorder >= self.reorder_every:
+                self.reorder()
+
+    def reorder(self: PatternSet) -> None:
+        """
+        Recombines the patterns, such that the ones with the most hits are tried first.
+        Ties keep their original order.
+        """
+        with self.lock:
+            self.hits_since_reorder = 0
+            self.compile(sorted(self.names, key=lambda name: -self.hits[name]))
+
+    def hits_by_pattern(self: PatternSet) -> dict[str, int]:
+        """
+        :return: the hits of each pattern (keyed by its source), in the order they are tried.
+        """
+        with self.lock:
+            return {
+                self.patterns_by_name[name].pattern: self.hits[name]
+                for name in self.order
+            }
+
+    def load_hits(self: PatternSet, hits_by_pattern: dict[str, int]) -> None:
+        """
+        Adds the hits from `hits_by_pattern` (e.g. of a previous run) and reorders the patterns.
+        Patterns which aren't in this set anymore are ignored.
+        """
+        with self.lock:
+            for name, pattern in self.patterns_by_name.items():
+                self.hits[name] += hits_by_pattern.get(pattern.pattern, 0)
+            self.reorder()
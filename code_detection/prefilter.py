@@ -0,0 +1,55 @@
+"""
+Counts how often each detector's prefilter (see `DetectorBase.might_contain_code`) rejects a text.
+Most messages are short prose, and a rejected text skips the per-line pattern matching entirely.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+
+
+class PrefilterStats:
+    def __init__(self: PrefilterStats) -> None:
+        # keyed by detector class name
+        self.checked: Counter[str] = Counter()
+        self.rejected: Counter[str] = Counter()
+        # guards the counters, because detection may run on worker threads (see executor.py)
+        self.lock = threading.Lock()
+
+    def record(self: PrefilterStats, detector: str, rejected: bool) -> None:
+        with self.lock:
+            self.checked[detector] += 1
+            if rejected:
+                self.rejected[detector] += 1
+
+    def rejection_rate(self: PrefilterStats, detector: str | None = None) -> float:
+        """
+        :return: The fraction of texts which were rejected by `detector`, or by any detector if None.
+        """
+        with self.lock:
+            if detector is None:
+                checked = sum(self.checked.values())
+                rejected = sum(self.rejected.values())
+            else:
+                checked = self.checked[detector]
+                rejected = self.rejected[detector]
+        return rejected / checked if checked else 0.0
+
+    def clear(self: PrefilterStats) -> None:
+        with self.lock:
+            self.checked.clear()
+            self.rejected.clear()
+
+    def __repr__(self: PrefilterStats) -> str:
+        with self.lock:
+            checked_by_detector = dict(self.checked)
+        rates = ", ".join(
+            f"{detector}={self.rejection_rate(detector):.0%} of {checked}"
+            for detector, checked in checked_by_detector.items()
+        )
+        return f"PrefilterStats({rates})"
+
+
+# shared by every detector
+prefilter_stats = PrefilterStats()
@@ -0,0 +1,105 @@
+"""
+Opt-in profiling of the individual patterns of every `PatternSet` (see patterns.py).
+Normally each set is evaluated as a few combined regexes, so the cost of a single pattern can't be observed.
+While `pattern_profiler.enabled`, every pattern of a set is instead evaluated on its own against each line,
+recording how often it was evaluated, how often it matched, and the total time it took.
+Every pattern is evaluated even once one has matched, so that the hit counts don't depend on the current order.
+This is much slower than the combined regexes, so it's only meant for benchmarks and short samples of real traffic.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@dataclass
+class PatternProfile:
+    pattern_set: str
+    pattern: str
+    evaluations: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def hit_rate(self: PatternProfile) -> float:
+        return self.hits / self.evaluations if self.evaluations else 0.0
+
+
+class PatternProfiler:
+    def __init__(self: PatternProfiler) -> None:
+        self.enabled = False
+        # keyed by (pattern set name, pattern source)
+        self.profiles: dict[tuple[str, str], PatternProfile] = {}
+        # guards `profiles`, because detection may run on worker threads (see executor.py)
+        self.lock = threading.Lock()
+
+    def record(
+        self: PatternProfiler,
+        pattern_set: str,
+        pattern: str,
+        hit: bool,
+        seconds: float,
+    ) -> None:
+        with self.lock:
+            profile = self.profiles.get((pattern_set, pattern))
+            if profile is None:
+                profile = self.profiles[pattern_set, pattern] = PatternProfile(
+                    pattern_set,
+                    pattern,
+                )
+
+            profile.evaluations += 1
+            profile.hits += hit
+            profile.seconds += seconds
+
+    def sorted_profiles(
+        self: PatternProfiler,
+        pattern_set: str | None = None,
+    ) -> list[PatternProfile]:
+        """
+        :return: the profiles of every pattern (or only those of `pattern_set`), the most expensive first.
+        """
+        with self.lock:
+            profiles = [
+                profile
+                for profile in self.profiles.values()
+                if pattern_set is None or profile.pattern_set == pattern_set
+            ]
+        return sorted(profiles, key=lambda profile: profile.seconds, reverse=True)
+
+    def dump(self: PatternProfiler, limit: int | None = None) -> str:
+        """
+        :return: a table of the `limit` most expensive patterns (or all of them), with their hit rates.
+        """
+        lines = [
+            f"{'pattern set':<20}{'evaluations':>12}{'hits':>10}{'hit rate':>10}{'total ms':>10}  pattern",
+        ]
+        for profile in self.sorted_profiles()[:limit]:
+            pattern = (
+                profile.pattern
+                if len(profile.pattern) <= 60
+                else f"{profile.pattern[:57]}..."
+            )
+            lines.append(
+                f"{profile.pattern_set:<20}{profile.evaluations:>12,}{profile.hits:>10,}"
+                f"{profile.hit_rate:>10.1%}{profile.seconds * 1000:>10.1f}  {pattern}",
+            )
+        return "\n".join(lines)
+
+    def save(self: PatternProfiler, path: Path) -> None:
+        profiles = [asdict(profile) for profile in self.sorted_profiles()]
+        path.write_text(json.dumps(profiles, indent=2))
+
+    def clear(self: PatternProfiler) -> None:
+        with self.lock:
+            self.profiles.clear()
+
+
+# shared by every pattern set
+pattern_profiler = PatternProfiler()
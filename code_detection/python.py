@@ -3,52 +3,84 @@ from __future__ import annotations
 import re
 
 from .base import DetectorBase
+from .ordering import adaptive_pattern_order
+from .patterns import PatternSet
+
+KEYWORDS = frozenset(
+    {
+        "and",
+        "as",
+        "assert",
+        "async",
+        "await",
+        "break",
+        "class",
+        "continue",
+        "def",
+        "del",
+        "elif",
+        "else",
+        "except",
+        "False",
+        "finally",
+        "for",
+        "from",
+        "global",
+        "if",
+        "import",
+        "in",
+        "is",
+        "lambda",
+        "None",
+        "nonlocal",
+        "not",
+        "or",
+        "pass",
+        "raise",
+        "return",
+        "True",
+        "try",
+        "while",
+        "with",
+        "yield",
+    },
+)
 
-KEYWORDS = [
-    "and",
-    "as",
-    "assert",
-    "async",
-    "await",
-    "break",
-    "class",
-    "continue",
-    "def",
-    "del",
-    "elif",
-    "else",
-    "except",
-    "False",
-    "finally",
-    "for",
-    "from",
-    "global",
-    "if",
-    "import",
-    "in",
-    "is",
-    "lambda",
-    "None",
-    "nonlocal",
-    "not",
-    "or",
-    "pass",
-    "raise",
-    "return",
-    "True",
-    "try",
-    "while",
-    "with",
-    "yield",
-]
-NOT_KEYWORD_LOOKBEHIND = "".join(f"(?<!{keyword})" for keyword in KEYWORDS)
+
+def not_preceded_by(words: frozenset[str]) -> str:
+    """
+    Build a zero-width assertion which fails if the text before it ends with one of `words`.
+    `re` only supports fixed-width lookbehinds, so the words are grouped into one lookbehind per length
+    rather than one lookbehind per word, which keeps the number of assertions tried at every position small.
+
+    :return: the regex source of the assertion
+    """
+    words_by_length: dict[int, list[str]] = {}
+    for word in sorted(words):
+        words_by_length.setdefault(len(word), []).append(word)
+
+    return "".join(
+        f"(?<!{'|'.join(group)})" for _, group in sorted(words_by_length.items())
+    )
+
+
+NOT_KEYWORD_LOOKBEHIND = not_preceded_by(KEYWORDS)
 
 NAME = rf"[a-zA-Z_][a-zA-Z_0-9]*{NOT_KEYWORD_LOOKBEHIND}"
 COMMA_SEP_NAMES = rf"({NAME}\s*,\s*)*{NAME}"
 CONTAINER_OPENER = r"(\(|\[|\{)"
 CONTAINER_CLOSER = r"(\)|\]|\})"
-NAME_OR_CONTAINER = rf"(({NAME})|{CONTAINER_OPENER}|{CONTAINER_CLOSER})"
-COMMA_SEP_TOKEN = rf"({NAME_OR_CONTAINER}+\s*,\s*)*{NAME_OR_CONTAINER}+"
+CONTAINER = r"[(\[{)\]}]"
+# Matches the same text as `({NAME}|{CONTAINER})+`, without backtracking through every way of splitting an identifier
+# into several NAMEs (which is exponential in the length of the identifier if the rest of the pattern doesn't match).
+# Splitting never lets the sequence end anywhere new, so only a NAME followed by a container may be followed by more.
+# (Backtracking into such a NAME is linear, since each shorter prefix is followed by a letter rather than a container,
+# so no possessive quantifier is needed, which Python < 3.11 doesn't support.)
+NAME_OR_CONTAINER_SEQUENCE = (
+    rf"({CONTAINER}|[a-zA-Z_][a-zA-Z_0-9]*{NOT_KEYWORD_LOOKBEHIND}(?={CONTAINER}))*"
+    rf"({CONTAINER}|{NAME})"
+)
+COMMA_SEP_TOKEN = rf"({NAME_OR_CONTAINER_SEQUENCE}\s*,\s*)*{NAME_OR_CONTAINER_SEQUENCE}"
 OPERATOR = r"(\+|\-|\/|\*|\/\/|\@|\&|\||\~|\^)"
 CLAUSE_END = r"(\(|\[|:)$"
 
@@ -110,11 +142,53 @@ PLAUSIBLE_LINE_PATTERNS = [
     re.compile(rf"""((?<!'')'|(?<!"")"|,|\d|{OPERATOR})$"""),
 ]
 
+# every line matching LINE_PATTERNS (once stripped) contains one of these, see `line_might_be_python`
+LEADING_KEYWORDS = (
+    "assert",
+    "async",
+    "break",
+    "class",
+    "continue",
+    "def",
+    "del",
+    "elif",
+    "else",
+    "except",
+    "finally",
+    "from",
+    "global",
+    "if",
+    "import",
+    "nonlocal",
+    "pass",
+    "raise",
+    "return",
+    "try",
+    "while",
+    "with",
+    "yield",
+    "#",
+    "@",
+    "...",
+)
+TOKENS = ("(", ")", "[", "]", "{", "}", "=", "await", "lambda")
+TOKEN_PAIRS = (("for", "in"), ("if", "else"))
+
+# each list is evaluated as a few combined regexes, see patterns.py
+LINE_PATTERN_SET = PatternSet(LINE_PATTERNS, name="python")
+LINE_PATTERN_SET_NO_STRIP = PatternSet(LINE_PATTERNS_NO_STRIP, name="python-no-strip")
+PLAUSIBLE_LINE_PATTERN_SET = PatternSet(
+    PLAUSIBLE_LINE_PATTERNS,
+    name="python-plausible",
+)
+# tried in the order of their hit rates, when enabled (see ordering.py)
+adaptive_pattern_order.register(LINE_PATTERN_SET)
+adaptive_pattern_order.register(LINE_PATTERN_SET_NO_STRIP)
+adaptive_pattern_order.register(PLAUSIBLE_LINE_PATTERN_SET)
+
 
 class PythonDetector(DetectorBase):
-    @property
-    def language(self) -> str:
-        return "python"
+    language = "python"
 
     @staticmethod
     def block_is_probably_code(block: str) -> bool:
@@ -123,17 +197,45 @@ class PythonDetector(DetectorBase):
             is not None
         )
 
-    @staticmethod
-    def line_is_probably_code(line: str) -> bool:
-        if any(pattern.search(line) for pattern in LINE_PATTERNS_NO_STRIP):
-            return True
+    def line_is_probably_code(self: PythonDetector, line: str) -> bool:
+        return self.features.matches("python", line, first_matching_line_pattern)
 
-        line = line.strip()
-        return any(pattern.search(line) for pattern in LINE_PATTERNS)
+    def line_might_be_code(self: PythonDetector, line: str) -> bool:
+        return line_might_be_python(line)
 
     def line_is_plausibly_code(self: PythonDetector, line: str) -> bool:
         if super().line_is_plausibly_code(line):
             return True
 
-        line = line.strip()
-        return any(pattern.search(line) for pattern in PLAUSIBLE_LINE_PATTERNS)
+        return self.features.matches(
+            "python-plausible",
+            line,
+            first_matching_plausible_line_pattern,
+        )
+
+
+def line_might_be_python(line: str) -> bool:
+    """
+    Returns True for every line that `first_matching_line_pattern` finds a pattern for, without using any regex.
+    """
+    # an indented line might match LINE_PATTERNS_NO_STRIP
+    if line[:1].isspace() and not line.isspace():
+        return True
+
+    line = line.strip()
+    return (
+        line.startswith(LEADING_KEYWORDS)
+        or any(token in line for token in TOKENS)
+        or any(first in line and second in line for first, second in TOKEN_PAIRS)
+    )
+
+
+def first_matching_line_pattern(line: str) -> re.Pattern[str] | None:
+    if pattern := LINE_PATTERN_SET_NO_STRIP.first_match(line):
+        return pattern
+
+    return LINE_PATTERN_SET.first_match(line.strip())
+
+
+def first_matching_plausible_line_pattern(line: str) -> re.Pattern[str] | None:
+    return PLAUSIBLE_LINE_PATTERN_SET.first_match(line.strip())
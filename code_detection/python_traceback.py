@@ -1,5 +1,8 @@
 import re
+from typing import Callable
 
+from .ordering import adaptive_pattern_order
+from .patterns import PatternSet, fold_case
 from .python import NAME, PythonDetector
 
 COMMON_ERROR_CLASSES = [
@@ -49,34 +52,132 @@ COMMON_ERROR_CLASSES = [
     "TimeoutError",
 ]
 
+TRACEBACK_PATTERN = re.compile(
+    r"^Traceback\s*\(\s*most\s*recent\s*call\s*last\s*\)",
+    re.IGNORECASE,
+)
+FILE_PATTERN = re.compile(
+    rf"^File.*,\s*line\s*\d+(,\s*in\s*(?:<[^<>]+>|{NAME}))?$",
+    re.IGNORECASE,
+)
+ERROR_PATTERN = re.compile(rf"^({'|'.join(COMMON_ERROR_CLASSES)})(:|$)")
+DURING_HANDLING = "During handling of the above exception, another exception occurred"
+DURING_HANDLING_PATTERN = re.compile(rf"^{DURING_HANDLING}:?$")
+DIRECT_CAUSE = "The above exception was the direct cause of the following exception"
+DIRECT_CAUSE_PATTERN = re.compile(rf"^{DIRECT_CAUSE}:?$")
+PREVIOUS_LINE_REPEATED_PATTERN = re.compile(
+    r"^\[Previous line repeated \d+ more times\]$",
+)
+CARETS_PATTERN = re.compile(r"^\^+$")
+
 LINE_PATTERNS = [
-    re.compile(r"^Traceback\s*\(\s*most\s*recent\s*call\s*last\s*\)", re.IGNORECASE),
-    re.compile(
-        rf"^File.*,\s*line\s*\d+(,\s*in\s*(?:<[^<>]+>|{NAME}))?$",
-        re.IGNORECASE,
+    TRACEBACK_PATTERN,
+    FILE_PATTERN,
+    ERROR_PATTERN,
+    DURING_HANDLING_PATTERN,
+    DIRECT_CAUSE_PATTERN,
+    PREVIOUS_LINE_REPEATED_PATTERN,
+    CARETS_PATTERN,
+]
+LINE_PATTERN_SET = PatternSet(LINE_PATTERNS, name="python-traceback")
+adaptive_pattern_order.register(LINE_PATTERN_SET)
+
+# every line matching LINE_PATTERNS (once stripped) starts with one of these, see `line_might_be_traceback`
+LEADING_TOKENS = (
+    *COMMON_ERROR_CLASSES,
+    "During handling of the above exception",
+    "The above exception was the direct cause",
+    "[Previous line repeated",
+    "^",
+)
+# these are matched case-insensitively
+LEADING_CASE_INSENSITIVE_TOKENS = ("traceback", "file")
+
+ERROR_CLASSES = frozenset(COMMON_ERROR_CLASSES)
+
+# Almost every line of a pasted traceback is one of these, keyed by its first word (see `leading_word`).
+# Each maps to (pattern, check) where the check is a cheaper test of the stripped line, which may only return True
+# if the pattern matches it. Most checks need no regex at all.
+FAST_PATHS: dict[str, tuple[re.Pattern[str], Callable[[str], object]]] = {
+    "Traceback": (
+        TRACEBACK_PATTERN,
+        lambda line: line.startswith("Traceback (most recent call last)"),
     ),
-    re.compile(rf"^({'|'.join(COMMON_ERROR_CLASSES)})(:|$)"),
-    re.compile(
-        r"^During handling of the above exception, another exception occurred:?$",
+    "File": (FILE_PATTERN, FILE_PATTERN.match),
+    "During": (
+        DURING_HANDLING_PATTERN,
+        lambda line: line.removesuffix(":") == DURING_HANDLING,
     ),
-    re.compile(
-        r"^The above exception was the direct cause of the following exception:?$",
+    "The": (
+        DIRECT_CAUSE_PATTERN,
+        lambda line: line.removesuffix(":") == DIRECT_CAUSE,
     ),
-    re.compile(r"^\[Previous line repeated \d+ more times\]$"),
-    re.compile(r"^\^+$"),
-]
+    "[Previous": (PREVIOUS_LINE_REPEATED_PATTERN, PREVIOUS_LINE_REPEATED_PATTERN.match),
+    "^": (CARETS_PATTERN, lambda line: not line.strip("^")),
+    **{
+        error_class: (
+            ERROR_PATTERN,
+            lambda line: line.partition(":")[0] in ERROR_CLASSES,
+        )
+        for error_class in COMMON_ERROR_CLASSES
+    },
+}
 
 
 class PythonTracebackDetector(PythonDetector):
-    @property
-    def language(self) -> str:
-        # no idea what language "1c" is, but it correctly highlights paths + numbers
-        # https://highlightjs.org/demo
-        return "1c"
+    # no idea what language "1c" is, but it correctly highlights paths + numbers
+    # https://highlightjs.org/demo
+    language = "1c"
+
+    def line_might_be_code(self, line: str) -> bool:
+        return super().line_might_be_code(line) or line_might_be_traceback(line)
 
     def line_is_probably_code(self, line: str) -> bool:
+        # the common lines of a traceback are recognized (with a dict lookup) before any Python patterns are tried
+        if leading_word(line.strip()) in FAST_PATHS and self.features.matches(
+            "python-traceback",
+            line,
+            first_matching_line_pattern,
+        ):
+            return True
+
         if super().line_is_probably_code(line):
             return True
 
-        line = line.strip()
-        return any(pattern.search(line) for pattern in LINE_PATTERNS)
+        return self.features.matches(
+            "python-traceback",
+            line,
+            first_matching_line_pattern,
+        )
+
+
+def line_might_be_traceback(line: str) -> bool:
+    """
+    Returns True for every line that `first_matching_line_pattern` finds a pattern for, without using any regex.
+    """
+    line = line.strip()
+    return line.startswith(LEADING_TOKENS) or (
+        fold_case(line[:9]).startswith(LEADING_CASE_INSENSITIVE_TOKENS)
+    )
+
+
+def leading_word(line: str) -> str:
+    """
+    The first word of a stripped line, without anything after a colon. Every line of carets has the word "^".
+    """
+    if line.startswith("^"):
+        return "^"
+
+    word, _, _ = line.partition(" ")
+    return word.partition(":")[0]
+
+
+def first_matching_line_pattern(line: str) -> re.Pattern[str] | None:
+    line = line.strip()
+    fast_path = FAST_PATHS.get(leading_word(line))
+    if fast_path is not None:
+        pattern, check = fast_path
+        if check(line):
+            return pattern
+
+    return LINE_PATTERN_SET.first_match(line)
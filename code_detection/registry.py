@@ -0,0 +1,269 @@
+"""
+The detectors which `code_detection.detect` chooses between, and when each of them is worth running.
+
+Detector modules are only imported the first time that their detector is needed,
+and each detector only runs on texts which contain one of its trigger tokens (a plain substring check).
+That way adding a language doesn't slow down every message, only those which look like they might be in it.
+"""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .patterns import fold_case
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .base import DetectorBase
+
+
+@dataclass(frozen=True)
+class DetectorSpec:
+    name: str
+    module: str  # relative to this package, e.g. ".python"
+    class_name: str
+    # rough cost per line, relative to the PythonDetector
+    cost: float = 1.0
+    # the detector only runs on texts which contain at least one of these, or on every text if there are none
+    trigger_tokens: tuple[str, ...] = ()
+    # same, but matched case-insensitively (these must be lowercase)
+    case_insensitive_trigger_tokens: tuple[str, ...] = ()
+
+    @property
+    def always_runs(self: DetectorSpec) -> bool:
+        return not self.trigger_tokens and not self.case_insensitive_trigger_tokens
+
+    def triggered_by(self: DetectorSpec, text: str, folded_text: str) -> bool:
+        """
+        :param folded_text: `fold_case(text)`
+        """
+        return (
+            self.always_runs
+            or any(token in text for token in self.trigger_tokens)
+            or any(
+                token in folded_text for token in self.case_insensitive_trigger_tokens
+            )
+        )
+
+
+class DetectorRegistry:
+    def __init__(self: DetectorRegistry, specs: Iterable[DetectorSpec] = ()) -> None:
+        # in order of priority; when two detectors find the same amount of code, the first one wins
+        self.specs: dict[str, DetectorSpec] = {}
+        self.classes: dict[str, type[DetectorBase]] = {}
+        for spec in specs:
+            self.register(spec)
+
+    @classmethod
+    def from_classes(
+        cls: type[DetectorRegistry],
+        detector_classes: Iterable[type[DetectorBase]],
+    ) -> DetectorRegistry:
+        """
+        A registry of already imported detectors, which always run.
+        """
+        registry = cls()
+        for detector_class in detector_classes:
+            spec = DetectorSpec(
+                name=detector_class.__name__,
+                module=detector_class.__module__,
+                class_name=detector_class.__name__,
+            )
+            registry.register(spec)
+            registry.classes[spec.name] = detector_class
+        return registry
+
+    def register(self: DetectorRegistry, spec: DetectorSpec) -> None:
+        if spec.name in self.specs:
+            msg = f"A detector named {spec.name!r} is already registered"
+            raise ValueError(msg)
+        self.specs[spec.name] = spec
+
+    def load(self: DetectorRegistry, name: str) -> type[DetectorBase]:
+        """
+        Returns the detector class, importing its module if it hasn't been imported yet.
+        """
+        detector_class = self.classes.get(name)
+        if detector_class is None:
+            spec = self.specs[name]
+            module = importlib.import_module(spec.module, __package__)
+            detector_class = self.classes[name] = getattr(module, spec.class_name)
+        return detector_class
+
+    def load_all(self: DetectorRegistry) -> list[type[DetectorBase]]:
+        return [self.load(name) for name in self.specs]
+
+    def select_specs(self: DetectorRegistry, text: str) -> list[DetectorSpec]:
+        folded_text = None
+        selected: list[DetectorSpec] = []
+        for spec in self.specs.values():
+            if spec.case_insensitive_trigger_tokens and folded_text is None:
+                folded_text = fold_case(text)
+            if spec.triggered_by(text, folded_text or ""):
+                selected.append(spec)
+        return selected
+
+    def select_specs_in_chunks(
+        self: DetectorRegistry,
+        chunks: Iterable[str],
+    ) -> list[DetectorSpec]:
+        """
+        Same as `select_specs`, for a text which is only available a chunk at a time (e.g. an attachment).
+        The end of each chunk is kept, so that trigger tokens which are split across two chunks are found too.
+        """
+        selected = {spec.name for spec in self.specs.values() if spec.always_runs}
+        longest_token = max(
+            (
+                len(token)
+                for spec in self.specs.values()
+                for token in (
+                    *spec.trigger_tokens,
+                    *spec.case_insensitive_trigger_tokens,
+                )
+            ),
+            default=0,
+        )
+
+        previous_end = ""
+        for chunk in chunks:
+            text = previous_end + chunk
+            folded_text = None
+            for spec in self.specs.values():
+                if spec.name in selected:
+                    continue
+                if spec.case_insensitive_trigger_tokens and folded_text is None:
+                    folded_text = fold_case(text)
+                if spec.triggered_by(text, folded_text or ""):
+                    selected.add(spec.name)
+
+            # one character shorter than the longest token, so that a token split across two chunks is found
+            previous_end = text[max(len(text) - longest_token + 1, 0) :]
+
+        return [spec for spec in self.specs.values() if spec.name in selected]
+
+    def select(self: DetectorRegistry, text: str) -> list[type[DetectorBase]]:
+        """
+        :return: The detectors worth running on `text`, in order of priority.
+        """
+        return [self.load(spec.name) for spec in self.select_specs(text)]
+
+    def estimated_cost(self: DetectorRegistry, text: str) -> float:
+        """
+        :return: The total cost per line of the detectors which would run on `text`.
+        """
+        return sum(spec.cost for spec in self.select_specs(text))
+
+
+# The detectors used by `code_detection.detect`.
+# In order of priority: when two detectors find the same amount of code, the first one wins.
+# Costs were measured with `python run_benchmarks.py`, relative to the PythonDetector.
+DETECTOR_SPECS = [
+    DetectorSpec(name="python", module=".python", class_name="PythonDetector"),
+    DetectorSpec(
+        name="python-traceback",
+        module=".python_traceback",
+        class_name="PythonTracebackDetector",
+        # it reuses the PythonDetector's per-line results (see features.py), so only its own patterns cost extra
+        cost=0.2,
+        # every line that only the traceback detector matches contains one of these,
+        # otherwise it would find exactly the same code as the PythonDetector
+        trigger_tokens=(
+            "Error",
+            "Exception",
+            "GeneratorExit",
+            "KeyboardInterrupt",
+            "StopIteration",
+            "StopAsyncIteration",
+            "SystemExit",
+            "During handling of the above exception",
+            "The above exception was the direct cause",
+            "[Previous line repeated",
+            "^",
+        ),
+        case_insensitive_trigger_tokens=("traceback", "file"),
+    ),
+    DetectorSpec(
+        name="javascript",
+        module=".javascript",
+        class_name="JavaScriptDetector",
+        cost=0.4,
+        trigger_tokens=(
+            "=>",
+            "function",
+            "const ",
+            "let ",
+            "var ",
+            "console.",
+            "document.",
+            "window.",
+            "===",
+            "!==",
+            "require(",
+            "module.exports",
+            "export ",
+            ".then(",
+        ),
+    ),
+    DetectorSpec(
+        name="java",
+        module=".java",
+        class_name="JavaDetector",
+        cost=0.25,
+        trigger_tokens=(
+            "public ",
+            "private ",
+            "protected ",
+            "System.",
+            "import java",
+            "@Override",
+            "String[]",
+            "extends ",
+            "implements ",
+        ),
+    ),
+    DetectorSpec(
+        name="cpp",
+        module=".cpp",
+        class_name="CppDetector",
+        cost=0.3,
+        trigger_tokens=(
+            "#include",
+            "#define",
+            "std::",
+            "cout <<",
+            "cout<<",
+            "cin >>",
+            "cin>>",
+            "printf",
+            "scanf",
+            "int main",
+            "->",
+            "nullptr",
+            "malloc",
+            "template",
+            "using namespace",
+        ),
+    ),
+    DetectorSpec(
+        name="sql",
+        module=".sql",
+        class_name="SQLDetector",
+        cost=0.2,
+        case_insensitive_trigger_tokens=(
+            "select ",
+            "insert into",
+            "delete from",
+            "create table",
+            "alter table",
+            "drop table",
+            "create index",
+            "create view",
+            "group by",
+            "order by",
+            " join ",
+        ),
+    ),
+]
@@ -0,0 +1,77 @@
+"""
+How confident each detector is in the code it found, and which pattern classified each line as code.
+Everything here is read from the results of classification (see `LineBuffer.hits`), so scoring a detection
+never matches any patterns again.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from .base import DetectedSection, DetectorBase
+    from .features import FeatureHit
+
+
+@dataclass(frozen=True)
+class DetectionScore:
+    language: str
+    confidence: float
+    lines_of_code: int
+    probable_lines_of_code: int
+    # (family, pattern) which classified each line of the text as code, or None
+    line_hits: tuple[FeatureHit | None, ...]
+
+
+def confidence(sections: Iterable[DetectedSection]) -> float:
+    """
+    The share of the non-blank lines of code which are probably code because one of the detector's patterns matched them.
+    The rest were only plausibly code, or were plain text which was merged into the code around it.
+
+    :return: between 0 and 1, or 0 if there is no code.
+    """
+    lines_of_code = matched_lines_of_code = 0
+    for section in sections:
+        if not section.is_code:
+            continue
+
+        buffer = section.buffer
+        for i in range(section.start, section.end):
+            line = buffer.lines[i]
+            if not line or line.isspace():
+                continue
+
+            lines_of_code += 1
+            if buffer.probability[i] and buffer.hits[i] is not None:
+                matched_lines_of_code += 1
+
+    if lines_of_code == 0:
+        return 0.0
+
+    return matched_lines_of_code / lines_of_code
+
+
+def score_detectors(detectors: Sequence[DetectorBase]) -> list[DetectionScore]:
+    """
+    :return: the score of each detector, best first (i.e. the first one is chosen by `best_detection_result`).
+    """
+    scores = [
+        DetectionScore(
+            language=detector.language,
+            confidence=detector.confidence,
+            lines_of_code=detector.lines_of_code,
+            probable_lines_of_code=detector.probable_lines_of_code,
+            line_hits=tuple(detector.line_hits),
+        )
+        for detector in detectors
+    ]
+
+    # sorting is stable, so ties go to the first detector like `max` in `best_detection_result`
+    return sorted(
+        scores,
+        key=lambda score: (score.probable_lines_of_code, score.lines_of_code),
+        reverse=True,
+    )
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+
+from .base import DetectorBase
+from .patterns import PatternSet
+
+NAME = r"[a-zA-Z_][a-zA-Z_0-9]*"
+QUALIFIED_NAME = rf"({NAME}|`[^`]+`|\"[^\"]+\"|\[[^\]]+\])(\.({NAME}|\*))*"
+COMPARISON = r"(=|<|>|!=|<>|\blike\b|\bin\b|\bis\s+(not\s+)?null\b|\bbetween\b)"
+COLUMN_TYPE = (
+    r"(int|integer|smallint|bigint|tinyint|serial|bigserial|decimal|numeric|real|float|double|"
+    r"varchar|char|nvarchar|text|blob|date|datetime|time|timestamp|boolean|bool|uuid|json|jsonb)"
+)
+COLUMN_CONSTRAINT = (
+    r"\s+(not\s+null|null|primary\s+key|unique|auto_increment|autoincrement|"
+    r"default\s+\S+|references\s+\S+(\s*\(\s*\w+\s*\))?)"
+)
+
+# SQL keywords are case-insensitive, so these patterns are too
+LINE_PATTERNS = [  # note that lines will first be stripped!
+    re.compile(
+        rf"^select\s+(distinct\s+)?(\*|(count|sum|avg|min|max)\s*\(|{QUALIFIED_NAME}\s*(,|$|\bas\b|\bfrom\b))",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^(insert\s+into|delete\s+from|update\s+\S+\s+set|replace\s+into|merge\s+into)\b",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^(create|drop|alter|truncate)\s+(or\s+replace\s+)?(temporary\s+|temp\s+|unique\s+)?"
+        r"(table|index|view|database|schema|trigger|procedure|function|sequence)\b",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        rf"^from\s+{QUALIFIED_NAME}(\s+(as\s+)?{NAME})?\s*(;|,|$|\b(where|join|inner|left|right|full|cross|group|order|limit)\b)",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        rf"^(where|and|or|having|on)\s+(not\s+)?{QUALIFIED_NAME}\s*{COMPARISON}",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        rf"^((inner|cross|natural)\s+|(left|right|full)\s+(outer\s+)?)?join\s+{QUALIFIED_NAME}",
+        re.IGNORECASE,
+    ),
+    re.compile(r"^(group|order|partition)\s+by\b", re.IGNORECASE),
+    re.compile(r"^(limit|offset|fetch\s+first)\s+\d+", re.IGNORECASE),
+    re.compile(r"^values\s*\(", re.IGNORECASE),
+    re.compile(rf"^set\s+{QUALIFIED_NAME}\s*=", re.IGNORECASE),
+    re.compile(
+        r"^(union(\s+all)?|intersect|except|begin(\s+transaction)?|commit|rollback)\s*;?$",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"^(primary\s+key|foreign\s+key|references|constraint)\b",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        rf"^{QUALIFIED_NAME}\s+{COLUMN_TYPE}(\s*\(\d+(\s*,\s*\d+)?\))?({COLUMN_CONSTRAINT})*\s*,?$",
+        re.IGNORECASE,
+    ),
+    re.compile(r"^\)\s*;?$"),
+    re.compile(r";$"),
+]
+
+PLAUSIBLE_LINE_PATTERNS = [
+    re.compile(r"(,|\(|=)$"),
+]
+
+# each list is evaluated as a few combined regexes, see patterns.py
+LINE_PATTERN_SET = PatternSet(LINE_PATTERNS, name="sql")
+PLAUSIBLE_LINE_PATTERN_SET = PatternSet(PLAUSIBLE_LINE_PATTERNS, name="sql-plausible")
+
+
+class SQLDetector(DetectorBase):
+    language = "sql"
+
+    def line_is_probably_code(self: SQLDetector, line: str) -> bool:
+        return self.features.matches("sql", line, first_matching_line_pattern)
+
+    def line_is_plausibly_code(self: SQLDetector, line: str) -> bool:
+        if super().line_is_plausibly_code(line):
+            return True
+
+        return self.features.matches(
+            "sql-plausible",
+            line,
+            first_matching_plausible_line_pattern,
+        )
+
+
+def first_matching_line_pattern(line: str) -> re.Pattern[str] | None:
+    return LINE_PATTERN_SET.first_match(line.strip())
+
+
+def first_matching_plausible_line_pattern(line: str) -> re.Pattern[str] | None:
+    return PLAUSIBLE_LINE_PATTERN_SET.first_match(line.strip())
@@ -1,4 +1,28 @@
-from . import base, python, python_traceback
+from . import (
+    attachments,
+    base,
+    budget,
+    cache,
+    cpp,
+    executor,
+    features,
+    incremental,
+    java,
+    javascript,
+    large_inputs,
+    merging,
+    ordering,
+    patterns,
+    prefilter,
+    profiling,
+    python,
+    python_traceback,
+    registry,
+    scoring,
+    sections,
+    sql,
+    stream,
+)
 
 
 def run() -> None:
@@ -10,3 +34,63 @@ def run() -> None:
 
     print("\nRunning tests for code_detection.python_traceback")
     python_traceback.run()
+
+    print("\nRunning tests for code_detection.javascript")
+    javascript.run()
+
+    print("\nRunning tests for code_detection.java")
+    java.run()
+
+    print("\nRunning tests for code_detection.cpp")
+    cpp.run()
+
+    print("\nRunning tests for code_detection.sql")
+    sql.run()
+
+    print("\nRunning tests for code_detection.registry")
+    registry.run()
+
+    print("\nRunning tests for code_detection.cache")
+    cache.run()
+
+    print("\nRunning tests for code_detection.features")
+    features.run()
+
+    print("\nRunning tests for code_detection.patterns")
+    patterns.run()
+
+    print("\nRunning tests for code_detection.prefilter")
+    prefilter.run()
+
+    print("\nRunning tests for code_detection.base sections")
+    sections.run()
+
+    print("\nRunning tests for code_detection.merging")
+    merging.run()
+
+    print("\nRunning tests for code_detection with large inputs")
+    large_inputs.run()
+
+    print("\nRunning tests for code_detection.incremental")
+    incremental.run()
+
+    print("\nRunning tests for code_detection.executor")
+    executor.run()
+
+    print("\nRunning tests for code_detection.budget")
+    budget.run()
+
+    print("\nRunning tests for code_detection.base streaming")
+    stream.run()
+
+    print("\nRunning tests for code_detection.attachments")
+    attachments.run()
+
+    print("\nRunning tests for code_detection.scoring")
+    scoring.run()
+
+    print("\nRunning tests for code_detection.profiling")
+    profiling.run()
+
+    print("\nRunning tests for code_detection.ordering")
+    ordering.run()
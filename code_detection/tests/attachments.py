@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+from textwrap import dedent
+
+import code_detection
+from code_detection import attachments
+from code_detection.attachments import (
+    decode_chunks,
+    decode_lines,
+    detect_streaming,
+    is_text_attachment,
+)
+from code_detection.base import DetectedSection
+from code_detection.python import PythonDetector
+from code_detection.python_traceback import PythonTracebackDetector
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+PASTE = dedent(
+    """\
+    here is my whole program, the error is somewhere at the bottom
+
+    import random
+
+    def roll(sides):
+        return random.randint(1, sides)
+
+    rolls = [roll(6) for _ in range(10)]
+    print(sum(rolls) / len(rolls))
+    """,
+)
+
+
+def sections(result: tuple[str, tuple[DetectedSection, ...]]) -> list[tuple]:
+    language, detected_sections = result
+    return [
+        (language, section.classification, section.start, section.end)
+        for section in detected_sections
+    ]
+
+
+def run() -> None:
+    test("message.txt", is_text_attachment("message.txt", "text/plain; charset=utf-8"))
+    test("source file", is_text_attachment("Main.JAVA", None))
+    test("image", not is_text_attachment("screenshot.png", "image/png"))
+
+    test("BOM is removed", "".join(decode_chunks(b"\xef\xbb\xbfx = 1")) == "x = 1")
+    test("invalid UTF-8 is replaced", "".join(decode_chunks(b"x = \xff")) == "x = �")
+
+    decode_chunk_bytes = attachments.DECODE_CHUNK_BYTES
+    attachments.DECODE_CHUNK_BYTES = 1
+    try:
+        test(
+            "characters and lines split across chunks",
+            list(decode_lines("é = 1\nprint(é)".encode())) == ["é = 1\n", "print(é)"],
+        )
+    finally:
+        attachments.DECODE_CHUNK_BYTES = decode_chunk_bytes
+
+    detected = detect_streaming(
+        [PythonDetector, PythonTracebackDetector],
+        PASTE.encode(),
+    )
+    expected = code_detection.detect_uncached(PASTE)
+    test(
+        "same as detect",
+        detected is not None
+        and expected is not None
+        and sections(detected) == sections(expected),
+    )
+    test(
+        "prose has no code",
+        detect_streaming([PythonDetector], b"hello\nthere\nhow are you?") is None,
+    )
+
+    code_detection.attachment_cache.clear()
+    hits = code_detection.attachment_cache.hits
+    first = code_detection.detect_attachment(PASTE.encode())
+    test("language", first is not None and first[0] == "python")
+    test(
+        "cached by content",
+        code_detection.detect_attachment(PASTE.encode()) is first
+        and code_detection.attachment_cache.hits == hits + 1,
+    )
+    test(
+        "async is cached too",
+        asyncio.run(code_detection.detect_attachment_async(PASTE.encode())) is first,
+    )
+
+    # only the first `max_attachment_bytes` are detected
+    prose = PASTE.splitlines(keepends=True)[0].encode()
+    max_attachment_bytes = code_detection.max_attachment_bytes
+    code_detection.max_attachment_bytes = len(prose)
+    code_detection.attachment_cache.clear()
+    try:
+        test(
+            "code after the size limit is ignored",
+            code_detection.detect_attachment(PASTE.encode()) is None,
+        )
+    finally:
+        code_detection.max_attachment_bytes = max_attachment_bytes
+
+    code_detection.attachment_cache.clear()
+    decoded = code_detection.detect_attachment(b"\xef\xbb\xbf\xff" + PASTE.encode())
+    test(
+        "BOM and invalid UTF-8 are decoded",
+        decoded is not None and sections(decoded) == sections(first),
+    )
+
+    seconds = code_detection.detection_budget.seconds
+    exceeded = code_detection.detection_budget.exceeded
+    code_detection.detection_budget.seconds = -1
+    code_detection.attachment_cache.clear()
+    try:
+        test(
+            "out of time is plain text",
+            code_detection.detect_attachment(PASTE.encode()) is None
+            and code_detection.detection_budget.exceeded == exceeded + 1,
+        )
+    finally:
+        code_detection.detection_budget.seconds = seconds
+        code_detection.attachment_cache.clear()
@@ -6,9 +6,7 @@ from .helpers import create_tester
 
 
 class SimpleDetector(DetectorBase):
-    @property
-    def language(self) -> str:
-        return "test"
+    language = "test"
 
     def line_is_probably_code(self: SimpleDetector, line: str) -> bool:
         return "code" in line
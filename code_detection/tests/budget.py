@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+
+import code_detection
+from code_detection.budget import DetectionBudget, DetectionBudgetExceeded
+from code_detection.incremental import IncrementalDetectionStore
+from code_detection.python import PythonDetector
+from code_detection.registry import DetectorRegistry
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+CODE = "x = 1\ny = 2\nprint(x + y)"
+
+
+def run() -> None:
+    test("no budget has no deadline", DetectionBudget(None).deadline() is None)
+
+    try:
+        PythonDetector(CODE, deadline=time.perf_counter() - 1).detect()
+        raised = False
+    except DetectionBudgetExceeded:
+        raised = True
+    test("detectors past their deadline give up", raised)
+    test(
+        "detectors before their deadline finish",
+        PythonDetector(CODE, deadline=time.perf_counter() + 60).debug() == "3c",
+    )
+
+    seconds = code_detection.detection_budget.seconds
+    exceeded = code_detection.detection_budget.exceeded
+    code_detection.detection_budget.seconds = -1
+    try:
+        test("out of time is plain text", code_detection.detect_uncached(CODE) is None)
+        test(
+            "running out of time is counted",
+            code_detection.detection_budget.exceeded == exceeded + 1,
+        )
+    finally:
+        code_detection.detection_budget.seconds = seconds
+
+    store = IncrementalDetectionStore(
+        DetectorRegistry.from_classes([PythonDetector]),
+        budget=DetectionBudget(-1),
+    )
+    test(
+        "out of time is plain text when incremental", store.detect("key", CODE) is None
+    )
+    test("incomplete detectors aren't kept", "key" not in store.entries)
+
+    long_assignment = "x" * 1000 + " = 1"
+    test(
+        "only the start of long lines is classified",
+        PythonDetector("\n".join([long_assignment] * 3)).debug() == "3p",
+    )
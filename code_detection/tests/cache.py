@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+import code_detection
+from code_detection.cache import DetectionCache
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+def run() -> None:
+    calls: list[str] = []
+
+    def compute(text: str) -> int:
+        calls.append(text)
+        return len(text)
+
+    cache: DetectionCache[int] = DetectionCache(max_size=2)
+    test("miss computes", cache.get("a", compute) == 1 and calls == ["a"])
+    test("hit does not compute", cache.get("a", compute) == 1 and calls == ["a"])
+    test("hit/miss counters", (cache.hits, cache.misses) == (1, 1))
+
+    cache.get("bb", compute)
+    cache.get("a", compute)  # "a" is now the most recently used
+    cache.get("ccc", compute)  # evicts "bb"
+    test("size is bounded", len(cache.entries) == 2)
+    test(
+        "least recently used is evicted",
+        cache.digest("bb") not in cache.entries and cache.digest("a") in cache.entries,
+    )
+
+    cache.resize(0)
+    cache.get("a", compute)
+    test("size 0 disables caching", not cache.entries and calls[-1] == "a")
+
+    text = dedent(
+        """\
+        def f(x):
+            return x
+
+        f(1)\
+        """,
+    )
+    code_detection.detection_cache.clear()
+    test(
+        "detect matches detect_uncached",
+        code_detection.detect(text) == code_detection.detect_uncached(text),
+    )
+    test(
+        "detect returns the cached result",
+        code_detection.detect(text) is code_detection.detect(text)
+        and code_detection.detection_cache.hits == 2,
+    )
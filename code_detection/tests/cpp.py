@@ -0,0 +1,62 @@
+from textwrap import dedent
+
+from code_detection.cpp import CppDetector
+
+from .helpers import create_tester
+
+test = create_tester(CppDetector)
+
+
+def run() -> None:
+    print("code-only")
+    test(
+        dedent(
+            """\
+            #include <iostream>
+            using namespace std;
+
+            int main() {
+                int x;
+                cin >> x;
+                cout << x * 2 << endl;
+                return 0;
+            }\
+            """,
+        ),
+        "9c",
+    )
+
+    print("mixed code and english")
+    test(
+        dedent(
+            """\
+            my program segfaults and I don't know why
+
+            #include <stdio.h>
+            #include <stdlib.h>
+
+            int main(void) {
+                int *numbers = malloc(10 * sizeof(int));
+                for (int i = 0; i <= 10; i++) {
+                    numbers[i] = i;
+                }
+                printf("%d\\n", numbers[10]);
+                free(numbers);
+                return 0;
+            }\
+            """,
+        ),
+        "2p 12c",
+    )
+
+    print("english only")
+    test(
+        dedent(
+            """\
+            Should I learn C or C++ first?
+            I heard that C++ templates are really hard,
+            but C doesn't have classes which I need for my project.\
+            """,
+        ),
+        "3p",
+    )
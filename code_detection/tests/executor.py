@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import code_detection
+from code_detection.executor import DetectionExecutor
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+async def run_async() -> None:
+    executor = DetectionExecutor(inline_max_lines=2, timeout=0.05)
+
+    await executor.run("small", len, "small")
+    test("small inputs run inline", executor.inline_calls == 1)
+
+    await executor.run("a\nb\nc", len, "a\nb\nc")
+    test("large inputs are offloaded", executor.offloaded_calls == 1)
+
+    try:
+        await executor.run("a\nb\nc", time.sleep, 0.2)
+        timed_out = False
+    except TimeoutError:
+        timed_out = True
+    test("slow calls time out", timed_out and executor.timeouts == 1)
+    test("timed out call is still queued", executor.queue_depth == 1)
+    await asyncio.sleep(0.3)
+    test("queue drains once the worker finishes", executor.queue_depth == 0)
+    executor.shutdown()
+
+    text = "\n".join(["print(x)"] * 500)
+    test(
+        "detect_async matches detect",
+        await code_detection.detect_async(text) == code_detection.detect_uncached(text),
+    )
+
+    # forces the timeout path of `detect_async`, like a paste which takes too long to detect
+    timeout = code_detection.detection_executor.timeout
+    code_detection.detection_executor.timeout = 0
+    try:
+        await code_detection.detect_async(text + "\nx = 1")
+        timed_out = False
+    except TimeoutError:
+        timed_out = True
+    finally:
+        code_detection.detection_executor.timeout = timeout
+    test("detect_async raises the builtin TimeoutError", timed_out)
+
+
+def run() -> None:
+    asyncio.run(run_async())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import re
+from textwrap import dedent
+
+from code_detection.features import LineFeatures
+from code_detection.python import PythonDetector
+from code_detection.python_traceback import PythonTracebackDetector
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+def run() -> None:
+    text = dedent(
+        """\
+        my code crashes, please help
+
+        def f(x):
+            return x[0]
+
+        f([])
+        Traceback (most recent call last):
+          File "main.py", line 4, in <module>
+            f([])
+        IndexError: list index out of range\
+        """,
+    )
+
+    features = LineFeatures()
+    python = PythonDetector(text, features)
+    python.detect()
+    evaluations_after_python = features.evaluations
+
+    traceback = PythonTracebackDetector(text, features)
+    traceback.detect()
+
+    test(
+        "results are unchanged by sharing",
+        python.debug() == PythonDetector(text).debug()
+        and traceback.debug() == PythonTracebackDetector(text).debug(),
+    )
+    test(
+        "python patterns are not re-evaluated by the traceback detector",
+        features.results["python"].keys() == set(text.splitlines())
+        and features.evaluations - evaluations_after_python
+        == len(features.results["python-traceback"]),
+    )
+
+    calls: list[str] = []
+
+    def matcher(line: str) -> re.Pattern[str] | None:
+        calls.append(line)
+        return None
+
+    features = LineFeatures()
+    features.matches("family", "x", matcher)
+    features.matches("family", "x", matcher)
+    features.matches("other family", "x", matcher)
+    test("each family is evaluated once per line", calls == ["x", "x"])
+
+    pattern = re.compile("x")
+    features = LineFeatures()
+    features.matches("family", "x", lambda _: pattern)
+    features.matches("other family", "y", matcher)
+    test("the last match is recorded", features.last_hit == ("family", "x"))
+
+    features.last_hit = None
+    features.matches("family", "x", matcher)
+    test("cached matches are recorded", features.last_hit == ("family", "x"))
@@ -31,3 +31,21 @@ def create_tester(detector: type[DetectorBase]) -> Callable[[str, str], None]:
             )
 
     return test
+
+
+def create_condition_tester() -> Callable[[str, bool], None]:
+    """
+    For tests which check a condition rather than the result of a detector.
+    """
+    test_counter = 0
+
+    def test(description: str, passed: bool) -> None:
+        nonlocal test_counter
+        test_counter += 1
+
+        if passed:
+            print(f"  TEST #{test_counter} SUCCEEDED ({description})")
+        else:
+            print(f"  TEST #{test_counter} FAILED ({description})")
+
+    return test
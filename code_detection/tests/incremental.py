@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+import code_detection
+from code_detection.cache import DetectionCache
+from code_detection.incremental import IncrementalDetectionStore
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+ORIGINAL = dedent(
+    """\
+    can someone help me with this? it says the index is out of range
+
+    numbers = [1, 2, 3]
+    for i in range(4):
+        print(numbers[i])
+
+    Traceback (most recent call last):
+      File "main.py", line 3, in <module>
+        print(numbers[i])
+    IndexError: list index out of range\
+    """,
+)
+
+EDITS = [
+    ("line changed", ORIGINAL.replace("range(4)", "range(3)")),
+    ("lines inserted", ORIGINAL.replace("\n\n", "\nthis is my code:\n\n", 1)),
+    ("lines deleted", ORIGINAL.split("\n\nTraceback")[0]),
+    ("first line deleted", ORIGINAL.split("\n", 1)[1]),
+    ("code removed", "nevermind, I figured it out"),
+    ("code added back", ORIGINAL),
+]
+
+
+def run() -> None:
+    store = IncrementalDetectionStore(code_detection.detector_registry)
+    store.detect("message", ORIGINAL)
+    test("first detection is full", store.full_detections == 1)
+
+    for description, text in EDITS:
+        test(
+            f"{description} matches a full detection",
+            store.detect("message", text) == code_detection.detect_uncached(text),
+        )
+
+    test(
+        "edits are incremental",
+        store.full_detections == 1 and store.incremental_detections == len(EDITS),
+    )
+
+    store = IncrementalDetectionStore(code_detection.detector_registry)
+    store.detect("message", ORIGINAL)
+    reclassified_before = store.lines_reclassified
+    store.detect("message", ORIGINAL.replace("range(4)", "range(3)"))
+    test(
+        "a one line edit only reclassifies that line",
+        store.lines_reclassified - reclassified_before == len(store.entries["message"]),
+    )
+
+    store = IncrementalDetectionStore(code_detection.detector_registry, max_messages=2)
+    for key in range(3):
+        store.detect(key, ORIGINAL)
+    test("store is bounded", list(store.entries) == [1, 2])
+
+    cache = DetectionCache()
+    cache.put(ORIGINAL, code_detection.detect_uncached(ORIGINAL))
+    store = IncrementalDetectionStore(code_detection.detector_registry, cache=cache)
+    store.detect("message", ORIGINAL)
+    test("a cached text is still stored", "message" in store.entries)
+    store.detect("message", ORIGINAL.replace("range(4)", "range(3)"))
+    test("so its next edit is incremental", store.incremental_detections == 1)
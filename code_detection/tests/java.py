@@ -0,0 +1,57 @@
+from textwrap import dedent
+
+from code_detection.java import JavaDetector
+
+from .helpers import create_tester
+
+test = create_tester(JavaDetector)
+
+
+def run() -> None:
+    print("code-only")
+    test(
+        dedent(
+            """\
+            public class Main {
+                public static void main(String[] args) {
+                    Scanner scanner = new Scanner(System.in);
+                    int n = scanner.nextInt();
+                    for (int i = 0; i < n; i++) {
+                        System.out.println(i);
+                    }
+                }
+            }\
+            """,
+        ),
+        "9c",
+    )
+
+    print("mixed code and english")
+    test(
+        dedent(
+            """\
+            I keep getting a NullPointerException here, any idea?
+
+            private List<String> names;
+
+            public void addName(String name) {
+                names.add(name);
+            }
+
+            It happens when I call addName for the first time\
+            """,
+        ),
+        "2p 5c 2p",
+    )
+
+    print("english only")
+    test(
+        dedent(
+            """\
+            My teacher said that every public method needs a comment.
+            Is that true for private methods as well?
+            I couldn't find anything about it in the style guide.\
+            """,
+        ),
+        "3p",
+    )
@@ -0,0 +1,70 @@
+from textwrap import dedent
+
+from code_detection.javascript import JavaScriptDetector
+
+from .helpers import create_tester
+
+test = create_tester(JavaScriptDetector)
+
+
+def run() -> None:
+    print("code-only")
+    test(
+        dedent(
+            """\
+            const express = require("express");
+            const app = express();
+
+            app.get("/", (req, res) => {
+                res.send("Hello World!");
+            });
+
+            app.listen(3000, () => console.log("listening"));\
+            """,
+        ),
+        "8c",
+    )
+
+    print("mixed code and english")
+    test(
+        dedent(
+            """\
+            why does this always print undefined??
+
+            function getUser(id) {
+                fetch(`/api/users/${id}`)
+                    .then((response) => response.json())
+                    .then((user) => {
+                        return user;
+                    });
+            }
+
+            console.log(getUser(1));
+
+            thanks in advance\
+            """,
+        ),
+        "2p 9c 2p",
+    )
+
+    print("english only")
+    test(
+        dedent(
+            """\
+            Hey, I'm learning javascript and java at the same time.
+            Is it a good idea to pick one language first?
+            I have a function to write for class, and a website to make.\
+            """,
+        ),
+        "3p",
+    )
+    test(
+        dedent(
+            """\
+            Installation
+            =============================
+            Run the installer and follow the instructions.\
+            """,
+        ),
+        "3p",
+    )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from code_detection.python import PythonDetector
+from code_detection.python_traceback import PythonTracebackDetector
+
+from .base import SimpleDetector
+from .helpers import create_tester
+
+test_simple = create_tester(SimpleDetector)
+test_python = create_tester(PythonDetector)
+test_traceback = create_tester(PythonTracebackDetector)
+
+TRACEBACK_FRAME = """\
+  File "/home/user/project/main.py", line 12, in recurse
+    return recurse(n + 1)"""
+
+
+def run() -> None:
+    print("Benchmarking large inputs...")
+
+    test_simple("\n".join(["code"] * 5000), "5000c")
+
+    test_simple(
+        "\n".join(["some text", *["code"] * 2000, "", "", "more text"] * 3),
+        "1p 2000c 4p 2000c 4p 2000c 3p",
+    )
+
+    # many alternating short sections
+    test_simple("\n".join(["code", "code", "code", "text"] * 20000), "79999c 1p")
+
+    test_traceback(
+        "\n".join(
+            [
+                "my program crashes after a while, does anyone know why?",
+                "Traceback (most recent call last):",
+                *[TRACEBACK_FRAME] * 1000,
+                "RecursionError: maximum recursion depth exceeded",
+            ],
+        ),
+        "1p 2002c",
+    )
+
+    # would backtrack through every way of splitting the identifier into names
+    test_python("\n".join(["for " + "a" * 200] * 3), "3p")
+    test_python("\n".join(["for " + "a" * 200 + " in x"] * 3), "3c")
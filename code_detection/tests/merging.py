@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import random
+
+from code_detection.merging import merge_short_runs
+
+from .base import SimpleDetector
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+def merged(is_code: list[int], lengths: list[int]) -> tuple[list[int], list[int]]:
+    merged_is_code, merged_lengths = merge_short_runs(is_code, lengths, 3, 2)
+    return list(merged_is_code), list(merged_lengths)
+
+
+def run() -> None:
+    test("no runs", merged([], []) == ([0], [0]))
+    test("too few lines", merged([1], [2]) == ([0], [2]))
+    test("short sections", merged([1, 0, 1, 0], [3, 2, 1, 8]) == ([1, 0], [3, 11]))
+    test(
+        "plain text at the start and end is kept",
+        merged([0, 1, 0, 1, 0], [1, 3, 1, 4, 1]) == ([0, 1, 0], [1, 8, 1]),
+    )
+    test("short code at the top", merged([1, 0], [2, 5]) == ([0], [7]))
+
+    rng = random.Random(0)
+    same_as_reference = True
+    for _ in range(2000):
+        min_code_lines, min_plain_text_lines = rng.randint(1, 5), rng.randint(1, 4)
+
+        class Detector(SimpleDetector):
+            min_code_lines_in_a_row = min_code_lines
+            min_plain_text_lines_in_a_row = min_plain_text_lines
+
+        lines = rng.choices(["code", "text", ""], k=rng.randint(0, 30))
+        detector = Detector("\n".join(lines))
+        sections = detector.classify_lines()
+        same_as_reference &= [
+            (section.classification, section.start, section.end)
+            for section in detector.merge_short_sections(sections)
+        ] == [
+            (section.classification, section.start, section.end)
+            for section in detector.merge_short_sections_reference(sections)
+        ]
+
+    test("same sections as the reference implementation", same_as_reference)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from code_detection import python
+from code_detection.ordering import AdaptivePatternOrder
+from code_detection.patterns import PatternSet
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+LINES = ["def f(x):", "    return x", "hello there", "x = [1, 2]", "", "print(x)"]
+
+
+def make_pattern_set() -> PatternSet:
+    return PatternSet(
+        [re.compile("^a"), re.compile("b"), re.compile("c"), re.compile("^d")],
+        name="test",
+    )
+
+
+def run() -> None:
+    pattern_set = make_pattern_set()
+    pattern_set.search("c")
+    test("hits aren't counted unless adaptive", not pattern_set.hits)
+
+    order = AdaptivePatternOrder(reorder_every=3)
+    order.register(pattern_set)
+    order.enable()
+    for line in ["c", "c", "dc"]:
+        pattern_set.search(line)
+    test(
+        "reordered by hits",
+        list(pattern_set.hits_by_pattern().items())
+        == [("c", 2), ("^d", 1), ("^a", 0), ("b", 0)],
+    )
+    test(
+        "the most common pattern matches first",
+        pattern_set.first_match("cb").pattern == "c",
+    )
+    test(
+        "results are unchanged by the order",
+        all(
+            pattern_set.search(line) == make_pattern_set().search(line)
+            for line in ["a", "b", "ab", "xa", "d", "xd", "", "bcd"]
+        ),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "order.json"
+        order.save(path)
+
+        restarted = AdaptivePatternOrder(reorder_every=3)
+        restarted.load(path)
+        restarted.enable()
+        lazily_registered = make_pattern_set()
+        restarted.register(lazily_registered)
+        test(
+            "a restart begins in the learned order",
+            lazily_registered.order == pattern_set.order
+            and restarted.state() == order.state(),
+        )
+
+        unused = AdaptivePatternOrder()
+        unused.load(path)
+        test(
+            "sets which weren't registered keep their loaded hits",
+            unused.state() == order.state(),
+        )
+
+        missing = AdaptivePatternOrder()
+        missing.load(Path(directory) / "missing.json")
+        test("a missing file is ignored", missing.state() == {})
+
+    python_set = PatternSet(python.LINE_PATTERNS, name="python")
+    static_set = PatternSet(python.LINE_PATTERNS, name="python")
+    order = AdaptivePatternOrder(reorder_every=2)
+    order.register(python_set)
+    order.enable()
+    test(
+        "python patterns match the same lines in a learned order",
+        [python_set.search(line.strip()) for line in LINES * 3]
+        == [static_set.search(line.strip()) for line in LINES * 3]
+        and python_set.order != static_set.order,
+    )
+
+    # detection may run on a worker thread and inline at the same time (see executor.py)
+    pattern_set = make_pattern_set()
+    order = AdaptivePatternOrder(reorder_every=5)
+    order.register(pattern_set)
+    order.enable()
+    lines = ["a", "b", "c", "d", "x"] * 400
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda _: [pattern_set.search(line) for line in lines], range(4)
+            ),
+        )
+    test(
+        "concurrent hits are all counted",
+        sum(pattern_set.hits.values()) == 4 * 4 * 400
+        and all(result == [line != "x" for line in lines] for result in results),
+    )
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+
+from code_detection import python, python_traceback
+from code_detection.patterns import (
+    PatternSet,
+    is_top_level_alternation,
+    leading_literal,
+)
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+LINES = [
+    "",
+    "   ",
+    "hello world",
+    "class Foo(Bar):",
+    "classes are fun:",
+    "def f(x):",
+    "    return x",
+    "for i in range(10):",
+    "for each of these, in order:",
+    "x = 1",
+    "x, y = y, x",
+    "a.b = c",
+    "print(a.b(c))",
+    "foo(bar)",
+    "else:",
+    "if x:",
+    "it works if you try, else it doesn't",
+    "lambda x: x",
+    "await asyncio.sleep(1)",
+    "...",
+    "# comment",
+    "@decorator",
+    "list[int]",
+    "    (a, b)",
+    "Traceback (most recent call last):",
+    "traceback (MOST recent call last):",
+    '  File "main.py", line 4, in <module>',
+    'file "main.py", line 4',
+    "IndexError: list index out of range",
+    "During handling of the above exception, another exception occurred:",
+    "[Previous line repeated 996 more times]",
+    "^^^^^",
+    "x +",
+    "it costs 5",
+    "and then i said 'hi'",
+]
+
+
+def run() -> None:
+    test("leading literal of ^class", leading_literal(r"^class\s+") == "class")
+    test("leading literal skips \\b", leading_literal(r"\bawait[\(\s]+") == "await")
+    test("leading literal of escapes", leading_literal(r"^\.\.\.$") == "...")
+    test("leading literal stops at quantifier", leading_literal(r"^ab?c") == "a")
+    test("leading literal of a group", leading_literal(r"^(a|b)") == "")
+    test("nested alternation", not is_top_level_alternation(r"^(a|b)[|]"))
+    test("top level alternation", is_top_level_alternation(r"^a|b"))
+
+    per_keyword = re.compile(
+        "[a-zA-Z_][a-zA-Z_0-9]*"
+        + "".join(f"(?<!{keyword})" for keyword in python.KEYWORDS),
+    )
+    grouped = re.compile(f"[a-zA-Z_][a-zA-Z_0-9]*{python.NOT_KEYWORD_LOOKBEHIND}")
+    test(
+        "keyword lookbehind is grouped by length",
+        python.NOT_KEYWORD_LOOKBEHIND.count("(?<!")
+        == len({len(keyword) for keyword in python.KEYWORDS}),
+    )
+    test(
+        "grouped keyword lookbehind is equivalent",
+        all(
+            [match.span() for match in per_keyword.finditer(text)]
+            == [match.span() for match in grouped.finditer(text)]
+            for text in LINES
+            + sorted(python.KEYWORDS)
+            + ["min(x)", "band", "alias = 1", "x_in_y", "ifs", "none", "Nonetheless"]
+        ),
+    )
+
+    backtracking = re.compile(f"({python.NAME}|{python.CONTAINER})+")
+    sequence = re.compile(python.NAME_OR_CONTAINER_SEQUENCE)
+    test(
+        "names and containers are matched without backtracking",
+        all(
+            bool(backtracking.fullmatch(text)) == bool(sequence.fullmatch(text))
+            for text in ["a", "ab", "a(b)", "(a)b", "a1", "1a", "(1)", "f(x)[0]", "xin"]
+            + ["x(in)", "(a)in", "min", "for", "a_b(c)", "a b", "()[]{}", ""]
+        ),
+    )
+
+    for name, patterns in [
+        ("python", python.LINE_PATTERNS),
+        ("python (no strip)", python.LINE_PATTERNS_NO_STRIP),
+        ("python (plausible)", python.PLAUSIBLE_LINE_PATTERNS),
+        ("python traceback", python_traceback.LINE_PATTERNS),
+    ]:
+        pattern_set = PatternSet(patterns)
+        test(
+            f"{name} patterns are equivalent",
+            all(
+                pattern_set.search(line)
+                == any(pattern.search(line) for pattern in patterns)
+                for line in LINES + [line.strip() for line in LINES]
+            ),
+        )
+        test(
+            f"{name} first_match matches",
+            all(
+                (pattern := pattern_set.first_match(line)) is None
+                or pattern.search(line) is not None
+                for line in LINES
+            ),
+        )
+
+    pattern_set = PatternSet([re.compile("^a"), re.compile("b"), re.compile("^c|d")])
+    test(
+        "alternations are not anchored",
+        pattern_set.search("xd") and not pattern_set.search("xa"),
+    )
+
+    traceback_lines = LINES + [
+        "ValueError",
+        "ValueError:",
+        "ValueErrorX: y",
+        "ValueError x",
+        "ExceptionGroup: x",
+        "Traceback(most recent call last)",
+        "FILE 'a', line 2, in f",
+        "Filename, line 3",
+        f"{python_traceback.DIRECT_CAUSE}:",
+        f"{python_traceback.DURING_HANDLING}::",
+        "The cat sat on the mat",
+        "^^x",
+        "[Previous line repeated many more times]",
+    ]
+    test(
+        "traceback fast paths are equivalent",
+        all(
+            (python_traceback.first_matching_line_pattern(line) is not None)
+            == python_traceback.LINE_PATTERN_SET.search(line.strip())
+            for line in traceback_lines
+        ),
+    )
+    fast_paths = [
+        (python_traceback.FAST_PATHS.get(python_traceback.leading_word(line)), line)
+        for line in map(str.strip, traceback_lines)
+    ]
+    test(
+        "traceback fast path checks imply their pattern",
+        all(
+            fast_path[0].match(line)
+            for fast_path, line in fast_paths
+            if fast_path is not None and fast_path[1](line)
+        ),
+    )
+    test(
+        "common traceback lines have fast paths",
+        all(
+            python_traceback.leading_word(line.strip()) in python_traceback.FAST_PATHS
+            for line in [
+                "Traceback (most recent call last):",
+                '  File "main.py", line 4, in <module>',
+                "IndexError: list index out of range",
+                "During handling of the above exception, another exception occurred:",
+                "[Previous line repeated 996 more times]",
+                "^^^^^",
+            ]
+        ),
+    )
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+import code_detection
+from code_detection.incremental import IncrementalDetectionStore, best_detection_result
+from code_detection.prefilter import PrefilterStats, prefilter_stats
+from code_detection.python import PythonDetector
+from code_detection.python_traceback import PythonTracebackDetector
+from code_detection.registry import DetectorRegistry
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+PROSE = dedent(
+    """
+    Hi everyone, I have a question about my homework.
+    We are supposed to write a function that sorts a list.
+    I don't really know where to start, could someone help me?
+    Thanks in advance
+    """,
+).strip()
+
+TRACEBACK = dedent(
+    """
+    I get this error
+    FİLE "main.py", line 3, in <module>
+    ValueError: invalid literal
+    but I don't know why
+    """,
+).strip()
+
+
+def run() -> None:
+    python_detector = PythonDetector(PROSE)
+    test(
+        "prose is rejected", not python_detector.might_contain_code(PROSE.splitlines())
+    )
+    test(
+        "rejected prose is plain text",
+        [s.debug() for s in python_detector.detect()] == ["4p"],
+    )
+
+    test(
+        "too few lines are rejected",
+        not PythonDetector("").might_contain_code(["def f():", "    pass"]),
+    )
+    test(
+        "code is not rejected",
+        PythonDetector("").might_contain_code(["x = 1", "y = 2", "print(x + y)"]),
+    )
+    test(
+        "indented lines are not rejected",
+        PythonDetector("").might_contain_code(["a", "b", "    foo"]),
+    )
+
+    test(
+        "tracebacks are rejected by the python detector",
+        not PythonDetector("").might_contain_code(TRACEBACK.splitlines()),
+    )
+    test(
+        "tracebacks are not rejected by the traceback detector",
+        PythonTracebackDetector("").might_contain_code(TRACEBACK.splitlines()),
+    )
+    test(
+        "tracebacks are matched case-insensitively",
+        PythonTracebackDetector("").line_might_be_code('fİle "main.py", line 3'),
+    )
+    test(
+        "every line that is probably code might be code",
+        all(
+            detector.line_might_be_code(line)
+            for detector in (PythonDetector(""), PythonTracebackDetector(""))
+            for line in TRACEBACK.splitlines() + ["for x in y", "x if y else z", "..."]
+            if detector.line_is_probably_code(line)
+        ),
+    )
+
+    # a rejected text's classifications can't be reused when it's edited
+    store = IncrementalDetectionStore(DetectorRegistry.from_classes([PythonDetector]))
+    store.detect("key", "x = 1\ny = 2")
+    edited = "x = 1\ny = 2\nz = 3"
+    test(
+        "edits of a rejected text are fully detected",
+        store.detect("key", edited) == best_detection_result([PythonDetector(edited)]),
+    )
+
+    stats = PrefilterStats()
+    stats.record("a", rejected=True)
+    stats.record("a", rejected=False)
+    stats.record("b", rejected=True)
+    test("rejection rate", stats.rejection_rate("a") == 0.5)
+    test("overall rejection rate", round(stats.rejection_rate(), 2) == 0.67)
+    test("unknown detector", stats.rejection_rate("c") == 0.0)
+
+    prefilter_stats.clear()
+    code_detection.detect_uncached(PROSE)
+    test(
+        "shared stats are recorded",
+        prefilter_stats.rejection_rate("PythonDetector") == 1.0,
+    )
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import re
+import tempfile
+from pathlib import Path
+
+from code_detection import python
+from code_detection.patterns import PatternSet
+from code_detection.profiling import PatternProfiler, pattern_profiler
+from code_detection.python import PythonDetector
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+LINES = ["def f(x):", "    return x", "hello there", "x = [1, 2]", "", "  # hi"]
+
+
+def run() -> None:
+    pattern_set = PatternSet(
+        [re.compile("^a"), re.compile("b"), re.compile("a")],
+        name="test",
+    )
+    pattern_profiler.clear()
+    pattern_profiler.enabled = True
+    try:
+        first_match = pattern_set.first_match("ab")
+        no_match = pattern_set.search("c")
+
+        profiled = [
+            python.first_matching_line_pattern(line) is not None for line in LINES
+        ]
+        debug = PythonDetector("\n".join(LINES)).debug()
+    finally:
+        pattern_profiler.enabled = False
+
+    test("the first pattern in order matches", first_match is pattern_set.patterns[0])
+    test("no match", not no_match)
+
+    profiles = pattern_profiler.sorted_profiles("test")
+    test(
+        "every pattern is evaluated, even after a match",
+        sorted((p.pattern, p.evaluations, p.hits) for p in profiles)
+        == [("^a", 2, 1), ("a", 2, 1), ("b", 2, 1)],
+    )
+    test(
+        "profiles are sorted by time",
+        [p.seconds for p in profiles]
+        == sorted((p.seconds for p in profiles), reverse=True),
+    )
+    test(
+        "results are unchanged while profiling",
+        profiled
+        == [python.first_matching_line_pattern(line) is not None for line in LINES]
+        and debug == PythonDetector("\n".join(LINES)).debug(),
+    )
+    test(
+        "python patterns are profiled",
+        {p.pattern for p in pattern_profiler.sorted_profiles("python")}
+        == {pattern.pattern for pattern in python.LINE_PATTERNS},
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "profiles.json"
+        pattern_profiler.save(path)
+        saved = json.loads(path.read_text())
+    test(
+        "profiles are saved",
+        len(saved) == len(pattern_profiler.profiles)
+        and {"pattern_set", "pattern", "evaluations", "hits", "seconds"}
+        <= set(saved[0]),
+    )
+    test(
+        "dump has a row per pattern",
+        len(pattern_profiler.dump(limit=5).splitlines()) == 6,
+    )
+
+    profiler = PatternProfiler()
+    profiler.record("set", "x", hit=True, seconds=0.5)
+    profiler.record("set", "x", hit=False, seconds=0.25)
+    test(
+        "counts are accumulated",
+        profiler.sorted_profiles()[0].hit_rate == 0.5
+        and profiler.sorted_profiles()[0].seconds == 0.75,
+    )
+
+    pattern_profiler.clear()
+    pattern_set.first_match("ab")
+    test("nothing is profiled when disabled", not pattern_profiler.profiles)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sys
+
+import code_detection
+from code_detection.python import PythonDetector
+from code_detection.python_traceback import LEADING_TOKENS
+from code_detection.registry import DetectorRegistry, DetectorSpec
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+def names(registry: DetectorRegistry, text: str) -> list[str]:
+    return [spec.name for spec in registry.select_specs(text)]
+
+
+def run() -> None:
+    registry = DetectorRegistry(
+        [
+            DetectorSpec(name="python", module=".python", class_name="PythonDetector"),
+            DetectorSpec(
+                name="sql",
+                module=".sql",
+                class_name="SQLDetector",
+                cost=0.5,
+                case_insensitive_trigger_tokens=("select ",),
+            ),
+            DetectorSpec(
+                name="cpp",
+                module=".cpp",
+                class_name="CppDetector",
+                trigger_tokens=("#include",),
+            ),
+        ],
+    )
+    test(
+        "detectors without trigger tokens always run",
+        names(registry, "") == ["python"],
+    )
+    test(
+        "trigger tokens select detectors",
+        names(registry, "#include <stdio.h>") == ["python", "cpp"],
+    )
+    test(
+        "case-insensitive trigger tokens",
+        names(registry, "SELECT * FROM x") == ["python", "sql"],
+    )
+    test(
+        "case-insensitive trigger tokens are folded like IGNORECASE",
+        names(registry, "ſELECT * FROM x") == ["python", "sql"],
+    )
+    test("estimated cost", registry.estimated_cost("select 1") == 1.5)
+
+    test(
+        "trigger tokens split across chunks",
+        [
+            spec.name
+            for spec in registry.select_specs_in_chunks(
+                iter(["x = 1\n#inc", "lude <stdio.h>\nSEL", "ECT", " 1"]),
+            )
+        ]
+        == ["python", "sql", "cpp"],
+    )
+    test(
+        "no chunks",
+        [spec.name for spec in registry.select_specs_in_chunks(iter([]))] == ["python"],
+    )
+
+    sys.modules.pop("code_detection.cpp", None)
+    registry.select("select 1")
+    test("detectors are imported lazily", "code_detection.cpp" not in sys.modules)
+    test(
+        "detectors are imported when selected",
+        registry.select("#include <stdio.h>")[-1].__module__ == "code_detection.cpp",
+    )
+
+    try:
+        registry.register(
+            DetectorSpec(name="python", module=".python", class_name="PythonDetector"),
+        )
+        test("duplicate names are rejected", False)
+    except ValueError:
+        test("duplicate names are rejected", True)
+
+    test(
+        "registry from classes",
+        DetectorRegistry.from_classes([PythonDetector]).select("") == [PythonDetector],
+    )
+
+    # skipping the traceback detector must never change the result, see DETECTOR_SPECS
+    traceback_spec = code_detection.detector_registry.specs["python-traceback"]
+    test(
+        "traceback trigger tokens cover every traceback line",
+        all(
+            any(token in leading_token for token in traceback_spec.trigger_tokens)
+            for leading_token in LEADING_TOKENS
+        ),
+    )
+
+    test(
+        "detect picks the language",
+        [
+            (code_detection.detect_uncached(text) or ("none",))[0]
+            for text in (
+                "x = 5\ny = 6\nprint(x + y)",
+                "let x = 5;\nlet y = 6;\nconsole.log(x + y);",
+                "#include <stdio.h>\nint x = 5;\nint y = 6;",
+                "SELECT *\nFROM users\nWHERE id = 1;",
+                "hello\nworld\nhow are you",
+            )
+        ]
+        == ["python", "js", "cpp", "sql", "none"],
+    )
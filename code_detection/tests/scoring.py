@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from textwrap import dedent
+
+import code_detection
+from code_detection.features import LineFeatures
+from code_detection.incremental import best_detection_result
+from code_detection.python import PythonDetector
+from code_detection.scoring import confidence, score_detectors
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+def run() -> None:
+    text = dedent(
+        """\
+        my code crashes, please help
+
+        def f(x):
+
+            return x[0]
+
+        f([])\
+        """,
+    )
+
+    detector = PythonDetector(text)
+    test("detected", detector.debug() == "2p 5c")
+    features_evaluated = detector.features.evaluations
+    test(
+        "only lines of code have hits",
+        [hit is not None for hit in detector.line_hits]
+        == [False, False, True, False, True, False, True],
+    )
+    test(
+        "hits name the pattern which matched",
+        detector.line_hits[4] == ("python", r"^return\b"),
+    )
+    test(
+        "sections share the hits",
+        detector.detect()[1].line_hits == tuple(detector.line_hits[2:]),
+    )
+    test("every non-blank line of code matched", detector.confidence == 1.0)
+    test(
+        "scoring doesn't match any more patterns",
+        detector.features.evaluations == features_evaluated,
+    )
+
+    merged = PythonDetector(
+        dedent(
+            """\
+            x = 1
+            y = 2
+            z = 3
+            and then
+            print(x)
+            print(y)
+            print(z)\
+            """,
+        ),
+    )
+    test("plain text is merged into the code", merged.debug() == "7c")
+    test("merged plain text lowers the confidence", merged.confidence == 6 / 7)
+    test("no code has no confidence", confidence(PythonDetector("hi").detect()) == 0)
+
+    features = LineFeatures()
+    detectors = [
+        detector_class(text, features)
+        for detector_class in code_detection.detector_registry.load_all()
+    ]
+    scores = score_detectors(detectors)
+    language, sections = best_detection_result(detectors)
+    test(
+        "the best score is the detection result",
+        scores[0].language == language and scores[0].confidence == confidence(sections),
+    )
+    test(
+        "scores are sorted",
+        [(s.probable_lines_of_code, s.lines_of_code) for s in scores]
+        == sorted(
+            ((s.probable_lines_of_code, s.lines_of_code) for s in scores),
+            reverse=True,
+        ),
+    )
+    test(
+        "score matches detect",
+        code_detection.score(text)[0].language == code_detection.detect(text)[0],
+    )
+
+    edited = PythonDetector(text + "\nf([1])", previous=detector)
+    edited.detect()
+    unedited = PythonDetector(edited.text)
+    unedited.detect()
+    test(
+        "edited lines keep their hits",
+        edited.line_hits == unedited.line_hits
+        and edited.lines_reclassified < len(edited.lines),
+    )
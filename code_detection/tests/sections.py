@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pickle
+
+from code_detection.base import DetectedSection
+from code_detection.python import PythonDetector
+
+from .helpers import create_condition_tester
+
+test = create_condition_tester()
+
+
+def run() -> None:
+    text = "\n".join(
+        [
+            "Hi, my code doesn't work:",
+            "",
+            "def f(x):",
+            "    return x + 1",
+            "print(f(1))",
+            "x = 5",
+            "",
+            "Does anyone know why?",
+        ],
+    )
+    detector = PythonDetector(text)
+    sections = detector.detect()
+
+    test("sections", " ".join(s.debug() for s in sections) == "2p 4c 2p")
+    test(
+        "sections share one line buffer",
+        all(section.buffer is detector.buffer for section in sections),
+    )
+    test(
+        "sections are contiguous",
+        [(s.start, s.end) for s in sections] == [(0, 2), (2, 6), (6, 8)],
+    )
+    test("lines", sections[1].lines == tuple(text.splitlines()[2:6]))
+    test("text strips blank lines", sections[0].text == "Hi, my code doesn't work:")
+    test("line probability", sections[1].line_probability == (True,) * 4)
+    test("probable lines of code", sections[1].probable_lines_of_code == 4)
+
+    test(
+        "equality compares contents, not offsets",
+        PythonDetector("Hello\n" + text).detect()[1] == sections[1],
+    )
+    test(
+        "equal sections hash equally",
+        hash(PythonDetector("Hello\n" + text).detect()[1]) == hash(sections[1]),
+    )
+    test("pickle round trip", pickle.loads(pickle.dumps(sections)) == sections)
+    test("not equal to other types", sections[1] != sections[1].lines)
+
+    empty = PythonDetector("").detect()
+    test(
+        "empty text",
+        len(empty) == 1
+        and empty[0].lines == ()
+        and isinstance(empty[0], DetectedSection),
+    )
@@ -0,0 +1,65 @@
+from textwrap import dedent
+
+from code_detection.sql import SQLDetector
+
+from .helpers import create_tester
+
+test = create_tester(SQLDetector)
+
+
+def run() -> None:
+    print("code-only")
+    test(
+        dedent(
+            """\
+            SELECT u.name, COUNT(o.id) AS orders
+            FROM users u
+            LEFT JOIN orders o ON o.user_id = u.id
+            WHERE u.active = 1
+            GROUP BY u.name
+            ORDER BY orders DESC;\
+            """,
+        ),
+        "6c",
+    )
+    test(
+        dedent(
+            """\
+            select *
+            from products
+            where price between 10 and 20
+            order by price\
+            """,
+        ),
+        "4c",
+    )
+
+    print("mixed code and english")
+    test(
+        dedent(
+            """\
+            how do I make the email unique? this is my table
+
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                email TEXT
+            );
+
+            I tried adding UNIQUE after TEXT but it doesn't work\
+            """,
+        ),
+        "2p 5c 2p",
+    )
+
+    print("english only")
+    test(
+        dedent(
+            """\
+            Select the option you want from the menu,
+            and then the database will update itself.
+            Where do I find the logs after that?\
+            """,
+        ),
+        "3p",
+    )
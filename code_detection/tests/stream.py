@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from textwrap import dedent
+from typing import TYPE_CHECKING
+
+from code_detection.python import PythonDetector
+
+from .base import SimpleDetector
+from .helpers import create_condition_tester
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from code_detection.base import DetectedSection
+
+test = create_condition_tester()
+
+
+def debug(sections: Iterable[DetectedSection]) -> str:
+    return " ".join(section.debug() for section in sections)
+
+
+MIXED = dedent(
+    """\
+    i'm getting the wrong answer, can someone help?
+
+    def fib(n):
+        if n <= 1:
+            return 1
+        else:
+            return fib(n - 1) + fib(n - 2)
+
+    print(fib(10))
+
+    it should print 55 but it doesn't\
+    """,
+)
+
+
+def run() -> None:
+    test(
+        "matches detect",
+        list(PythonDetector.detect_stream(MIXED.splitlines()))
+        == list(PythonDetector(MIXED).detect()),
+    )
+    test(
+        "newlines are removed",
+        list(PythonDetector.detect_stream(MIXED.splitlines(keepends=True)))
+        == list(PythonDetector(MIXED).detect()),
+    )
+    test(
+        "blank last line is kept",
+        debug(SimpleDetector.detect_stream(["code\n", "code\n", "code\n", "\n"]))
+        == "4c",
+    )
+
+    consumed = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal consumed
+        for line in ["code"] * 5 + ["text"] * 100 + ["code"] * 5:
+            consumed += 1
+            yield line
+
+    sections = SimpleDetector.detect_stream(lines())
+    test(
+        "sections are yielded early", next(sections).debug() == "5c" and consumed == 25
+    )
+    test(
+        "long plain text ends a chunk",
+        debug(sections) == "20p 20p 20p 20p 20p 5c",
+    )
+
+    test(
+        "chunks are limited in size",
+        debug(SimpleDetector.detect_stream(["code"] * 12000)) == "5000c 5000c 2000c",
+    )
+    test("no lines", debug(SimpleDetector.detect_stream([])) == "")
@@ -13,6 +13,7 @@ from discord.ext import commands, tasks
 
 import database
 from message_formatting.embeds import EmbedBuilder
+from util.aho_corasick import AhoCorasick, fold_ascii_case
 from util.limiter import limit, server
 from util.logger import log
 
@@ -20,7 +21,7 @@ if TYPE_CHECKING:
     from discord.commands.context import ApplicationContext
 
 
-def get_keywords(ctx: discord.AutocompleteContext) -> list[str]:
+async def get_keywords(ctx: discord.AutocompleteContext) -> list[str]:
     """
     It gets all the keywords from the database for the user who is currently using the command
 
@@ -33,15 +34,13 @@ def get_keywords(ctx: discord.AutocompleteContext) -> list[str]:
         return []
 
     # We no longer keep track of the name because this can change, breaking the alert.
-    conn = database.connect()
-    data = [
+    return [
         keyword
-        for (keyword,) in conn.cursor()
-        .execute("SELECT message FROM alert WHERE uid = ?", (ctx.interaction.user.id,))
-        .fetchall()
+        for (keyword,) in await database.fetchall(
+            "SELECT message FROM alert WHERE uid = ?",
+            (ctx.interaction.user.id,),
+        )
     ]
-    conn.close()
-    return data
 
 
 @dataclass
@@ -139,11 +138,211 @@ class AlertMemory:
         return True
 
 
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]|()")
+
+# Constructs which cannot safely be combined with other keywords into a single alternation
+# (backreferences, conditionals, named groups and global inline flags)
+UNCOMBINABLE_REGEX = re.compile(r"\\\d|\(\?P[=<]|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+def literal_keyword(keyword: str) -> str | None:
+    """
+    If the keyword is a regex which can only ever match one fixed string, return that string (lowercased).
+    Otherwise, returns None.
+    For example "hello" => "hello", "c\\+\\+" => "c++", "colou?r" => None
+
+    Only ASCII literals are returned, so that they can be matched against `fold_ascii_case(text)`.
+    """
+    chars: list[str] = []
+    escaped = False
+    for char in keyword:
+        if escaped:
+            if char.isalnum():
+                # special sequences such as \d, \b, \1
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in REGEX_METACHARACTERS:
+            return None
+        else:
+            chars.append(char)
+
+    literal = "".join(chars)
+    if escaped or not literal.isascii():
+        return None
+
+    return literal.lower()
+
+
+class RegexKeywordGroup:
+    """
+    A group of regex keywords which are searched for using a single combined alternation.
+    If the combined pattern matches, the group is split in half (recursively) to find exactly
+    which keywords matched. This means that a message which matches nothing costs one search,
+    and a message which matches k keywords costs roughly k * log2(n) searches.
+    """
+
+    def __init__(self: RegexKeywordGroup, keywords: list[str]) -> None:
+        self.keywords = keywords
+        self.children: tuple[RegexKeywordGroup, RegexKeywordGroup] | None = None
+        self.pattern: re.Pattern[str] | None = None
+
+        if len(keywords) == 1:
+            self.pattern = re.compile(keywords[0], re.IGNORECASE)
+            return
+
+        middle = len(keywords) // 2
+        self.children = (
+            RegexKeywordGroup(keywords[:middle]),
+            RegexKeywordGroup(keywords[middle:]),
+        )
+        with suppress(re.error):
+            self.pattern = re.compile(
+                "|".join(f"(?:{keyword})" for keyword in keywords),
+                re.IGNORECASE,
+            )
+
+    def find_all(self: RegexKeywordGroup, text: str) -> list[str]:
+        """
+        :return: Every keyword in this group which matches `text`.
+        """
+        # if the keywords could not be combined, we have to check each half regardless
+        if self.pattern is not None and not self.pattern.search(text):
+            return []
+
+        if self.children is None:
+            return self.keywords
+
+        left, right = self.children
+        return left.find_all(text) + right.find_all(text)
+
+
+class AlertIndex:
+    """
+    In-memory copy of the (un-paused) alerts, optimized for matching against every message.
+    Literal keywords are matched all at once with an Aho-Corasick automaton, and regex keywords
+    are matched with combined alternations (see `RegexKeywordGroup`).
+
+    Must be kept in sync with the `alert` table by calling the mutators below whenever it changes.
+    The matchers are rebuilt lazily, on the first message after a change.
+    """
+
+    def __init__(self: AlertIndex) -> None:
+        # maps uid -> keyword -> paused
+        self.alerts: dict[int, dict[str, bool]] = {}
+        self.dirty = True
+
+        self.literal_automaton = AhoCorasick([])
+        self.literal_owners: dict[str, list[tuple[int, str]]] = {}
+        self.regex_group: RegexKeywordGroup | None = None
+        self.uncombinable_regexes: list[re.Pattern[str]] = []
+        self.regex_owners: dict[str, list[int]] = {}
+
+    def load(self: AlertIndex, rows: list[tuple[int, str, bool | None]]) -> None:
+        """
+        Replaces the contents of the index with `(uid, keyword, paused)` rows from the `alert` table.
+        """
+        self.alerts.clear()
+        for uid, keyword, paused in rows:
+            self.alerts.setdefault(uid, {})[keyword] = bool(paused)
+        self.dirty = True
+
+    def add(self: AlertIndex, uid: int, keyword: str) -> None:
+        self.alerts.setdefault(uid, {})[keyword] = False
+        self.dirty = True
+
+    def remove(self: AlertIndex, uid: int, keyword: str) -> None:
+        with suppress(KeyError):
+            del self.alerts[uid][keyword]
+        self.dirty = True
+
+    def clear(self: AlertIndex, uid: int) -> None:
+        self.alerts.pop(uid, None)
+        self.dirty = True
+
+    def set_paused(self: AlertIndex, uid: int, paused: bool) -> None:
+        keywords = self.alerts.get(uid, {})
+        for keyword in keywords:
+            keywords[keyword] = paused
+        self.dirty = True
+
+    def rebuild(self: AlertIndex) -> None:
+        """
+        Rebuilds the matchers from `self.alerts`.
+        """
+        self.literal_owners = {}
+        self.regex_owners = {}
+        for uid, keywords in self.alerts.items():
+            for keyword, paused in keywords.items():
+                if paused:
+                    continue
+
+                literal = literal_keyword(keyword)
+                if literal is not None:
+                    self.literal_owners.setdefault(literal, []).append((uid, keyword))
+                else:
+                    self.regex_owners.setdefault(keyword, []).append(uid)
+
+        self.literal_automaton = AhoCorasick(self.literal_owners)
+
+        combinable: list[str] = []
+        self.uncombinable_regexes = []
+        for keyword in self.regex_owners:
+            try:
+                pattern = re.compile(keyword, re.IGNORECASE)
+            except re.error:
+                # should never happen since keywords are validated when added
+                continue
+
+            if UNCOMBINABLE_REGEX.search(keyword):
+                self.uncombinable_regexes.append(pattern)
+            else:
+                combinable.append(keyword)
+
+        self.regex_group = RegexKeywordGroup(combinable) if combinable else None
+        self.dirty = False
+
+    def find_matches(self: AlertIndex, text: str) -> list[tuple[int, str]]:
+        """
+        Finds every alert which is triggered by `text`, in a single pass over the alerts.
+
+        :return: A list of (uid, keyword) pairs.
+        """
+        if self.dirty:
+            self.rebuild()
+
+        matches: list[tuple[int, str]] = []
+        for literal in self.literal_automaton.find_all(fold_ascii_case(text)):
+            matches.extend(self.literal_owners[literal])
+
+        matching_regexes = [
+            pattern.pattern
+            for pattern in self.uncombinable_regexes
+            if pattern.search(text)
+        ]
+        if self.regex_group is not None:
+            matching_regexes.extend(self.regex_group.find_all(text))
+
+        for keyword in matching_regexes:
+            matches.extend((uid, keyword) for uid in self.regex_owners[keyword])
+
+        return matches
+
+
 class Alerts(commands.Cog):
     def __init__(self: Alerts, bot: commands.Bot) -> None:
         self.bot = bot
-        self.db = database.connect()
         self.alert_memory = AlertMemory()
+        self.alert_index = AlertIndex()
+
+        # the cog is constructed before the event loop starts, so it's fine to block here
+        db = database.connect()
+        self.alert_index.load(
+            db.execute("SELECT uid, message, paused FROM alert").fetchall(),
+        )
+        db.close()
 
     # periodically clear expired alert records
     @tasks.loop(seconds=15)
@@ -183,12 +382,10 @@ class Alerts(commands.Cog):
             keyword = re.escape(keyword)
             escaped = True
 
-        c = self.db.cursor()
-        c.execute(
+        if await database.fetchone(
             "SELECT * FROM alert WHERE message = ? AND uid = ?",
             (keyword, ctx.author.id),
-        )
-        if c.fetchone():
+        ):
             embed = EmbedBuilder(
                 title="Error",
                 description="This keyword is already in the database.",
@@ -196,11 +393,11 @@ class Alerts(commands.Cog):
             await ctx.respond(embed=embed, ephemeral=True)
             return
 
-        c.execute(
+        await database.execute(
             "INSERT INTO alert(uid, message) VALUES (?, ?)",
             (ctx.author.id, keyword),
         )
-        self.db.commit()
+        self.alert_index.add(ctx.author.id, keyword)
 
         embed = EmbedBuilder(
             title="Success",
@@ -237,12 +434,10 @@ class Alerts(commands.Cog):
         :type keyword: str
         """
 
-        c = self.db.cursor()
-        c.execute(
+        if not await database.fetchone(
             "SELECT * FROM alert WHERE message = ? AND uid = ?",
             (keyword, ctx.author.id),
-        )
-        if not c.fetchone():
+        ):
             embed = EmbedBuilder(
                 title="Error",
                 description="This keyword is not in the database.",
@@ -250,11 +445,11 @@ class Alerts(commands.Cog):
             await ctx.respond(embed=embed, ephemeral=True)
             return
 
-        c.execute(
+        await database.execute(
             "DELETE FROM alert WHERE message = ? AND uid = ?",
             (keyword, ctx.author.id),
         )
-        self.db.commit()
+        self.alert_index.remove(ctx.author.id, keyword)
 
         embed = EmbedBuilder(
             title="Success",
@@ -275,9 +470,10 @@ class Alerts(commands.Cog):
         :param ctx: ApplicationContext
         :type ctx: ApplicationContext
         """
-        c = self.db.cursor()
-        c.execute("SELECT * FROM alert WHERE uid = ?", (ctx.author.id,))
-        alerts = c.fetchall()
+        alerts = await database.fetchall(
+            "SELECT * FROM alert WHERE uid = ?",
+            (ctx.author.id,),
+        )
 
         alert_list = "".join(f"`{alert[2]}`\n" for alert in alerts)
         embed = EmbedBuilder(
@@ -296,9 +492,8 @@ class Alerts(commands.Cog):
         :param ctx: ApplicationContext
         :type ctx: ApplicationContext
         """
-        c = self.db.cursor()
-        c.execute("DELETE FROM alert WHERE uid = ?", (ctx.author.id,))
-        self.db.commit()
+        await database.execute("DELETE FROM alert WHERE uid = ?", (ctx.author.id,))
+        self.alert_index.clear(ctx.author.id)
 
         embed = EmbedBuilder(
             title="Success",
@@ -321,12 +516,11 @@ class Alerts(commands.Cog):
         :param ctx: ApplicationContext
         :type ctx: ApplicationContext
         """
-        c = self.db.cursor()
-        c.execute(
+        await database.execute(
             "UPDATE alert SET paused = TRUE WHERE uid = ?",
             (ctx.author.id,),
         )
-        self.db.commit()
+        self.alert_index.set_paused(ctx.author.id, True)
 
         embed = EmbedBuilder(
             title="Success",
@@ -350,12 +544,11 @@ class Alerts(commands.Cog):
         :param ctx: ApplicationContext
         :type ctx: ApplicationContext
         """
-        c = self.db.cursor()
-        c.execute(
+        await database.execute(
             "UPDATE alert SET paused = FALSE WHERE uid = ?",
             (ctx.author.id,),
         )
-        self.db.commit()
+        self.alert_index.set_paused(ctx.author.id, False)
 
         embed = EmbedBuilder(
             title="Success",
@@ -415,17 +608,9 @@ class Alerts(commands.Cog):
         ):
             return
 
-        c = self.db.cursor()
-        c.execute(
-            "SELECT message, uid FROM alert WHERE (paused = FALSE OR paused IS NULL)",
-        )
-
         # group together alerts by the person who is to be alerted
         alerts: dict[int, list[str]] = {}
-        for keyword, uid in c.fetchall():
-            if not re.search(keyword, message.content, re.IGNORECASE):
-                continue
-
+        for uid, keyword in self.alert_index.find_matches(message.content):
             member = await self.get_or_fetch_member(message.channel.guild, uid)
             if not member or not message.channel.permissions_for(member).view_channel:
                 continue
@@ -1,23 +1,41 @@
 from __future__ import annotations
 
 import asyncio
-from contextlib import suppress
+import io
 from os import getenv
+from pathlib import Path, PurePath
 from typing import ClassVar
 
+import aiohttp
 import discord
 from discord.ext import commands
 
 import code_detection
 from message_formatting.embeds import EmbedBuilder
+from util.logger import log
+
+# only the first few attachments of a message are downloaded, to prevent abuse
+MAX_ATTACHMENTS_PER_MESSAGE = 5
+
+# longer formatted attachments are sent as a file instead
+MAX_EMBED_DESCRIPTION_LENGTH = 4096
 
 
 class DetectCode(commands.Cog):
     # maps (channel id, message id) -> message
-    # for all tip messages sent in the last hour
+    # for all messages sent in auto-format channels in the last hour
+    # (useful so that we can re-detect them if they're edited)
+    recent_messages: ClassVar[dict[tuple[int, int], discord.Message]] = {}
+
+    # maps (channel id, message id) -> tip message
+    # for all tips sent for recent messages
     # (useful so that we can delete the tip if they fix their message)
     sent_tip_messages: ClassVar[dict[tuple[int, int], discord.Message]] = {}
 
+    # maps (channel id, message id) -> the number of times a recent message was edited
+    # (useful so that the result of an older edit which finished late is dropped)
+    edit_counts: ClassVar[dict[tuple[int, int], int]] = {}
+
     def __init__(self: DetectCode, bot: commands.Bot) -> None:
         self.bot = bot
         self.auto_format_in_channel_ids = [
@@ -25,6 +43,45 @@ class DetectCode(commands.Cog):
             for channel_id in getenv("AUTO_FORMAT_CODE_CHANNEL_IDS", "-1").split(",")
         ]
 
+        # detected code which is less likely to be code than this is left alone (see `code_detection.confidence`)
+        self.min_confidence = float(getenv("AUTO_FORMAT_CODE_MIN_CONFIDENCE", "0"))
+
+        # shared by every attachment download, created on the first one
+        self.session: aiohttp.ClientSession | None = None
+
+    def cog_unload(self: DetectCode) -> None:
+        code_detection.detection_executor.shutdown()
+        if code_detection.pattern_profile_path is not None:
+            code_detection.pattern_profiler.save(
+                Path(code_detection.pattern_profile_path),
+            )
+        if code_detection.pattern_order_path is not None:
+            code_detection.adaptive_pattern_order.save(
+                Path(code_detection.pattern_order_path),
+            )
+        if self.session is not None:
+            self.bot.loop.create_task(self.session.close())
+            self.session = None
+
+    def get_session(self: DetectCode) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        return self.session
+
+    def should_format(
+        self: DetectCode,
+        detection_result: code_detection.DetectionResult,
+    ) -> bool:
+        """
+        :return: True if code was detected, and it is confidently code.
+        """
+        return (
+            detection_result is not None
+            and code_detection.confidence(detection_result[1]) >= self.min_confidence
+        )
+
     @staticmethod
     def format_detected_code(
         language: str,
@@ -35,44 +92,168 @@ class DetectCode(commands.Cog):
             for section in sections
         )
 
-    @commands.Cog.listener()
-    async def on_message(self: DetectCode, message: discord.Message) -> None:
-        if (
-            message.author.bot
-            or not isinstance(message.channel, discord.TextChannel)
-            or "```" in message.content
-        ):
+    def build_embed(
+        self: DetectCode,
+        language: str,
+        sections: tuple[code_detection.DetectedSection, ...],
+    ) -> discord.Embed:
+        return EmbedBuilder(
+            title="Auto-Formatted Code",
+            description=self.format_detected_code(language, sections),
+            color=0x32DC64,  # same green as tips
+        ).build()
+
+    async def download_attachment(
+        self: DetectCode,
+        attachment: discord.Attachment,
+    ) -> bytes | None:
+        """
+        :return: the content of the attachment, or None if it couldn't be downloaded.
+        """
+        try:
+            async with self.get_session().get(attachment.url) as response:
+                response.raise_for_status()
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # it's possible that the attachment was deleted before we got to it
+            log(
+                f"Error occurred while downloading attachment `{attachment.filename}` for code detection. Error: {e}",
+            )
+            return None
+
+    async def format_attachments(self: DetectCode, message: discord.Message) -> None:
+        """
+        Replies with the formatted code of every text attachment (e.g. message.txt) which contains code.
+        The attachments are downloaded concurrently and detected off the event loop.
+        """
+        attachments = [
+            attachment
+            for attachment in message.attachments[:MAX_ATTACHMENTS_PER_MESSAGE]
+            if attachment.size <= code_detection.max_attachment_bytes
+            and code_detection.is_text_attachment(
+                attachment.filename,
+                attachment.content_type,
+            )
+        ]
+        if not attachments:
             return
 
-        autoformat = message.channel.id in self.auto_format_in_channel_ids
+        contents = await asyncio.gather(
+            *(self.download_attachment(attachment) for attachment in attachments),
+        )
+        for attachment, content in zip(attachments, contents):
+            if content is None:
+                continue
 
-        if not autoformat:
+            try:
+                detection_result = await code_detection.detect_attachment_async(
+                    content,
+                )
+            except TimeoutError:
+                log(
+                    f"Code detection timed out for attachment `{attachment.filename}` by $ in {message.channel}",
+                    message.author,
+                )
+                continue
+
+            if not self.should_format(detection_result):
+                continue
+
+            formatted_code = self.format_detected_code(*detection_result)
+            if len(formatted_code) <= MAX_EMBED_DESCRIPTION_LENGTH:
+                await message.reply(
+                    embed=self.build_embed(*detection_result),
+                    mention_author=False,
+                )
+            else:
+                await message.reply(
+                    f"Auto-formatted code from `{attachment.filename}`",
+                    file=discord.File(
+                        io.BytesIO(formatted_code.encode()),
+                        filename=f"{PurePath(attachment.filename).stem}-formatted.md",
+                    ),
+                    mention_author=False,
+                )
+
+    async def update_tip(
+        self: DetectCode,
+        uuid: tuple[int, int],
+        content: str,
+    ) -> None:
+        """
+        Detects the code in the latest `content` of a recent message,
+        then sends, updates or deletes the message's tip accordingly.
+        """
+        message = self.recent_messages.get(uuid)
+        if message is None:
+            # it was deleted meanwhile
             return
 
-        detection_result = code_detection.detect(message.content)
-        if not detection_result:
+        edit_count = self.edit_counts.get(uuid, 0)
+
+        # the per-line results are kept, so that if the message is edited it can be re-detected cheaply
+        try:
+            detection_result = await code_detection.detect_async(content, key=uuid)
+        except TimeoutError:
+            log(
+                f"Code detection timed out for a message by $ in {message.channel}",
+                message.author,
+            )
             return
 
-        language, sections = detection_result
+        # the message may have been deleted or edited again while it was being detected
+        if (
+            uuid not in self.recent_messages
+            or self.edit_counts.get(uuid, 0) != edit_count
+        ):
+            return
 
-        embed = EmbedBuilder(
-            title="Auto-Formatted Code",
-            description=self.format_detected_code(language, sections),
-            color=0x32DC64,  # same green as tips
-        ).build()
+        tip_message = self.sent_tip_messages.get(uuid)
+        if not self.should_format(detection_result):
+            if tip_message is not None:
+                del self.sent_tip_messages[uuid]
+                await tip_message.delete()
+            return
+
+        embed = self.build_embed(*detection_result)
+        if tip_message is not None:
+            await tip_message.edit(embed=embed)
+            return
 
-        tip_message = await message.reply(
+        self.sent_tip_messages[uuid] = await message.reply(
             "[How to format code on Discord?](<https://www.wikihow.com/Format-Text-as-Code-in-Discord>)",
             embed=embed,
             file=discord.File(code_detection.formatting_example_image_path),
         )
 
-        # keep record of this tip being sent for 1 hour
+    def forget_message(self: DetectCode, uuid: tuple[int, int]) -> None:
+        self.recent_messages.pop(uuid, None)
+        self.sent_tip_messages.pop(uuid, None)
+        self.edit_counts.pop(uuid, None)
+        code_detection.incremental_detections.forget(uuid)
+
+    @commands.Cog.listener()
+    async def on_message(self: DetectCode, message: discord.Message) -> None:
+        if message.author.bot or not isinstance(message.channel, discord.TextChannel):
+            return
+
+        autoformat = message.channel.id in self.auto_format_in_channel_ids
+
+        if not autoformat:
+            return
+
+        # keep record of this message for 1 hour, even if it has no code yet (it may be edited to add some)
         uuid = (message.channel.id, message.id)
-        self.sent_tip_messages[uuid] = tip_message
-        await asyncio.sleep(60 * 60)
-        with suppress(KeyError):
-            del self.sent_tip_messages[uuid]
+        self.recent_messages[uuid] = message
+        self.bot.loop.call_later(60 * 60, self.forget_message, uuid)
+
+        if "```" in message.content:
+            return
+
+        if message.attachments:
+            await self.format_attachments(message)
+
+        await self.update_tip(uuid, message.content)
 
     @commands.Cog.listener()
     async def on_raw_message_delete(
@@ -80,7 +261,9 @@ class DetectCode(commands.Cog):
         payload: discord.RawMessageDeleteEvent,
     ) -> None:
         uuid = (payload.channel_id, payload.message_id)
-        if sent_tip_message := self.sent_tip_messages.pop(uuid, None):
+        sent_tip_message = self.sent_tip_messages.pop(uuid, None)
+        self.forget_message(uuid)
+        if sent_tip_message is not None:
             await sent_tip_message.delete()
 
     @commands.Cog.listener()
@@ -92,10 +275,21 @@ class DetectCode(commands.Cog):
         if not isinstance(new_content := changes.get("content"), str):
             return
 
+        uuid = (payload.channel_id, payload.message_id)
+        if uuid not in self.recent_messages:
+            return
+
+        # any detection of an older version of the message which is still running is now stale
+        self.edit_counts[uuid] = self.edit_counts.get(uuid, 0) + 1
+
         if "```" in new_content:
-            uuid = (payload.channel_id, payload.message_id)
+            # they formatted it themselves
             if sent_tip_message := self.sent_tip_messages.pop(uuid, None):
                 await sent_tip_message.delete()
+            return
+
+        # only the lines which were changed by the edit are reclassified
+        await self.update_tip(uuid, new_content)
 
 
 def setup(bot: commands.Bot) -> None:
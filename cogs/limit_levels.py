@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from discord.ext import commands, tasks
+
+from util.limiter import limit_level_cache
+
+
+class LimitLevels(commands.Cog):
+    def __init__(self: LimitLevels, bot: commands.Bot) -> None:
+        self.bot = bot
+        # the first iteration runs as soon as the event loop starts, which loads the cache on startup
+        self.refresh_limit_levels.start()
+
+    def cog_unload(self: LimitLevels) -> None:
+        self.refresh_limit_levels.cancel()
+
+    # reloads every user's limit level, so that permission checks never have to query the whole user table
+    @tasks.loop(seconds=limit_level_cache.refresh_interval)
+    async def refresh_limit_levels(self: LimitLevels) -> None:
+        await limit_level_cache.refresh()
+
+
+def setup(bot: commands.Bot) -> None:
+    bot.add_cog(LimitLevels(bot))
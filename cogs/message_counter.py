@@ -1,24 +1,45 @@
 from __future__ import annotations
 
+import asyncio
+
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import database
+from database.message_counts import message_count_buffer
+
+# flushes started by `MessageCounter.cog_unload` which haven't finished yet
+unload_flush_tasks: set[asyncio.Task[int]] = set()
 
 
 class MessageCounter(commands.Cog):
     def __init__(self: MessageCounter, bot: commands.Bot) -> None:
         self.bot = bot
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
+        self.flush_message_counts.start()
+
+    def cog_unload(self: MessageCounter) -> None:
+        self.flush_message_counts.cancel()
+
+        # the event loop only keeps a weak reference to tasks, so this one is kept until it's done
+        # if it doesn't get to finish, the counts are written by the final flush in main.py
+        task = self.bot.loop.create_task(
+            message_count_buffer.flush(database.async_database),
+        )
+        unload_flush_tasks.add(task)
+        task.add_done_callback(unload_flush_tasks.discard)
+
+    # counts are buffered in memory, and written to the database periodically
+    @tasks.loop(seconds=30)
+    async def flush_message_counts(self: MessageCounter) -> None:
+        await message_count_buffer.flush(database.async_database)
 
     @commands.Cog.listener()
     async def on_message(self: MessageCounter, message: discord.Message) -> None:
         """
-        It adds a user to the database if they don't exist, and updates their message count if they do
+        Counts the message towards the author's messagesSent (and helpMessagesSent, if applicable).
+        The count is buffered, and will be written to the database on the next flush.
 
         :param message: The message object that triggered the event
-        :return: The amount of messages a user has sent.
         """
 
         # Ignore messages from bots
@@ -28,52 +49,12 @@ class MessageCounter(commands.Cog):
         if isinstance(message.channel, discord.DMChannel):
             return
 
-        messages_sent = (
-            sent
-            if (
-                sent := self.cursor.execute(
-                    "SELECT messagesSent, helpMessagesSent FROM user WHERE uid = ?",
-                    (message.author.id,),
-                ).fetchall()
-            )
-            else None
-        )
-
-        # If a user is not in db, add them
-        if messages_sent is None:
-            self.add_user(message.author.id)
-            messages_sent = (0, 0)
-        else:
-            messages_sent = messages_sent[0]
-
-        # If the message was sent in a help channel, update the helpMessagesSent column
+        # If the message was sent in a help channel, it also counts towards helpMessagesSent
         category = getattr(message.channel, "category", None)
-        if category and "help" in category.name.lower():
-            self.update_help_user(message.author.id, messages_sent[1] + 1)
-
-        # Update the messagesSent column
-        self.update_user(message.author.id, messages_sent[0] + 1)
-
-        # commit changes
-        self.db.commit()
-
-    def add_user(self: MessageCounter, uid: int) -> None:
-        self.cursor.execute(
-            "INSERT INTO user VALUES (?, ?, ?, ?, ?, ?)",
-            (uid, 0, False, None, 0, None),
-        )  # See ERD.mdj
+        help_message = bool(category and "help" in category.name.lower())
 
-    def update_user(self: MessageCounter, uid: int, amount: int) -> None:
-        self.cursor.execute(
-            "UPDATE user SET messagesSent = ? WHERE uid = ?",
-            (amount, uid),
-        )
-
-    def update_help_user(self: MessageCounter, uid: int, amount: int) -> None:
-        self.cursor.execute(
-            "UPDATE user SET helpMessagesSent = ? WHERE uid = ?",
-            (amount, uid),
-        )
+        if message_count_buffer.record(message.author.id, help_message=help_message):
+            await message_count_buffer.flush(database.async_database)
 
 
 def setup(bot: commands.Bot) -> None:
@@ -186,13 +186,10 @@ class staffAppsSeeSpam(discord.ui.View):
         self.max_page = len(data)
 
     async def repopulate(self, interaction: discord.Interaction) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        first_user_data = self.cursor.execute(
+        first_user_data = await database.fetchall(
             "select * from application where uid = ?",
             (self.data[self.cur_page - 1][0],),
-        ).fetchall()
-        self.db.close()
+        )
         count = len(first_user_data)
         name = first_user_data[0][3]
         most_recent = datetime.fromtimestamp(
@@ -270,14 +267,10 @@ class staffAppsSeeSpam(discord.ui.View):
         button: discord.ui.Button,
         interaction: discord.Interaction,
     ) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
+        await database.execute(
             "update user set markedSpam = 0 where uid = ?",
             (self.data[self.cur_page - 1][0],),
         )
-        self.db.commit()
-        self.db.close()
         embed = EmbedBuilder(
             title="User unbanned.",
             description="This user can now apply for staff again.",
@@ -315,14 +308,10 @@ class staffAppsSeeSpamSimple(discord.ui.View):
         button: discord.ui.Button,
         interaction: discord.Interaction,
     ) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
+        await database.execute(
             "update user set markedSpam = 0 where uid = ?",
             (self.author,),
         )
-        self.db.commit()
-        self.db.close()
         log(f"$ unbanned user {self.author} from applying for staff.", interaction.user)
         embed = EmbedBuilder(
             title="User unbanned.",
@@ -381,26 +370,26 @@ class staffAppsMain(discord.ui.View):
         else:
             self.edit_button_child.disabled = True
 
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        statusname = self.cursor.execute(
-            "select s.description from application a join status s on a.status = s.statusID where appId = ?;",
-            (self.data[self.cur_page - 1][0],),
-        ).fetchone()[0]
+        statusname = (
+            await database.fetchone(
+                "select s.description from application a join status s on a.status = s.statusID where appId = ?;",
+                (self.data[self.cur_page - 1][0],),
+            )
+        )[0]
         status_int = self.data[self.cur_page - 1][2]
         # check likes and dislikes and disable buttons if necessary
         like_amount = len(
-            self.cursor.execute(
+            await database.fetchall(
                 "select likes from like where uid = ? and appId = ?;",
                 (self.author.id, self.data[self.cur_page - 1][0]),
-            ).fetchall(),
+            ),
         )
         like_list = [
             x[0]
-            for x in self.cursor.execute(
+            for x in await database.fetchall(
                 "select likes from like where appId = ?;",
                 (self.data[self.cur_page - 1][0],),
-            ).fetchall()
+            )
         ]
         likes = like_list.count(1)
         dislikes = like_list.count(0)
@@ -410,7 +399,6 @@ class staffAppsMain(discord.ui.View):
         else:
             self.like_button_child.disabled = False
             self.dislike_button_child.disabled = False
-        self.db.close()
         title = f"Staff applications page {self.cur_page}/{len(self.data)}"
         description = f"Application ID: **{self.data[self.cur_page - 1][0]}**\nApplicant Name: **{self.data[self.cur_page - 1][3]}**\nApplicant ID: **{self.data[self.cur_page - 1][1]}**\n"
         fields = [
@@ -504,18 +492,15 @@ class staffAppsMain(discord.ui.View):
         button: discord.ui.Button,
         interaction: discord.Interaction,
     ) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
-            "update user set markedSpam = 1 where uid = ?",
-            (self.data[self.cur_page - 1][1],),
-        )
-        self.cursor.execute(
-            "update application set status = 2 where appId = ?",
-            (self.data[self.cur_page - 1][0],),
-        )
-        self.db.commit()
-        self.db.close()
+        async with database.transaction() as transaction:
+            await transaction.execute(
+                "update user set markedSpam = 1 where uid = ?",
+                (self.data[self.cur_page - 1][1],),
+            )
+            await transaction.execute(
+                "update application set status = 2 where appId = ?",
+                (self.data[self.cur_page - 1][0],),
+            )
         log(f"User {self.data[self.cur_page - 1][1]} marked as spam by $", self.author)
         embed = EmbedBuilder(
             title="User marked as spam.",
@@ -545,19 +530,16 @@ class staffAppsMain(discord.ui.View):
         button: discord.ui.Button,
         interaction: discord.Interaction,
     ) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
-            "update application set status = 2 where appId = ?",
-            (self.data[self.cur_page - 1][0],),
-        )
         cooldown = int(time()) + 2678400  # 31 days
-        self.cursor.execute(
-            "update user set cooldown = ? where uid = ?",
-            (cooldown, self.data[self.cur_page - 1][1]),
-        )
-        self.db.commit()
-        self.db.close()
+        async with database.transaction() as transaction:
+            await transaction.execute(
+                "update application set status = 2 where appId = ?",
+                (self.data[self.cur_page - 1][0],),
+            )
+            await transaction.execute(
+                "update user set cooldown = ? where uid = ?",
+                (cooldown, self.data[self.cur_page - 1][1]),
+            )
         log(f"Application {self.data[self.cur_page - 1][0]} denied by $", self.author)
         embed = EmbedBuilder(
             title="Application denied.",
@@ -587,38 +569,34 @@ class staffAppsMain(discord.ui.View):
         button: discord.ui.Button,
         interaction: discord.Interaction,
     ) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
         current_status = self.data[self.cur_page - 1][2]
         if current_status == 1:
             status_name = [
                 x[0]
-                for x in self.cursor.execute(
+                for x in await database.fetchall(
                     "select description from status where statusId in (?, ?)",
                     (current_status, current_status + 3),
-                ).fetchall()
+                )
             ]
-            self.cursor.execute(
+            await database.execute(
                 "update application set status = 4 where appId = ?",
                 (self.data[self.cur_page - 1][0],),
             )
         else:
             status_name = [
                 x[0]
-                for x in self.cursor.execute(
+                for x in await database.fetchall(
                     "select description from status where statusId in (?, ?)",
                     (current_status, current_status + 1),
-                ).fetchall()
+                )
             ]
-            self.cursor.execute(
+            await database.execute(
                 "update application set status = ? where appId = ?",
                 (current_status + 1, self.data[self.cur_page - 1][0]),
             )
         title = "Application status updated."
         description = f"Application ID: **{self.data[self.cur_page - 1][0]}**\nApplicant name: **{self.data[self.cur_page - 1][3]}**\nApplicant ID: **{self.data[self.cur_page - 1][1]}**\n \
             Status changed from **{status_name[0]}** -> **{status_name[1]}**."
-        self.db.commit()
-        self.db.close()
         log(
             f"Application {self.data[self.cur_page - 1][0]} status changed from {status_name[0]} -> {status_name[1]} by $",
             self.author,
@@ -651,17 +629,13 @@ class staffAppsMain(discord.ui.View):
         button: discord.ui.Button,
         interaction: discord.Interaction,
     ) -> None:
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
+        await database.execute(
             "update application set status = 3 where appId = ?",
             (self.data[self.cur_page - 1][0],),
         )
         title = "Application status updated."
         description = f"Application ID: **{self.data[self.cur_page - 1][0]}**\nApplicant name: **{self.data[self.cur_page - 1][3]}**\nApplicant ID: **{self.data[self.cur_page - 1][1]}**\n \
             Status changed from **Application submitted** -> **Second Opinion required**."
-        self.db.commit()
-        self.db.close()
         log(
             f"Application {self.data[self.cur_page - 1][0]} status changed from Application submitted -> Second Opinion required by $",
             self.author,
@@ -698,9 +672,7 @@ class staffAppsMain(discord.ui.View):
             "Our Discord server must be haunted! Every interaction must be paired with a user."
         )
 
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
+        await database.execute(
             "insert into like (appId, uid, name, likes) values (?, ?, ?, ?)",
             (
                 self.data[self.cur_page - 1][0],
@@ -711,8 +683,6 @@ class staffAppsMain(discord.ui.View):
                 1,
             ),
         )
-        self.db.commit()
-        self.db.close()
         log(
             f"Application {self.data[self.cur_page - 1][0]} liked by $ ({interaction.user.id})",
             interaction.user,
@@ -749,9 +719,7 @@ class staffAppsMain(discord.ui.View):
             "Our Discord server must be haunted! Every interaction must be paired with a user."
         )
 
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
-        self.cursor.execute(
+        await database.execute(
             "insert into like (appId, uid, name, likes) values (?, ?, ?, ?)",
             (
                 self.data[self.cur_page - 1][0],
@@ -762,8 +730,6 @@ class staffAppsMain(discord.ui.View):
                 0,
             ),
         )
-        self.db.commit()
-        self.db.close()
         log(
             f"Application {self.data[self.cur_page - 1][0]} disliked by $ ({interaction.user.id})",
             interaction.user,
@@ -850,8 +816,6 @@ SUBCOMMANDS = ["all", "spam", "accepted", "denied"]
 class StaffAppsBackoffice(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
 
     @SEE_PERMISSIONS
     @commands.slash_command(
@@ -886,19 +850,19 @@ class StaffAppsBackoffice(commands.Cog):
             username = f"{ctx.author.name}#{ctx.author.discriminator}"
         log(f"see-apps command used by {username}:({ctx.author.id})")
         if specific_id:
-            data = self.cursor.execute(
+            data = await database.fetchone(
                 "select a.appId, a.uid, a.discordName, a.firstName, a.timezone, a.hoursAvailableWk, a.staffReason, a.contributeReason, a.submissionTime, s.description from application a join status s on a.status = s.statusId where appId = ?;",
                 (specific_id,),
-            ).fetchone()
+            )
             if not data:
                 await ctx.respond("Application not found.", ephemeral=True)
                 return
             like_list = [
                 x[0]
-                for x in self.cursor.execute(
+                for x in await database.fetchall(
                     "select likes from like where appId = ?;",
                     (specific_id,),
-                ).fetchall()
+                )
             ]
             likes = like_list.count(1)
             dislikes = like_list.count(0)
@@ -930,9 +894,9 @@ class StaffAppsBackoffice(commands.Cog):
 
         if subcommand == "all":
             # gather first page of applications
-            data = self.cursor.execute(
+            data = await database.fetchall(
                 "select appId, discordName, description, submissionTime from application a join status s on a.status = s.statusId order by appId ASC",
-            ).fetchall()
+            )
             title = f"Applications page 1/{len(data) // 10 + 1}"
             field_title = "Application ID, Discord Name, Status, Submission Time"
             field_content = "".join(
@@ -957,9 +921,9 @@ class StaffAppsBackoffice(commands.Cog):
             log(f"{username} viewed all applications")
 
         elif subcommand == "denied":
-            data = self.cursor.execute(
+            data = await database.fetchall(
                 "select appId, discordName, submissionTime from application where status = 2",
-            ).fetchall()
+            )
             title = f"Denied Applications page 1/{len(data) // 10 + 1}"
             field_title = "Application ID, Discord Name, Original Submission Time"
             field_content = "".join(
@@ -984,9 +948,9 @@ class StaffAppsBackoffice(commands.Cog):
             log(f"{username} viewed denied applications")
 
         elif subcommand == "accepted":
-            data = self.cursor.execute(
+            data = await database.fetchall(
                 "select appId, discordName, submissionTime from application where status = 9",
-            ).fetchall()
+            )
             title = f"Accepted Applications page 1/{len(data) // 10 + 1}"
             field_title = "Application ID, Discord Name, Original Submission Time"
             field_content = ""
@@ -1012,9 +976,9 @@ class StaffAppsBackoffice(commands.Cog):
             log(f"{username} viewed accepted applications")
 
         elif subcommand == "spam":
-            data = self.cursor.execute(
+            data = await database.fetchall(
                 "select * from user where markedSpam = 1",
-            ).fetchall()
+            )
 
             if len(data) == 0:
                 await ctx.respond(
@@ -1023,10 +987,10 @@ class StaffAppsBackoffice(commands.Cog):
                 )
                 return
 
-            first_user_data = self.cursor.execute(
+            first_user_data = await database.fetchall(
                 "select * from application where uid = ?",
                 (data[0][0],),
-            ).fetchall()
+            )
             count = len(first_user_data)
             name = first_user_data[0][3]
             most_recent = datetime.fromtimestamp(
@@ -1059,9 +1023,9 @@ class StaffAppsBackoffice(commands.Cog):
 
         else:  # main command, no subcommand
             # gather all active applications
-            data = self.cursor.execute(
+            data = await database.fetchall(
                 "select * from application where status not in (2,9)",
-            ).fetchall()
+            )
             title = "All current active applications"
             description = "In this embed, you can view all active applications and their status.\nYou can use the buttons below to change the status of an application."
             embed = EmbedBuilder(
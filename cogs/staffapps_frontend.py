@@ -10,6 +10,7 @@ from discord.ext import commands
 from humanize import precisedelta
 
 import database
+from database.message_counts import message_count_buffer
 from message_formatting.embeds import EmbedBuilder
 from util.limiter import limit
 from util.logger import log
@@ -107,16 +108,21 @@ class embeds:
 
 
 class Applicant:
-    def __init__(self, user: discord.Member) -> None:
+    def __init__(
+        self,
+        user: discord.Member,
+        messages_sent: int,
+        marked_spam: bool,
+        cooldown: float,
+        status: list[int],
+    ) -> None:
         """
         This class represents a read-only user who is applying for staff.
         Data is accurate at the time of object creation.
+        Use `Applicant.fetch` to create one from the database.
         """
         self.user = user
 
-        # connect to database
-        db = database.connect()
-        cursor = db.cursor()
         # get user data from discord
         self.uid = user.id
         self.joined_at = user.joined_at
@@ -127,47 +133,46 @@ class Applicant:
         # We're not aware of any time that joined_at will be blank, so just assert.
         assert self.joined_at is not None, "Required property `joined_at` is None"
 
-        # get user data from database
+        self.messages_sent = messages_sent
+        self.marked_spam = marked_spam
+        self.cooldown = cooldown
+        self.status = status
+
+    @classmethod
+    async def fetch(cls, user: discord.Member) -> Applicant:
+        """
+        Loads the user's data from the database (adding them to it if they don't exist yet).
+        """
         # check if user exists, else add
-        messages_sent = (
-            sent
-            if (
-                sent := cursor.execute(
-                    "SELECT messagesSent, helpMessagesSent FROM user WHERE uid = ?",
-                    (user.id,),
-                ).fetchall()
-            )
-            else None
-        )
-        # If a user is not in db, add them
-        if messages_sent is None:
-            self.add_user(user.id)
-
-        self.messages_sent = cursor.execute(
-            "SELECT messagesSent FROM user WHERE uid = ?",
-            (self.uid,),
-        ).fetchone()[0]
-        self.marked_spam = cursor.execute(
-            "SELECT markedSpam FROM user WHERE uid = ?",
-            (self.uid,),
-        ).fetchone()[0]
-        self.cooldown = float(
-            cursor.execute(
-                "SELECT cooldown FROM user WHERE uid = ?",
-                (self.uid,),
-            ).fetchone()[0]
-            or 0,
+        user_data = await database.fetchone(
+            "SELECT messagesSent, markedSpam, cooldown FROM user WHERE uid = ?",
+            (user.id,),
         )
+        if user_data is None:
+            await cls.add_user(user.id)
+            user_data = (0, False, None)
+
+        messages_sent, marked_spam, cooldown = user_data
+
+        # messages which haven't been flushed to the database yet still count!
+        pending_messages_sent, _ = message_count_buffer.pending_counts(user.id)
+
         # get all statuses
-        self.status = [
+        status = [
             x[0]
-            for x in cursor.execute(
+            for x in await database.fetchall(
                 "SELECT status FROM application WHERE uid = ?",
-                (self.uid,),
-            ).fetchall()
+                (user.id,),
+            )
         ]
-        # close database connection
-        db.close()
+
+        return cls(
+            user,
+            messages_sent=messages_sent + pending_messages_sent,
+            marked_spam=marked_spam,
+            cooldown=float(cooldown or 0),
+            status=status,
+        )
 
     def __str__(self) -> str:
         """
@@ -181,12 +186,12 @@ class Applicant:
         """
         return f"User: {self.uid}, Joined: {self.joined_at}, Messages: {self.messages_sent}, Marked Spam: {self.marked_spam}, Cooldown: {self.cooldown}"
 
-    def add_user(self, uid: int) -> None:
-        with database.connect() as db:
-            db.cursor().execute(
-                "INSERT INTO user VALUES (?, ?, ?, ?, ?)",
-                (uid, 0, False, None, 0),
-            )  # See ERD.mdj
+    @staticmethod
+    async def add_user(uid: int) -> None:
+        await database.execute(
+            "INSERT OR IGNORE INTO user VALUES (?, ?, ?, ?, ?, ?)",
+            (uid, 0, False, None, 0, None),
+        )  # See ERD.mdj
 
     def min_reqs(self) -> tuple[bool, int, timedelta]:
         """
@@ -451,8 +456,6 @@ class StaffAppModal(discord.ui.Modal):
         After all answers are given, insert the answers (also from staffAppView) into the database.
         """
         super().__init__(*args, **kwargs)
-        self.db = database.connect()
-        self.cursor = self.db.cursor()
         self.bot = bot
 
         self.applicant = applicant
@@ -488,7 +491,7 @@ class StaffAppModal(discord.ui.Modal):
                 f"{self.applicant.user.name}#{self.applicant.user.discriminator}"
             )
 
-        self.cursor.execute(
+        await database.execute(
             """
         INSERT INTO application (
             uid,
@@ -519,8 +522,6 @@ class StaffAppModal(discord.ui.Modal):
                 str(int(time() // 1)),
             ),
         )
-        self.db.commit()
-        self.db.close()
         # Send message to staff channel
         staff_channel = self.bot.get_channel(
             STAFF_CHANNEL_ID,
@@ -573,7 +574,7 @@ class StaffAppsUser(commands.Cog):
             logname = f"{ctx.author.name}#{ctx.author.discriminator}:{ctx.author.id}"
 
         assert isinstance(ctx.author, discord.Member), "We already checked for DMs."
-        applicant = Applicant(ctx.author)
+        applicant = await Applicant.fetch(ctx.author)
 
         # check if user is banned
         if applicant.marked_spam:
@@ -0,0 +1,6 @@
+from . import detect_code
+
+
+def run() -> None:
+    print("\nRunning tests for cogs.detect_code")
+    detect_code.run()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+import discord
+
+import code_detection
+from code_detection.tests.helpers import create_condition_tester
+from cogs.detect_code import MAX_EMBED_DESCRIPTION_LENGTH, DetectCode
+
+test = create_condition_tester()
+
+CODE = dedent(
+    """\
+    import random
+
+    def roll(sides):
+        return random.randint(1, sides)
+
+    print(roll(6))
+    """,
+)
+
+
+class StubResponse:
+    def __init__(self: StubResponse, content: bytes) -> None:
+        self.content = content
+
+    async def __aenter__(self: StubResponse) -> StubResponse:
+        return self
+
+    async def __aexit__(self: StubResponse, *exc_info: object) -> None:
+        pass
+
+    def raise_for_status(self: StubResponse) -> None:
+        pass
+
+    async def read(self: StubResponse) -> bytes:
+        return self.content
+
+
+class StubSession:
+    """
+    Stands in for the cog's `aiohttp.ClientSession`, serving the content of each URL (or raising it).
+    """
+
+    def __init__(self: StubSession, contents: dict[str, bytes | Exception]) -> None:
+        self.contents = contents
+        self.requested: list[str] = []
+
+    def get(self: StubSession, url: str) -> StubResponse:
+        self.requested.append(url)
+        content = self.contents[url]
+        if isinstance(content, Exception):
+            raise content
+        return StubResponse(content)
+
+
+class StubMessage:
+    def __init__(self: StubMessage, attachments: list[SimpleNamespace]) -> None:
+        self.attachments = attachments
+        self.channel = "#help"
+        self.author = SimpleNamespace(name="tester", discriminator="0")
+        self.replies: list[dict[str, Any]] = []
+
+    async def reply(
+        self: StubMessage, content: str | None = None, **kwargs: Any
+    ) -> None:
+        self.replies.append({"content": content, **kwargs})
+
+
+def attachment(filename: str, content: bytes) -> SimpleNamespace:
+    return SimpleNamespace(
+        url=f"https://cdn.example/{filename}",
+        filename=filename,
+        size=len(content),
+        content_type="text/plain; charset=utf-8",
+    )
+
+
+def create_cog(contents: dict[str, bytes | Exception]) -> DetectCode:
+    cog = DetectCode(SimpleNamespace())
+    cog.session = StubSession(contents)
+    return cog
+
+
+async def format_attachments(
+    attachments: dict[str, bytes | Exception],
+) -> tuple[DetectCode, StubMessage]:
+    """
+    Runs `format_attachments` for a message with `attachments` (filename -> content, or the download error).
+    """
+    message = StubMessage(
+        [
+            attachment(filename, b"" if isinstance(content, Exception) else content)
+            for filename, content in attachments.items()
+        ],
+    )
+    cog = create_cog(
+        {
+            f"https://cdn.example/{filename}": content
+            for filename, content in attachments.items()
+        },
+    )
+    await cog.format_attachments(message)
+    return cog, message
+
+
+async def run_async() -> None:
+    code_detection.attachment_cache.clear()
+
+    cog = create_cog({"https://cdn.example/main.py": CODE.encode()})
+    content = await cog.download_attachment(attachment("main.py", CODE.encode()))
+    test("download", content == CODE.encode())
+
+    for description, error in [
+        ("a failed download is skipped", aiohttp.ClientError()),
+        ("a download which timed out is skipped", asyncio.TimeoutError()),
+    ]:
+        cog, message = await format_attachments({"main.py": error})
+        test(description, len(cog.session.requested) == 1 and not message.replies)
+
+    _, message = await format_attachments({"main.py": CODE.encode()})
+    test(
+        "short code is replied with an embed",
+        len(message.replies) == 1
+        and isinstance(message.replies[0].get("embed"), discord.Embed)
+        and "```python" in message.replies[0]["embed"].description,
+    )
+
+    long_code = CODE * (MAX_EMBED_DESCRIPTION_LENGTH // len(CODE) + 1)
+    _, message = await format_attachments({"long.py": long_code.encode()})
+    test(
+        "long code is replied with a file",
+        len(message.replies) == 1
+        and isinstance(message.replies[0].get("file"), discord.File)
+        and message.replies[0]["file"].filename == "long-formatted.md",
+    )
+
+    _, message = await format_attachments({"notes.txt": b"just some notes\n"})
+    test("no code, no reply", not message.replies)
+
+    max_attachment_bytes = code_detection.max_attachment_bytes
+    code_detection.max_attachment_bytes = len(CODE) - 1
+    try:
+        cog, message = await format_attachments({"main.py": CODE.encode()})
+    finally:
+        code_detection.max_attachment_bytes = max_attachment_bytes
+    test(
+        "attachments over the size limit aren't downloaded",
+        not cog.session.requested and not message.replies,
+    )
+
+    # forces the timeout path, like a paste which takes too long to detect
+    timeout = code_detection.detection_executor.timeout
+    code_detection.detection_executor.timeout = 0
+    try:
+        _, message = await format_attachments({"big.py": (CODE * 100).encode()})
+    finally:
+        code_detection.detection_executor.timeout = timeout
+    test(
+        "an attachment which timed out is skipped",
+        not message.replies
+        and "Code detection timed out for attachment `big.py`"
+        in Path("log.txt").read_text(),
+    )
+
+    code_detection.attachment_cache.clear()
+
+
+def run() -> None:
+    # failed downloads and timeouts are logged to log.txt in the working directory
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as log_directory:
+        os.chdir(log_directory)
+        try:
+            asyncio.run(run_async())
+        finally:
+            os.chdir(cwd)
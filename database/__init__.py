@@ -2,16 +2,33 @@ from __future__ import annotations
 
 import sqlite3
 from dataclasses import dataclass
+from pathlib import Path
 
-# Create the database and its tables, if they don't already exist.
-from .schema import file_path
+from .async_database import AsyncDatabase
+from .migrations import apply_migrations
+from .tuning import configure_connection
+
+file_path = Path(__file__).parent / "database.sqlite"
+
+# Create the database, or bring it up to date, before anything connects to it.
+apply_migrations(file_path)
+
+# Shared asynchronous access to the database.
+# Coroutines should always use these instead of `connect()`, so that they don't block the event loop.
+async_database = AsyncDatabase(file_path)
+fetchone = async_database.fetchone
+fetchall = async_database.fetchall
+execute = async_database.execute
+executemany = async_database.executemany
+transaction = async_database.transaction
 
 
 def connect() -> sqlite3.Connection:
     """
     simple shortcut for connecting to the sqlite file
+    (blocking! only use this outside of the event loop)
     """
-    return sqlite3.connect(file_path)
+    return configure_connection(sqlite3.connect(file_path))
 
 
 @dataclass
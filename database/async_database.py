@@ -0,0 +1,234 @@
+"""
+Asynchronous access to the database, so that queries never block the event loop.
+All writes go through a single long-lived connection which lives on its own thread,
+and reads are spread across a small pool of read-only connections (each on their own thread).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+
+from .tuning import configure_connection
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Sequence
+    from pathlib import Path
+
+    Parameters = Sequence[Any]
+    Row = tuple[Any, ...]
+
+T = TypeVar("T")
+
+
+def rollback(connection: sqlite3.Connection) -> None:
+    if connection.in_transaction:
+        connection.execute("ROLLBACK")
+
+
+class AsyncDatabase:
+    """
+    An awaitable façade over a sqlite database file.
+    """
+
+    def __init__(self: AsyncDatabase, path: Path, n_readers: int = 3) -> None:
+        self.path = path
+        self.local = threading.local()
+
+        self.writer = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="database-writer",
+            initializer=self.open_writer_connection,
+        )
+        self.readers = ThreadPoolExecutor(
+            max_workers=n_readers,
+            thread_name_prefix="database-reader",
+            initializer=self.open_reader_connection,
+        )
+
+        # held for the duration of every write, so that transactions are not interleaved
+        self.write_lock = asyncio.Lock()
+
+    def open_writer_connection(self: AsyncDatabase) -> None:
+        # autocommit mode; transactions are started explicitly by `transaction`
+        self.local.connection = configure_connection(
+            sqlite3.connect(self.path, isolation_level=None),
+        )
+
+    def open_reader_connection(self: AsyncDatabase) -> None:
+        self.local.connection = configure_connection(
+            sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True),
+        )
+
+    async def run_on(
+        self: AsyncDatabase,
+        executor: ThreadPoolExecutor,
+        func: Callable[[sqlite3.Connection], T],
+    ) -> T:
+        """
+        Runs `func` with the executor thread's connection, without blocking the event loop.
+        """
+        return await asyncio.wrap_future(
+            executor.submit(lambda: func(self.local.connection)),
+        )
+
+    async def run_to_completion(
+        self: AsyncDatabase,
+        executor: ThreadPoolExecutor,
+        func: Callable[[sqlite3.Connection], T],
+    ) -> T:
+        """
+        Same as `run_on`, except that if the caller is cancelled, this still waits for `func` to finish
+        before raising `CancelledError`, so that the state of the connection is known afterwards.
+        """
+        future = asyncio.wrap_future(
+            executor.submit(lambda: func(self.local.connection)),
+        )
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+
+    async def fetchone(
+        self: AsyncDatabase,
+        sql: str,
+        parameters: Parameters = (),
+    ) -> Row | None:
+        return await self.run_on(
+            self.readers,
+            lambda connection: connection.execute(sql, parameters).fetchone(),
+        )
+
+    async def fetchall(
+        self: AsyncDatabase,
+        sql: str,
+        parameters: Parameters = (),
+    ) -> list[Row]:
+        return await self.run_on(
+            self.readers,
+            lambda connection: connection.execute(sql, parameters).fetchall(),
+        )
+
+    async def execute(
+        self: AsyncDatabase,
+        sql: str,
+        parameters: Parameters = (),
+    ) -> int:
+        """
+        Executes a single write statement, which is committed immediately.
+
+        :return: The number of modified rows.
+        """
+        async with self.write_lock:
+            return await self.run_on(
+                self.writer,
+                lambda connection: connection.execute(sql, parameters).rowcount,
+            )
+
+    async def executemany(
+        self: AsyncDatabase,
+        sql: str,
+        parameters: Iterable[Parameters],
+    ) -> int:
+        """
+        Executes a write statement once for each set of parameters, all within a single transaction.
+
+        :return: The number of modified rows.
+        """
+        async with self.transaction() as transaction:
+            return await transaction.executemany(sql, parameters)
+
+    @asynccontextmanager
+    async def transaction(self: AsyncDatabase) -> AsyncIterator[Transaction]:
+        """
+        Groups several statements into a single transaction, which is committed at the end
+        of the `async with` block (or rolled back if an exception is raised).
+        BEGIN, COMMIT and ROLLBACK always run to completion, even if the caller is cancelled.
+        Check `transaction.committed` to find out whether an exception was raised after the commit.
+
+        Usage:
+        async with database.transaction() as transaction:
+            await transaction.execute(...)
+            await transaction.execute(...)
+        """
+        async with self.write_lock:
+            transaction = Transaction(self)
+            try:
+                await self.run_to_completion(
+                    self.writer,
+                    lambda connection: connection.execute("BEGIN IMMEDIATE"),
+                )
+                yield transaction
+                await self.run_to_completion(self.writer, transaction.commit)
+            except BaseException:
+                # a no-op if BEGIN failed or COMMIT succeeded
+                await self.run_to_completion(self.writer, rollback)
+                raise
+
+    def close(self: AsyncDatabase) -> None:
+        """
+        Waits for all pending queries to finish, then stops the database threads.
+        """
+        self.writer.shutdown(wait=True)
+        self.readers.shutdown(wait=True)
+
+
+class Transaction:
+    """
+    Handle for running statements within `AsyncDatabase.transaction`.
+    Reads are done on the writer connection, so that they can see the uncommitted writes.
+    """
+
+    def __init__(self: Transaction, database: AsyncDatabase) -> None:
+        self.database = database
+        self.committed = False
+
+    def commit(self: Transaction, connection: sqlite3.Connection) -> None:
+        # runs on the writer thread, so `committed` is set even if the caller was cancelled meanwhile
+        connection.execute("COMMIT")
+        self.committed = True
+
+    async def execute(
+        self: Transaction,
+        sql: str,
+        parameters: Parameters = (),
+    ) -> int:
+        return await self.database.run_on(
+            self.database.writer,
+            lambda connection: connection.execute(sql, parameters).rowcount,
+        )
+
+    async def executemany(
+        self: Transaction,
+        sql: str,
+        parameters: Iterable[Parameters],
+    ) -> int:
+        return await self.database.run_on(
+            self.database.writer,
+            lambda connection: connection.executemany(sql, parameters).rowcount,
+        )
+
+    async def fetchone(
+        self: Transaction,
+        sql: str,
+        parameters: Parameters = (),
+    ) -> Row | None:
+        return await self.database.run_on(
+            self.database.writer,
+            lambda connection: connection.execute(sql, parameters).fetchone(),
+        )
+
+    async def fetchall(
+        self: Transaction,
+        sql: str,
+        parameters: Parameters = (),
+    ) -> list[Row]:
+        return await self.database.run_on(
+            self.database.writer,
+            lambda connection: connection.execute(sql, parameters).fetchall(),
+        )
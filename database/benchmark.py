@@ -0,0 +1,223 @@
+"""
+Measures per-query latency of the bot's hot queries on a synthetic database,
+before and after the WAL / pragma / index upgrade (migrations 3 & 4).
+Your real database file is not touched (apart from being created by the normal migration step).
+
+Usage (from the root directory):
+python -m database.benchmark
+"""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .message_counts import UPSERT_MESSAGE_COUNTS
+from .migrations import apply_migrations
+from .tuning import configure_connection
+
+N_USERS = 100_000
+N_ALERTS = 50_000
+N_APPLICATIONS = 5_000
+N_LIKES = 20_000
+N_REPETITIONS = 200
+
+rng = random.Random(1234)
+
+
+def create_synthetic_database(path: Path) -> None:
+    """
+    Creates the tables as they were before the performance migrations, and fills them with random rows.
+    """
+    apply_migrations(path, target_version=2)
+
+    db = sqlite3.connect(path)
+
+    db.executemany(
+        "INSERT INTO user VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (uid, rng.randrange(5000), False, None, rng.randrange(500), None)
+            for uid in range(N_USERS)
+        ),
+    )
+    db.executemany(
+        "INSERT INTO alert (uid, message, paused) VALUES (?, ?, ?)",
+        (
+            (rng.randrange(N_USERS), f"keyword{i}", rng.random() < 0.1)
+            for i in range(N_ALERTS)
+        ),
+    )
+    db.executemany(
+        """
+        INSERT INTO application (uid, status, discordName, firstName, staffReason, contributeReason, submissionTime)
+        VALUES (?, ?, ?, 'name', 'reason', 'reason', '1700000000')
+        """,
+        (
+            (rng.randrange(N_USERS), rng.randint(1, 9), f"@user{i}")
+            for i in range(N_APPLICATIONS)
+        ),
+    )
+    db.executemany(
+        "INSERT INTO like (appId, uid, name, likes) VALUES (?, ?, 'name', ?)",
+        (
+            (rng.randint(1, N_APPLICATIONS), rng.randrange(N_USERS), rng.random() < 0.8)
+            for _ in range(N_LIKES)
+        ),
+    )
+    db.commit()
+    db.close()
+
+
+def alert_uid() -> tuple[Any, ...]:
+    return (rng.randrange(N_USERS),)
+
+
+def alert_message_uid() -> tuple[Any, ...]:
+    return (f"keyword{rng.randrange(N_ALERTS)}", rng.randrange(N_USERS))
+
+
+def application_uid() -> tuple[Any, ...]:
+    return (rng.randrange(N_USERS),)
+
+
+def like_uid_app_id() -> tuple[Any, ...]:
+    return (rng.randrange(N_USERS), rng.randint(1, N_APPLICATIONS))
+
+
+def like_app_id() -> tuple[Any, ...]:
+    return (rng.randint(1, N_APPLICATIONS),)
+
+
+def no_parameters() -> tuple[Any, ...]:
+    return ()
+
+
+# (description, sql, parameter generator, is a write)
+QUERIES: list[tuple[str, str, Callable[[], tuple[Any, ...]], bool]] = [
+    (
+        "alerts-list / autocomplete",
+        "SELECT message FROM alert WHERE uid = ?",
+        alert_uid,
+        False,
+    ),
+    (
+        "alerts-add duplicate check",
+        "SELECT * FROM alert WHERE message = ? AND uid = ?",
+        alert_message_uid,
+        False,
+    ),
+    (
+        "alerts-pause",
+        "UPDATE alert SET paused = TRUE WHERE uid = ?",
+        alert_uid,
+        True,
+    ),
+    (
+        "application statuses of user",
+        "SELECT status FROM application WHERE uid = ?",
+        application_uid,
+        False,
+    ),
+    (
+        "denied applications",
+        "SELECT appId, discordName, submissionTime FROM application WHERE status = 2",
+        no_parameters,
+        False,
+    ),
+    (
+        "like by staff member",
+        "SELECT likes FROM like WHERE uid = ? AND appId = ?",
+        like_uid_app_id,
+        False,
+    ),
+    (
+        "likes of application",
+        "SELECT likes FROM like WHERE appId = ?",
+        like_app_id,
+        False,
+    ),
+]
+
+
+def measure(
+    db: sqlite3.Connection,
+    sql: str,
+    parameters: Callable[[], tuple[Any, ...]],
+    is_write: bool,
+) -> list[float]:
+    """
+    :return: The latency of each repetition, in microseconds.
+    """
+    latencies: list[float] = []
+    for _ in range(N_REPETITIONS):
+        values = parameters()
+        before = time.perf_counter_ns()
+        db.execute(sql, values).fetchall()
+        if is_write:
+            db.commit()
+        latencies.append((time.perf_counter_ns() - before) / 1000)
+    return latencies
+
+
+def measure_message_count_flush(db: sqlite3.Connection) -> list[float]:
+    """
+    Latency of a single write-behind flush of 500 users' message counts.
+    """
+    latencies: list[float] = []
+    for _ in range(N_REPETITIONS // 10):
+        rows = [(rng.randrange(N_USERS), 1, 0) for _ in range(500)]
+        before = time.perf_counter_ns()
+        with db:
+            db.executemany(UPSERT_MESSAGE_COUNTS, rows)
+        latencies.append((time.perf_counter_ns() - before) / 1000)
+    return latencies
+
+
+def run_all(db: sqlite3.Connection) -> dict[str, list[float]]:
+    results = {
+        description: measure(db, sql, parameters, is_write)
+        for description, sql, parameters, is_write in QUERIES
+    }
+    results["message count flush (500 users)"] = measure_message_count_flush(db)
+    return results
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        before_path = Path(directory) / "before.sqlite"
+        after_path = Path(directory) / "after.sqlite"
+
+        print(
+            f"Building synthetic database ({N_USERS} users, {N_ALERTS} alerts, "
+            f"{N_APPLICATIONS} applications, {N_LIKES} likes)...",
+        )
+        create_synthetic_database(before_path)
+        after_path.write_bytes(before_path.read_bytes())
+        apply_migrations(after_path)
+
+        before_db = sqlite3.connect(before_path)
+        before = run_all(before_db)
+        before_db.close()
+
+        after_db = configure_connection(sqlite3.connect(after_path))
+        after = run_all(after_db)
+        after_db.close()
+
+    print(f"\n{'query':<36}{'before (µs)':>14}{'after (µs)':>14}{'speedup':>10}")
+    print("(median latency)")
+    for description in before:
+        median_before = statistics.median(before[description])
+        median_after = statistics.median(after[description])
+        print(
+            f"{description:<36}{median_before:>14.1f}{median_after:>14.1f}"
+            f"{median_before / median_after:>9.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
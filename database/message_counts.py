@@ -0,0 +1,95 @@
+"""
+Write-behind buffer for the `messagesSent` and `helpMessagesSent` counters.
+Counting every message used to cost a SELECT, up to two UPDATEs and a commit.
+Instead, deltas are accumulated in memory here and periodically written in a single transaction.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .async_database import AsyncDatabase, Transaction
+
+# Creates the user if they don't exist yet, otherwise adds the deltas onto their counts.
+# See ERD.mdj for the column order.
+UPSERT_MESSAGE_COUNTS = """
+    INSERT INTO user (uid, messagesSent, markedSpam, cooldown, helpMessagesSent, limitLevel)
+    VALUES (?, ?, FALSE, NULL, ?, NULL)
+    ON CONFLICT (uid) DO UPDATE SET
+        messagesSent = messagesSent + excluded.messagesSent,
+        helpMessagesSent = helpMessagesSent + excluded.helpMessagesSent
+"""
+
+
+class MessageCountBuffer:
+    """
+    Accumulates per-user message count deltas which have not been written to the database yet.
+    Anything that reads message counts from the database should add `pending_counts` on top.
+    """
+
+    # flush early if this many users have pending counts
+    FLUSH_THRESHOLD = 500
+
+    def __init__(self: MessageCountBuffer) -> None:
+        # maps uid -> [messagesSent delta, helpMessagesSent delta]
+        self.pending: dict[int, list[int]] = {}
+
+    def record(self: MessageCountBuffer, uid: int, *, help_message: bool) -> bool:
+        """
+        Counts a single message sent by `uid`.
+
+        :return: True if the buffer has grown large enough that it should be flushed.
+        """
+        deltas = self.pending.setdefault(uid, [0, 0])
+        deltas[0] += 1
+        if help_message:
+            deltas[1] += 1
+
+        return len(self.pending) >= self.FLUSH_THRESHOLD
+
+    def pending_counts(self: MessageCountBuffer, uid: int) -> tuple[int, int]:
+        """
+        :return: The (messagesSent, helpMessagesSent) which are buffered but not yet written for `uid`.
+        """
+        messages_sent, help_messages_sent = self.pending.get(uid, (0, 0))
+        return messages_sent, help_messages_sent
+
+    async def flush(self: MessageCountBuffer, database: AsyncDatabase) -> int:
+        """
+        Writes all pending deltas to the database with a single `executemany` inside one transaction.
+        If the write fails or is cancelled before it's committed, the deltas are kept so that they can be retried
+        on the next flush.
+
+        :return: The number of users whose counts were written.
+        """
+        if not self.pending:
+            return 0
+
+        pending, self.pending = self.pending, {}
+        rows = [
+            (uid, messages_sent, help_messages_sent)
+            for uid, (messages_sent, help_messages_sent) in pending.items()
+        ]
+
+        transaction: Transaction | None = None
+        try:
+            async with database.transaction() as transaction:
+                await transaction.executemany(UPSERT_MESSAGE_COUNTS, rows)
+        except BaseException:
+            # e.g. cancelled while committing, in which case the deltas were written anyway
+            if transaction is not None and transaction.committed:
+                raise
+
+            # put the deltas back (merging with anything recorded in the meantime)
+            # this includes cancellation, e.g. at shutdown, after which the transaction is rolled back
+            for uid, (messages_sent, help_messages_sent) in pending.items():
+                deltas = self.pending.setdefault(uid, [0, 0])
+                deltas[0] += messages_sent
+                deltas[1] += help_messages_sent
+            raise
+
+        return len(rows)
+
+
+message_count_buffer = MessageCountBuffer()
@@ -0,0 +1,115 @@
+"""
+Builds the database from scratch if it doesn't exist.
+Originally schema.py, author: !SKA#0001
+Older databases already have these tables, which is why everything here is "IF NOT EXISTS".
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+def upgrade(db: sqlite3.Connection) -> None:
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        appliedAt VARCHAR(100) NOT NULL
+        );
+        """,
+    )
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user (
+        uid INTEGER PRIMARY KEY,
+        messagesSent INTEGER NOT NULL,
+        markedSpam BOOLEAN NOT NULL,
+        cooldown varchar(100),
+        helpMessagesSent INTEGER NOT NULL,
+        limitLevel INTEGER
+        );
+        """,
+    )
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS status (
+        statusId INTEGER PRIMARY KEY,
+        description VARCHAR(100) NOT NULL
+        );
+        """,
+    )
+
+    # 2000 is the discord message limit (lets not care about nitro for now)
+    # (`paused` is added by the next migration)
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS alert (
+        alertId INTEGER PRIMARY KEY,
+        uid INTEGER NOT NULL,
+        message VARCHAR(2000) NOT NULL,
+        CONSTRAINT FK3_alert_user
+            FOREIGN KEY (uid)
+            REFERENCES user(uid)
+        );
+        """,
+    )
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS application (
+        appId INTEGER PRIMARY KEY,
+        uid INTEGER,
+        status INTEGER,
+        discordName VARCHAR(33),
+        firstName VARCHAR(100),
+        nda BOOLEAN,
+        timezone VARCHAR(100),
+        hoursAvailableWk VARCHAR(100),
+        staffReason VARCHAR(4000),
+        contributeReason VARCHAR(4000),
+        submissionTime VARCHAR(100),
+        CONSTRAINT FK1_application_user
+            FOREIGN KEY (uid)
+            REFERENCES user(uid),
+        CONSTRAINT FK4_application_status
+            FOREIGN KEY (status)
+            REFERENCES status(statusId)
+        );
+        """,
+    )
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS like (
+        likeId INTEGER PRIMARY KEY,
+        appId INTEGER,
+        uid INTEGER Nna,
+        name VARCHAR(33),
+        likes BOOLEAN Nna,
+        CONSTRAINT FK2_like_application
+            FOREIGN KEY (appID)
+            REFERENCES application(appId)
+        );
+        """,
+    )
+
+    db.execute(
+        """
+        INSERT OR IGNORE INTO status (statusId, description) VALUES
+        (1, 'Application submitted'),
+        (2, 'Application Denied'),
+        (3, 'Second Opinion required'),
+        (4, 'Meets requirements'),
+        (5, 'Pending first interview'),
+        (6, 'Pending second interview'),
+        (7, 'Pending decision'),
+        (8, 'Pending onboardment'),
+        (9, 'Accepted');
+        """,
+    )
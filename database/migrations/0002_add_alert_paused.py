@@ -0,0 +1,25 @@
+"""
+Adds the `paused` column to alerts, for /alerts-pause and /alerts-resume.
+Originally migrate.py.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+def upgrade(db: sqlite3.Connection) -> None:
+    column_names = [column[1] for column in db.execute("PRAGMA table_info(alert)")]
+    if "paused" in column_names:
+        # databases created by the old schema.py already have this column
+        return
+
+    db.execute(
+        """
+        ALTER TABLE alert
+        ADD paused BOOLEAN;
+        """,
+    )
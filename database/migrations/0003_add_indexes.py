@@ -0,0 +1,45 @@
+"""
+Indexes for the queries which run frequently.
+Each one includes every column that its queries read, so that the table itself never needs to be touched.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+def upgrade(db: sqlite3.Connection) -> None:
+    # alerts-add, alerts-remove, alerts-list, alerts-pause/resume, keyword autocomplete
+    db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_alert_uid_message_paused
+        ON alert (uid, message, paused)
+        """,
+    )
+
+    # checking a user's existing applications when they apply
+    db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_application_uid_status
+        ON application (uid, status)
+        """,
+    )
+
+    # listing accepted / denied / active applications
+    db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_application_status
+        ON application (status, appId, discordName, submissionTime)
+        """,
+    )
+
+    # counting likes of an application, and checking whether a staff member already liked it
+    db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_like_appid_uid_likes
+        ON like (appId, uid, likes)
+        """,
+    )
@@ -0,0 +1,18 @@
+"""
+WAL lets reads happen concurrently with writes.
+Unlike other pragmas (see tuning.py), the journal mode is persisted in the database file.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# the journal mode cannot be changed from within a transaction
+TRANSACTIONAL = False
+
+
+def upgrade(db: sqlite3.Connection) -> None:
+    db.execute("PRAGMA journal_mode = WAL")
@@ -0,0 +1,108 @@
+"""
+Numbered migrations which build the database from scratch, and bring older databases up to date.
+Each migration is a module in this package named `<4 digit version>_<description>.py` with an `upgrade` function.
+Applied migrations are recorded in the `schema_version` table, so each one only ever runs once.
+"""
+
+from __future__ import annotations
+
+import importlib
+import pkgutil
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import ModuleType
+
+MIGRATION_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    module_name: str
+
+    def load(self: Migration) -> ModuleType:
+        return importlib.import_module(f"{__name__}.{self.module_name}")
+
+
+def find_migrations() -> list[Migration]:
+    """
+    :return: Every migration in this package, sorted by version.
+    Only the file names are inspected; modules are not imported until they are applied.
+    """
+    migrations: list[Migration] = []
+    for module in pkgutil.iter_modules(__path__):
+        if match := MIGRATION_MODULE_NAME.match(module.name):
+            migrations.append(
+                Migration(version=int(match.group(1)), module_name=module.name),
+            )
+
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def current_version(db: sqlite3.Connection) -> int:
+    """
+    :return: The version of the most recently applied migration, or 0 for a new database.
+    """
+    try:
+        (version,) = db.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        # the schema_version table is created by the first migration
+        return 0
+
+    return version or 0
+
+
+def apply_migrations(
+    path: Path,
+    target_version: int | None = None,
+) -> list[Migration]:
+    """
+    Applies every pending migration (up to and including `target_version`) to the database at `path`.
+    Each migration runs inside its own transaction, unless the module sets `TRANSACTIONAL = False`
+    (which is needed for statements such as `PRAGMA journal_mode`).
+    If the database is already up to date, this costs a single query.
+
+    :return: The migrations that were applied.
+    """
+    db = sqlite3.connect(path, isolation_level=None)
+    try:
+        version = current_version(db)
+        pending = [
+            migration
+            for migration in find_migrations()
+            if migration.version > version
+            and (target_version is None or migration.version <= target_version)
+        ]
+
+        for migration in pending:
+            module = migration.load()
+            transactional = getattr(module, "TRANSACTIONAL", True)
+
+            if transactional:
+                db.execute("BEGIN")
+            try:
+                module.upgrade(db)
+                db.execute(
+                    "INSERT INTO schema_version (version, name, appliedAt) VALUES (?, ?, ?)",
+                    (
+                        migration.version,
+                        migration.module_name,
+                        datetime.now(tz=timezone.utc).isoformat(),
+                    ),
+                )
+            except BaseException:
+                if transactional:
+                    db.execute("ROLLBACK")
+                raise
+            if transactional:
+                db.execute("COMMIT")
+
+        return pending
+    finally:
+        db.close()
@@ -1,9 +1,13 @@
+import asyncio
 import os
 
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+import database
+from database.message_counts import message_count_buffer
+
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 discord_intents = discord.Intents.default()
@@ -19,6 +23,7 @@ def load() -> None:
         "detect_code",
         "detect_media_spam",
         "dictionary",
+        "limit_levels",
         "message_counter",
         "misc",
         "moderation",
@@ -37,3 +42,7 @@ def load() -> None:
 if __name__ == "__main__":
     load()
     bot.run(TOKEN)
+
+    # write any message counts which were still buffered when the bot shut down
+    asyncio.run(message_count_buffer.flush(database.async_database))
+    database.async_database.close()
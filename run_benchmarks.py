@@ -0,0 +1,5 @@
+import sys
+
+import code_detection.benchmark
+
+sys.exit(code_detection.benchmark.main())
@@ -1,3 +1,7 @@
 import code_detection.tests
+import cogs.tests
+import util.tests
 
 code_detection.tests.run()
+cogs.tests.run()
+util.tests.run()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import string
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# lowercases ASCII letters, and maps the non-ASCII letters which `re.IGNORECASE` considers equal to one to it
+ASCII_CASE_FOLD = str.maketrans(
+    {
+        **{char: char.lower() for char in string.ascii_uppercase},
+        "\u0130": "i",  # İ
+        "\u0131": "i",  # ı
+        "\u017f": "s",  # ſ
+        "\u212a": "k",  # Kelvin sign
+    },
+)
+
+
+def fold_ascii_case(text: str) -> str:
+    """
+    Folds the case of `text` such that a lowercase ASCII literal occurs in the result exactly when
+    the literal matches `text` with `re.IGNORECASE`. Unlike `str.lower`, e.g. "ſ" is folded to "s".
+    """
+    return text.translate(ASCII_CASE_FOLD)
+
+
+class AhoCorasick:
+    """
+    A minimal Aho-Corasick automaton for finding many literal substrings at once.
+    Matching is done in a single pass over the text, regardless of how many patterns there are.
+    The automaton is immutable; build a new one if the patterns change.
+    """
+
+    def __init__(self: AhoCorasick, patterns: Iterable[str]) -> None:
+        # node 0 is the root
+        self.transitions: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.outputs: list[set[str]] = [set()]
+
+        for pattern in patterns:
+            self.add_pattern(pattern)
+
+        self.build_fail_links()
+
+    def add_pattern(self: AhoCorasick, pattern: str) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self.transitions[node].get(char)
+            if next_node is None:
+                next_node = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append(set())
+                self.transitions[node][char] = next_node
+            node = next_node
+        self.outputs[node].add(pattern)
+
+    def build_fail_links(self: AhoCorasick) -> None:
+        """
+        Breadth-first construction of the failure links.
+        Each node's outputs are extended with the outputs of its failure node,
+        so that `find_all` never has to walk the failure chain to collect matches.
+        """
+        queue: deque[int] = deque(self.transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.transitions[node].items():
+                queue.append(child)
+
+                fallback = self.fail[node]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] |= self.outputs[self.fail[child]]
+
+    def find_all(self: AhoCorasick, text: str) -> set[str]:
+        """
+        :return: Every pattern which occurs at least once in `text`.
+        """
+        found: set[str] = set(self.outputs[0])  # the empty pattern matches anything
+        transitions = self.transitions
+        fail = self.fail
+        outputs = self.outputs
+
+        node = 0
+        for char in text:
+            while node and char not in transitions[node]:
+                node = fail[node]
+            node = transitions[node].get(char, 0)
+            if outputs[node]:
+                found |= outputs[node]
+
+        return found
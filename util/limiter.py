@@ -11,7 +11,7 @@ from message_formatting.embeds import EmbedBuilder
 from util.logger import log
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable
+    from collections.abc import Awaitable, Iterable
 
 LimitedCommandParams = ParamSpec("LimitedCommandParams")
 LimitedCommandReturnValue = TypeVar("LimitedCommandReturnValue")
@@ -20,6 +20,89 @@ GUILD_ID = int(getenv("GUILD_ID", "-1"))
 assert GUILD_ID != -1, "GUILD_ID is not set in .env"
 
 
+class LimitLevelCache:
+    """
+    Process-wide cache of each user's `limitLevel`, so that permission checks don't need to query the database.
+    The whole user table is loaded in bulk by `refresh`, which the LimitLevels cog runs on startup and then every
+    `refresh_interval` seconds, so that changes made directly in the database are picked up.
+    Users who weren't loaded (e.g. new users) are fetched one at a time.
+    Anything in the bot that changes a user's `limitLevel` should call `invalidate`, so that it applies immediately.
+    """
+
+    def __init__(self: LimitLevelCache, refresh_interval: float = 60.0) -> None:
+        """
+        :param refresh_interval: seconds between reloads of the whole table
+        """
+        self.refresh_interval = refresh_interval
+        self.levels: dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+        # incremented by every invalidation, so that a query which was already in flight
+        # doesn't put a stale value back into the cache
+        self.generation = 0
+
+    def load(self: LimitLevelCache, rows: Iterable[tuple[int, int | None]]) -> None:
+        """
+        Replaces the cache with (uid, limitLevel) rows from the user table.
+        """
+        self.levels = {uid: limit_level or 0 for uid, limit_level in rows}
+
+    async def refresh(self: LimitLevelCache) -> None:
+        """
+        Reloads the whole user table.
+        """
+        generation = self.generation
+        rows = await database.fetchall("SELECT uid, limitLevel FROM user")
+        if generation == self.generation:
+            self.load(rows)
+
+    def invalidate(self: LimitLevelCache, uid: int | None = None) -> None:
+        """
+        Forgets the cached limit level of `uid` (or of every user, if `uid` is None).
+        """
+        self.generation += 1
+        if uid is None:
+            self.levels.clear()
+        else:
+            self.levels.pop(uid, None)
+
+    async def get(self: LimitLevelCache, uid: int) -> int:
+        """
+        :return: The limit level of `uid` (0 if they have none).
+        Users who don't exist in the database yet are added to it.
+        """
+        limit_level = self.levels.get(uid)
+        if limit_level is not None:
+            self.hits += 1
+            return limit_level
+
+        self.misses += 1
+        generation = self.generation
+        row = await database.fetchone(
+            "SELECT limitLevel from user where uid = ?",
+            (uid,),
+        )
+
+        if row is None:  # User DOES NOT exist in database, add them.
+            await database.execute(
+                "INSERT OR IGNORE INTO user VALUES (?, ?, ?, ?, ?, ?)",
+                (uid, 0, False, None, 0, None),
+            )  # See ERD.mdj
+            limit_level = 0
+        else:
+            limit_level = row[0] or 0
+
+        if generation == self.generation:
+            self.levels[uid] = limit_level
+        return limit_level
+
+
+limit_level_cache = LimitLevelCache(
+    refresh_interval=float(getenv("LIMIT_LEVEL_CACHE_REFRESH_SECONDS", "60")),
+)
+
+
 def limit(
     limit_level_requirement: int,  # users at this `limitLevel` or higher are banned from using the command
 ) -> Callable[
@@ -61,23 +144,7 @@ def limit(
                 )
                 return await func(*args, **kwargs)
 
-            conn = database.connect()
-            c = conn.cursor()
-            limit_level = c.execute(
-                "SELECT limitLevel from user where uid = ?",
-                (ctx.author.id,),
-            ).fetchone()
-
-            if limit_level is None:  # User DOES NOT exist in database, add them.
-                c.execute(
-                    "INSERT INTO user VALUES (?, ?, ?, ?, ?, ?)",
-                    (ctx.author.id, 0, False, None, 0, None),
-                )  # See ERD.mdj
-                limit_level = 0
-                conn.commit()
-            else:
-                limit_level = limit_level[0] or 0
-
+            limit_level = await limit_level_cache.get(ctx.author.id)
             if limit_level >= limit_level_requirement:
                 embed = EmbedBuilder(
                     title="You cannot use this command!",
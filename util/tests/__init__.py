@@ -0,0 +1,6 @@
+from . import aho_corasick
+
+
+def run() -> None:
+    print("\nRunning tests for util.aho_corasick")
+    aho_corasick.run()
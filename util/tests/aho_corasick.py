@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+
+from code_detection.tests.helpers import create_condition_tester
+from util.aho_corasick import AhoCorasick, fold_ascii_case
+
+test = create_condition_tester()
+
+
+def run() -> None:
+    automaton = AhoCorasick(["he", "she", "hers", "c++"])
+    test("overlapping", automaton.find_all("ushers") == {"he", "she", "hers"})
+    test("punctuation", automaton.find_all("i like c++") == {"c++"})
+    test("no match", automaton.find_all("no match at all") == set())
+    test("empty pattern", AhoCorasick([""]).find_all("anything") == {""})
+
+    test("ASCII is lowercased", fold_ascii_case("Hello, World") == "hello, world")
+    test("other letters are kept", fold_ascii_case("ÄÖÜ") == "ÄÖÜ")
+
+    # (keyword, text) pairs which `re.IGNORECASE` matches, but `str.lower` doesn't
+    for keyword, text in [("s", "ſ"), ("i", "ı"), ("kiss", "KİSS"), ("k", "\u212a")]:
+        test(
+            f"{keyword!r} matches {text!r}",
+            re.search(keyword, text, re.IGNORECASE) is not None
+            and AhoCorasick([keyword]).find_all(fold_ascii_case(text)) == {keyword},
+        )
+
+    test(
+        "same as IGNORECASE",
+        all(
+            (letter in fold_ascii_case(chr(code_point)))
+            == (re.fullmatch(letter, chr(code_point), re.IGNORECASE) is not None)
+            for code_point in range(0x10000)
+            for letter in "iks"
+        ),
+    )